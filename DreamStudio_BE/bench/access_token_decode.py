@@ -0,0 +1,55 @@
+"""
+Per-request cost of verifying the bearer token: the old path (limiter and
+auth dependency each run jwt.decode) against the shared, cached path.
+
+    python -m bench.access_token_decode --requests 20000 --clients 200
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+from jose import jwt
+
+from src.config import settings
+from src.helpers.auth_utils import create_access_token, request_access_claims, verified_tokens
+
+
+def old_path(token: str) -> None:
+    # _get_user_id_key and validate_access_token each decoded the token.
+    jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+
+def new_path(token: str) -> None:
+    request = SimpleNamespace(state=SimpleNamespace())
+    request_access_claims(request, token)
+    request_access_claims(request, token)
+
+
+def run(label: str, fn, tokens: list[str], requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        fn(tokens[i % len(tokens)])
+    per_request = (time.perf_counter() - started) / requests * 1e6
+    print(f"{label:<28} {per_request:8.1f} us/request")
+    return per_request
+
+
+def main(args: argparse.Namespace) -> None:
+    tokens = [create_access_token(f"00000000-0000-0000-0000-{i:012d}") for i in range(args.clients)]
+    old = run("decode twice (before)", old_path, tokens, args.requests)
+
+    # Cold cache: each client's first request pays one verification.
+    verified_tokens.clear()
+    cold = run("once per request, cache miss", new_path, tokens, len(tokens))
+    new = run("once per request, cache hit", new_path, tokens, args.requests)
+    print(f"saving with cache: {old - new:.1f} us/request ({old / new:.0f}x); "
+          f"single decode: {old - cold:.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,198 @@
+"""
+Seed a scratch database and capture EXPLAIN ANALYZE for the hot queries
+before and after a migration.
+
+The target database must already have sql/table_creation.sql applied and
+should be disposable; the seed step truncates the tables it fills.
+
+    python -m bench.explain_hot_queries --dsn postgresql://localhost/ds_scratch \
+        --migration sql/migrations/001_hot_query_indexes.sql \
+        > sql/migrations/001_hot_query_indexes.explain.txt
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import psycopg
+
+SEED_SQL = [
+    "TRUNCATE users, auth_identities, goal_types, goals, verifications, "
+    "goal_quiz_questions, bounty_ledger CASCADE",
+    # 3 goal types, one quiz and two photo.
+    """
+    INSERT INTO goal_types (name, verification_type)
+    VALUES ('Read the Bible', 'quiz'), ('Go to the gym', 'photo'), ('Go to class', 'photo')
+    """,
+    """
+    INSERT INTO users (email, first_name, last_name, bounty_balance)
+    SELECT 'user' || i || '@example.com', 'First' || i, 'Last' || i, 10000
+    FROM generate_series(1, %(users)s) AS i
+    """,
+    """
+    INSERT INTO auth_identities (user_id, provider, email, password_hash)
+    SELECT id, 'password', email, 'x' FROM users
+    """,
+    # Goals spread over the past year and the next month; most are finalized.
+    """
+    INSERT INTO goals (user_id, goal_type_id, title, bounty_amount, deadline,
+                       status, verification_status, finalized_at)
+    SELECT u.id,
+           (SELECT id FROM goal_types ORDER BY name OFFSET (g %% 3) LIMIT 1),
+           'Goal ' || g,
+           100,
+           now() - interval '365 days' + (random() * interval '395 days'),
+           'pending', 'not started', NULL
+    FROM users u, generate_series(1, %(goals_per_user)s) AS g
+    """,
+    """
+    UPDATE goals
+    SET status = 'finalized',
+        finalized_at = deadline + interval '1 minute',
+        verification_status = CASE WHEN random() < 0.6 THEN 'completed' ELSE 'failed' END
+    WHERE deadline < now() - interval '1 hour'
+    """,
+    """
+    INSERT INTO verifications (goal_id, type, result, created_at, updated_at)
+    SELECT g.id, 'photo', CASE WHEN random() < 0.6 THEN 'approved' ELSE 'rejected' END,
+           g.deadline - (n * interval '1 hour'), g.deadline - (n * interval '1 hour')
+    FROM goals g, generate_series(1, %(verifications_per_goal)s) AS n
+    """,
+    """
+    INSERT INTO goal_quiz_questions (goal_id, question, answer)
+    SELECT g.id, 'Question ' || n, 'true'
+    FROM goals g, generate_series(1, 5) AS n
+    WHERE g.goal_type_id = (SELECT id FROM goal_types WHERE verification_type = 'quiz')
+    """,
+    """
+    INSERT INTO bounty_ledger (user_id, goal_id, amount, type)
+    SELECT user_id, id, bounty_amount, 'hold' FROM goals
+    """,
+    """
+    INSERT INTO bounty_ledger (user_id, goal_id, amount, type)
+    SELECT user_id, id, bounty_amount,
+           CASE verification_status WHEN 'completed' THEN 'release' ELSE 'forfeit' END
+    FROM goals WHERE status = 'finalized'
+    """,
+    "ANALYZE",
+]
+
+# Each query mirrors the statement the code emits; parameters are filled from
+# a sample row picked after seeding.
+QUERIES = {
+    "current_goals_for_user (goals_utils)": """
+SELECT g.*, v_latest.id, v_latest.result, v_latest.updated_at
+FROM goals g
+LEFT JOIN goal_types gt ON gt.id = g.goal_type_id
+LEFT JOIN LATERAL (
+  SELECT v.* FROM verifications v
+  WHERE v.goal_id = g.id
+  ORDER BY v.updated_at DESC
+  LIMIT 1
+) v_latest ON TRUE
+WHERE g.deadline >= now() AND g.user_id = %(user_id)s
+""",
+    "sweep_overdue_goals (deadline_tasks)": """
+SELECT goals.id FROM goals
+WHERE goals.deadline <= now()
+  AND goals.finalized_at IS NULL
+  AND goals.status IN ('pending', 'validating')
+LIMIT 500
+""",
+    "latest verification (finalize_goal_at_deadline)": """
+SELECT * FROM verifications
+WHERE verifications.goal_id = %(goal_id)s
+ORDER BY verifications.updated_at DESC
+LIMIT 1
+""",
+    "quiz questions by goal (get_quizzes)": """
+SELECT * FROM goal_quiz_questions WHERE goal_quiz_questions.goal_id = %(quiz_goal_id)s
+""",
+    "terminal ledger entry (finalize_goal_at_deadline)": """
+SELECT * FROM bounty_ledger
+WHERE bounty_ledger.goal_id = %(goal_id)s
+  AND bounty_ledger.type IN ('release', 'forfeit')
+LIMIT 1
+""",
+    "identity by email (login_manual)": """
+SELECT * FROM auth_identities
+WHERE auth_identities.email = %(email)s AND auth_identities.provider = 'password'
+LIMIT 1
+""",
+    "weekly winners (distribute_weekly_pool)": """
+SELECT * FROM goals
+WHERE goals.finalized_at >= now() - interval '14 days'
+  AND goals.finalized_at < now() - interval '7 days'
+  AND goals.status = 'finalized'
+  AND goals.verification_status = 'completed'
+""",
+}
+
+
+def seed(conn: psycopg.Connection, args: argparse.Namespace) -> None:
+    params = {
+        "users": args.users,
+        "goals_per_user": args.goals_per_user,
+        "verifications_per_goal": args.verifications_per_goal,
+    }
+    for statement in SEED_SQL:
+        started = time.perf_counter()
+        conn.execute(statement, params if "%(" in statement else None)
+        print(f"-- seed {time.perf_counter() - started:6.1f}s  {' '.join(statement.split())[:70]}")
+
+
+def sample_params(conn: psycopg.Connection) -> dict:
+    user_id, email = conn.execute(
+        "SELECT u.id, u.email FROM users u OFFSET (SELECT count(*) / 2 FROM users) LIMIT 1"
+    ).fetchone()
+    goal_id = conn.execute(
+        "SELECT id FROM goals WHERE status = 'finalized' OFFSET 1000 LIMIT 1"
+    ).fetchone()[0]
+    quiz_goal_id = conn.execute("SELECT goal_id FROM goal_quiz_questions LIMIT 1").fetchone()[0]
+    return {"user_id": user_id, "email": email, "goal_id": goal_id, "quiz_goal_id": quiz_goal_id}
+
+
+def explain_all(conn: psycopg.Connection, params: dict, label: str) -> None:
+    for name, query in QUERIES.items():
+        print(f"\n=== {label}: {name}")
+        rows = conn.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params).fetchall()
+        for (line,) in rows:
+            print(line)
+
+
+def apply_migration(conn: psycopg.Connection, path: Path) -> None:
+    # Statement-by-statement so CONCURRENTLY runs outside a transaction.
+    body = "\n".join(
+        line for line in path.read_text().splitlines() if not line.lstrip().startswith("--")
+    )
+    for statement in body.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    conn.execute("ANALYZE")
+
+
+def main(args: argparse.Namespace) -> None:
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        if not args.skip_seed:
+            seed(conn, args)
+        params = sample_params(conn)
+        counts = conn.execute(
+            "SELECT (SELECT count(*) FROM goals), (SELECT count(*) FROM verifications), "
+            "(SELECT count(*) FROM bounty_ledger), (SELECT count(*) FROM goal_quiz_questions)"
+        ).fetchone()
+        print(f"-- rows: goals={counts[0]} verifications={counts[1]} "
+              f"bounty_ledger={counts[2]} goal_quiz_questions={counts[3]}")
+        explain_all(conn, params, "BEFORE")
+        apply_migration(conn, Path(args.migration))
+        explain_all(conn, params, "AFTER")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", required=True)
+    parser.add_argument("--migration", required=True)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--goals-per-user", type=int, default=10)
+    parser.add_argument("--verifications-per-goal", type=int, default=2)
+    parser.add_argument("--skip-seed", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Goals created per second: one POST /newgoal per goal vs POST /newgoals batches.
+
+Runs the app in-process (rate limiting disabled) against the configured
+database, so point it at a disposable one. The user's balance is topped up
+to cover every hold. Task messages land in task_outbox; the relay is not run.
+
+    python -m bench.goal_batch_create --email bench@example.com --password secret \
+        --goals 500 --batch-size 50 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import text
+
+from bench.route_throughput import _login
+from src.helpers.db import SessionLocal
+from src.helpers.goal_type_registry import goal_type_registry
+from src.helpers.limiter import limiter
+from src.main import app
+
+
+def goal_payload(goal_type_id, n: int) -> dict:
+    return {
+        "goal_type_id": str(goal_type_id),
+        "title": f"Bench goal {n}",
+        "description": "bench",
+        "user_input": "Genesis 1",
+        "bounty_amount": 1,
+        "deadline": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
+    }
+
+
+async def run(label: str, client: httpx.AsyncClient, requests: list[tuple[str, dict]], headers, concurrency: int, goals: int):
+    queue = list(reversed(requests))
+    errors = []
+
+    async def worker():
+        while queue:
+            path, body = queue.pop()
+            response = await client.post(path, json=body, headers=headers)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {goals / elapsed:8.1f} goals/s  ({len(requests)} requests in {elapsed:.2f}s, {len(errors)} errors)")
+
+
+async def main(args: argparse.Namespace) -> None:
+    limiter.enabled = False
+    goal_type_id = goal_type_registry.all()[0].id
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = await _login(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        with SessionLocal() as db:
+            db.execute(
+                text("UPDATE users SET bounty_balance = bounty_balance + :amount WHERE email = :email"),
+                {"amount": 2 * args.goals, "email": args.email},
+            )
+            db.commit()
+
+        single = [("/api/v1/goals/newgoal", goal_payload(goal_type_id, n)) for n in range(args.goals)]
+        await run("single (/newgoal)", client, single, headers, args.concurrency, args.goals)
+
+        batches = [
+            ("/api/v1/goals/newgoals", {"goals": [goal_payload(goal_type_id, n) for n in range(start, min(start + args.batch_size, args.goals))]})
+            for start in range(0, args.goals, args.batch_size)
+        ]
+        await run(f"batch (/newgoals x{args.batch_size})", client, batches, headers, args.concurrency, args.goals)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--goals", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""
+Goals finalized per second: one finalize_goal_at_deadline per goal vs chunked finalize_goal_chunk.
+
+Seeds --goals overdue goals (half of them approved) across --users users in
+the configured database, so point it at a disposable one, then finalizes
+them with --concurrency threads for each strategy. Fan-out runs the task
+body directly; in production each goal also costs a broker message.
+
+    python -m bench.goal_finalize --goals 5000 --users 500 --concurrency 8
+"""
+
+import argparse
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from src.helpers.db import SessionLocal
+from src.tasks.deadline_tasks import finalize_goal_at_deadline, finalize_goal_chunk
+
+BENCH_EMAIL = "goal-finalize-bench-%"
+
+SEED_SQL = [
+    "DELETE FROM bounty_ledger WHERE user_id IN (SELECT id FROM users WHERE email LIKE :pattern)",
+    "DELETE FROM users WHERE email LIKE :pattern",
+    # Finalize every other overdue goal first so only bench goals are claimed.
+    """
+    UPDATE goals SET status = 'finalized', finalized_at = now()
+    WHERE finalized_at IS NULL AND status IN ('pending', 'validating') AND deadline <= now()
+    """,
+    """
+    INSERT INTO users (email, first_name, last_name, bounty_balance)
+    SELECT 'goal-finalize-bench-' || i || '@example.com', 'Bench', 'User', 0
+    FROM generate_series(1, :users) AS i
+    """,
+    """
+    INSERT INTO goals (user_id, title, bounty_amount, deadline, latest_verification_result)
+    SELECT u.id, 'Finalize bench', 10, now() - interval '1 hour',
+           CASE WHEN i % 2 = 0 THEN 'approved' ELSE 'rejected' END
+    FROM generate_series(1, :goals) AS i
+    JOIN LATERAL (
+      SELECT id FROM users WHERE email = 'goal-finalize-bench-' || (i % :users + 1) || '@example.com'
+    ) u ON TRUE
+    """,
+    "ANALYZE goals",
+]
+
+
+def seed(goals: int, users: int) -> list[str]:
+    with SessionLocal() as db:
+        for statement in SEED_SQL:
+            db.execute(text(statement), {"pattern": BENCH_EMAIL, "goals": goals, "users": users})
+        db.commit()
+        return [
+            str(goal_id)
+            for goal_id in db.execute(
+                text(
+                    "SELECT g.id FROM goals g JOIN users u ON u.id = g.user_id "
+                    "WHERE u.email LIKE :pattern AND g.finalized_at IS NULL"
+                ),
+                {"pattern": BENCH_EMAIL},
+            ).scalars()
+        ]
+
+
+def run(label: str, worker, concurrency: int, goals: int) -> None:
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    with SessionLocal() as db:
+        left = db.execute(
+            text(
+                "SELECT count(*) FROM goals g JOIN users u ON u.id = g.user_id "
+                "WHERE u.email LIKE :pattern AND g.finalized_at IS NULL"
+            ),
+            {"pattern": BENCH_EMAIL},
+        ).scalar()
+    print(f"{label:<24} {goals / elapsed:8.1f} goals/s  ({elapsed:.2f}s, {left} left unfinalized)")
+
+
+def main(args: argparse.Namespace) -> None:
+    queue = seed(args.goals, args.users)
+
+    def fan_out_worker():
+        while queue:
+            finalize_goal_at_deadline.run(queue.pop())
+
+    run("fan-out (per goal)", fan_out_worker, args.concurrency, args.goals)
+
+    seed(args.goals, args.users)
+
+    def chunk_worker():
+        with SessionLocal() as db:
+            while finalize_goal_chunk(db, datetime.now(timezone.utc), args.batch_size) != {
+                "released": 0, "forfeited": 0, "already_settled": 0
+            }:
+                pass
+
+    run(f"chunked (x{args.batch_size})", chunk_worker, args.concurrency, args.goals)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--goals", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    main(parser.parse_args())
@@ -0,0 +1,104 @@
+"""
+Goal history page latency by depth: keyset cursor vs OFFSET.
+
+Seeds one user with --goals goals (plus background users) in a disposable
+database that has sql/table_creation.sql and the migrations applied, then
+times fetching the first, middle and last page with goal_history_page's
+(deadline, id) cursor and with the equivalent LIMIT/OFFSET query:
+
+    python -m bench.goal_history_pages --dsn postgresql://localhost/ds_scratch --goals 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.helpers.goals_utils import GOAL_HISTORY_SQL, goal_history_page
+
+SEED_SQL = [
+    "TRUNCATE users, goal_types, goals CASCADE",
+    "INSERT INTO goal_types (name, verification_type) VALUES ('Read', 'quiz'), ('Gym', 'photo')",
+    """
+    INSERT INTO users (email, first_name, last_name)
+    SELECT 'user' || i || '@example.com', 'F', 'L' FROM generate_series(1, 200) AS i
+    """,
+    # The measured user, then 200 goals for everyone else.
+    """
+    INSERT INTO goals (user_id, goal_type_id, title, bounty_amount, deadline, status, verification_status)
+    SELECT u.id,
+           (SELECT id FROM goal_types ORDER BY name OFFSET (g % 2) LIMIT 1),
+           'Goal ' || g, 100,
+           now() - interval '3 years' + random() * interval '3 years',
+           (ARRAY['pending', 'finalized', 'finalized', 'canceled'])[1 + g % 4],
+           (ARRAY['completed', 'failed', 'not started'])[1 + g % 3]
+    FROM users u, generate_series(1, CASE WHEN u.email = 'user1@example.com' THEN :goals ELSE 200 END) AS g
+    """,
+    # Sets the visibility map and statistics, as autovacuum would.
+    "VACUUM ANALYZE goals",
+]
+
+
+async def timed(label: str, fn, repeats: int) -> None:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<28} p50={statistics.median(timings):8.2f}ms")
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.dsn.replace("postgresql://", "postgresql+psycopg://", 1))
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in SEED_SQL:
+            await conn.execute(text(statement), {"goals": args.goals})
+        user_id = (await conn.execute(text("SELECT id FROM users WHERE email = 'user1@example.com'"))).scalar()
+
+    async with engine.connect() as conn:
+        # Walk the whole history once to collect the cursor at each depth.
+        cursors, after = [None], None
+        while True:
+            rows = await goal_history_page(user_id, conn, limit=args.page_size, after=after)
+            if len(rows) <= args.page_size:
+                break
+            after = (rows[args.page_size - 1].deadline, rows[args.page_size - 1].id)
+            cursors.append(after)
+        print(f"{args.goals} goals, {len(cursors)} pages of {args.page_size}")
+
+        offset_sql = text(GOAL_HISTORY_SQL.format(filters="") + " OFFSET :offset")
+        for name, page in (("first", 0), ("middle", len(cursors) // 2), ("last", len(cursors) - 1)):
+            await timed(
+                f"keyset {name} page",
+                lambda: goal_history_page(user_id, conn, limit=args.page_size, after=cursors[page]),
+                args.repeats,
+            )
+            await timed(
+                f"offset {name} page",
+                lambda: conn.execute(offset_sql, {"user_id": user_id, "limit": args.page_size + 1,
+                                                  "offset": page * args.page_size}),
+                args.repeats,
+            )
+
+        plan = await conn.execute(
+            text("EXPLAIN (ANALYZE, BUFFERS) " + GOAL_HISTORY_SQL.format(
+                filters="AND (deadline, id) < (:after_deadline, :after_id)")),
+            {"user_id": user_id, "limit": args.page_size + 1,
+             "after_deadline": cursors[len(cursors) // 2][0], "after_id": cursors[len(cursors) // 2][1]},
+        )
+        print("\nmiddle page plan:")
+        print("\n".join(row[0] for row in plan))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", required=True)
+    parser.add_argument("--goals", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,111 @@
+"""
+Per-signup cost of verifying a Google ID token: fetch-per-call vs cached certs.
+
+Runs a local stand-in for Google's cert endpoint (with --fetch-delay-ms of
+simulated network latency), signs a token with its key, and times
+google.oauth2.id_token with a fresh transport per call (the old signup_google
+path) against GoogleIdTokenVerifier:
+
+    python -m bench.google_token_verify --calls 200 --fetch-delay-ms 40
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt as google_jwt
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+
+from src.helpers.google_certs import GoogleIdTokenVerifier
+
+AUDIENCE = "bench-client-id.apps.googleusercontent.com"
+KID = "bench-kid"
+
+
+def make_key_pair() -> tuple[str, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, KID)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def serve_certs(cert_pem: str, delay: float) -> str:
+    body = json.dumps({KID: cert_pem}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", "public, max-age=21600, must-revalidate")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_port}/oauth2/v1/certs"
+
+
+def timed(label: str, fn, calls: int) -> float:
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p50 = statistics.median(timings)
+    print(f"{label:<32} p50={p50:7.2f}ms p99={timings[int(len(timings) * 0.99) - 1]:7.2f}ms")
+    return p50
+
+
+def main(args: argparse.Namespace) -> None:
+    private_pem, cert_pem = make_key_pair()
+    url = serve_certs(cert_pem, args.fetch_delay_ms / 1000)
+    now = int(time.time())
+    token = google_jwt.encode(
+        crypt.RSASigner.from_string(private_pem, key_id=KID),
+        {"iss": "https://accounts.google.com", "aud": AUDIENCE, "sub": "1", "iat": now, "exp": now + 3600},
+    ).decode()
+
+    before = timed(
+        "fetch per call (before)",
+        lambda: id_token.verify_token(token, google_requests.Request(), AUDIENCE, certs_url=url),
+        args.calls,
+    )
+    verifier = GoogleIdTokenVerifier(url, AUDIENCE)
+    verifier.verify(token)  # first fetch happens once per process
+    after = timed("cached certs (after)", lambda: verifier.verify(token), args.calls)
+    print(f"saving: {before - after:.2f}ms per signup at p50 ({verifier.fetches} cert fetch)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--fetch-delay-ms", type=float, default=40)
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+"""
+Ledger reconciliation throughput and peak Python memory for growing ledgers.
+
+Seeds --users users and --rows ledger rows per step into the configured
+database (point it at a disposable one), then runs a full reconcile_ledger
+after each step and prints rows/second and the tracemalloc peak, which
+should stay flat as the ledger grows. tracemalloc slows the Python loop
+several times over, so read rows/second relative to other steps:
+
+    python -m bench.ledger_reconciliation --users 10000 --rows 1000000 --steps 3
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from src.helpers.db import SessionLocal
+from src.tasks.ledger_reconciliation import reconcile_ledger
+
+SEED_USERS_SQL = """
+DELETE FROM bounty_ledger WHERE user_id IN (SELECT id FROM users WHERE email LIKE 'ledger-recon-bench-%');
+DELETE FROM users WHERE email LIKE 'ledger-recon-bench-%';
+INSERT INTO users (email, first_name, last_name, bounty_balance)
+SELECT 'ledger-recon-bench-' || i || '@example.com', 'Bench', 'User', 0
+FROM generate_series(1, :users) AS i;
+"""
+
+# Funds of 3 and holds of 1 per row pair; balances are updated to match,
+# except for every 1000th user, which the run should report.
+SEED_LEDGER_SQL = [
+    """
+    INSERT INTO bounty_ledger (user_id, type, amount, created_at)
+    SELECT u.id, CASE WHEN (i / :users) % 2 = 0 THEN 'fund' ELSE 'hold' END,
+           CASE WHEN (i / :users) % 2 = 0 THEN 3 ELSE 1 END, now() - interval '1 day'
+    FROM generate_series(1, :rows) AS i
+    JOIN LATERAL (
+      SELECT id FROM users WHERE email = 'ledger-recon-bench-' || (i % :users + 1) || '@example.com'
+    ) u ON TRUE
+    """,
+    """
+    UPDATE users u
+    SET bounty_balance = t.total
+        + CASE WHEN split_part(split_part(u.email, '-', 4), '@', 1)::int % 1000 = 0 THEN 1 ELSE 0 END
+    FROM (
+      SELECT user_id, sum(CASE WHEN type = 'fund' THEN amount ELSE -amount END) AS total
+      FROM bounty_ledger GROUP BY user_id
+    ) t
+    WHERE u.id = t.user_id AND u.email LIKE 'ledger-recon-bench-%'
+    """,
+    "ANALYZE bounty_ledger",
+]
+
+
+def main(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        for statement in SEED_USERS_SQL.strip().split(";\n"):
+            db.execute(text(statement), {"users": args.users})
+        db.commit()
+
+    for step in range(1, args.steps + 1):
+        with SessionLocal() as db:
+            for statement in SEED_LEDGER_SQL:
+                db.execute(text(statement), {"rows": args.rows, "users": args.users})
+            db.commit()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            result = reconcile_ledger(db, True, args.batch_size, timedelta(minutes=10))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"step {step}: {result['ledger_rows']:>9} ledger rows  {result['ledger_rows'] / elapsed:9.0f} rows/s  "
+            f"peak {peak / 2**20:6.1f} MiB  {result['discrepancies']} discrepancies"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    main(parser.parse_args())
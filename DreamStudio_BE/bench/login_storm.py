@@ -0,0 +1,81 @@
+"""
+Latency of goal and verification reads while a login storm runs alongside.
+
+Measures p50/p99 of the read paths alone, then again while --storm clients
+hammer /api/v1/auth/manual/login, and reports how many logins were shed
+with 503 by the password hashing pool:
+
+    python -m bench.login_storm --base-url http://localhost:8000 \
+        --email bench@example.com --password secret --goal-id <goal uuid> \
+        --concurrency 16 --storm 64 --seconds 20
+
+As with bench.route_throughput, run the server with SLOWAPI_REDIS_URL=memory://
+and a high limit, or the limiter will throttle the storm before argon2 does.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from bench.route_throughput import _login, run_path
+
+
+async def _storm(client: httpx.AsyncClient, email: str, password: str, deadline: float, codes: Counter):
+    while time.perf_counter() < deadline:
+        resp = await client.post(
+            "/api/v1/auth/manual/login", json={"email": email, "password": password}
+        )
+        codes[resp.status_code] += 1
+
+
+async def measure(client, paths, token, args) -> list[dict]:
+    results = []
+    for path in paths:
+        results.append(await run_path(client, path, token, args.concurrency, args.seconds))
+    return results
+
+
+def report(label: str, results: list[dict]) -> None:
+    for result in results:
+        print(
+            f"{label:<6} {result['path']:<55} rps={result['rps']:>8.1f} "
+            f"p50={result['p50_ms']:>7.1f}ms p99={result['p99_ms']:>7.1f}ms errors={result['errors']}"
+        )
+
+
+async def main(args: argparse.Namespace):
+    paths = ["/api/v1/goals/getcurrentgoals"]
+    if args.goal_id:
+        paths.append(f"/api/v1/verification/verification-type/{args.goal_id}")
+    limits = httpx.Limits(max_connections=args.concurrency + args.storm)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        token = await _login(client, args.email, args.password)
+        report("quiet", await measure(client, paths, token, args))
+
+        codes: Counter = Counter()
+        # Each path gets its own --seconds window; keep the storm up for all of them.
+        deadline = time.perf_counter() + args.seconds * len(paths)
+        storm = asyncio.gather(
+            *(_storm(client, args.email, args.password, deadline, codes) for _ in range(args.storm))
+        )
+        results = await measure(client, paths, token, args)
+        await storm
+        report("storm", results)
+        total = sum(codes.values())
+        print(f"logins: {total} total, {codes[200]} ok, {codes[503]} shed (503), "
+              f"other={dict((k, v) for k, v in codes.items() if k not in (200, 503))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--goal-id")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--storm", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    asyncio.run(main(parser.parse_args()))
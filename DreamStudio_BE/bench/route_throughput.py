@@ -0,0 +1,100 @@
+"""
+Requests-per-second benchmark for the hot API routes at a fixed concurrency.
+
+Run it against a live server (uvicorn src.main:app) once on the old sync
+routes and once on the AsyncSession routes, with the same worker count and
+the same database, and compare the numbers:
+
+    python -m bench.route_throughput --base-url http://localhost:8000 \
+        --email bench@example.com --password secret --concurrency 64 --seconds 30
+
+The rate limiter keys on the user id, so run the server with
+SLOWAPI_REDIS_URL=memory:// and a high limit, or use a dedicated bench user.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/goals/getcurrentgoals",
+    "/api/v1/goals/goaltypes",
+    "/api/v1/user/profile",
+]
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    resp = await client.post(
+        "/api/v1/auth/manual/login", json={"email": email, "password": password}
+    )
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    path: str,
+    headers: dict[str, str],
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        resp = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if resp.status_code != 200:
+            errors.append(resp.status_code)
+
+
+async def run_path(
+    client: httpx.AsyncClient, path: str, token: str, concurrency: int, seconds: float
+) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: list[float] = []
+    errors: list[int] = []
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _worker(client, path, headers, deadline, latencies, errors)
+            for _ in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+async def main(args: argparse.Namespace):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        token = await _login(client, args.email, args.password)
+        for path in args.paths or DEFAULT_PATHS:
+            result = await run_path(client, path, token, args.concurrency, args.seconds)
+            print(
+                f"{result['path']:<40} conc={args.concurrency:<4} "
+                f"rps={result['rps']:>8.1f} p50={result['p50_ms']:>7.1f}ms "
+                f"p99={result['p99_ms']:>7.1f}ms errors={result['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--paths", nargs="*")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Throughput of the token purge task on a seeded refresh_tokens table.
+
+Seeds --rows refresh tokens (a --stale fraction of them revoked or expired
+past the retention window) into a disposable database that already has
+sql/table_creation.sql applied, then runs the same purge_table loop the
+Celery task uses and prints rows/second and bloat before and after:
+
+    python -m bench.token_purge --dsn postgresql://localhost/ds_scratch --rows 2000000
+"""
+
+import argparse
+import time
+
+import psycopg
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.tasks.token_cleanup import purge_table, table_bloat
+
+SEED_SQL = [
+    "TRUNCATE refresh_tokens",
+    """
+    INSERT INTO users (email, first_name, last_name)
+    VALUES ('token-purge-bench@example.com', 'Bench', 'User')
+    ON CONFLICT DO NOTHING
+    """,
+    # Stale rows are revoked or expired 30 days ago; the rest are live.
+    """
+    INSERT INTO refresh_tokens (user_id, refresh_token, expires_at, revoked_at, created_at)
+    SELECT u.id,
+           md5(i::text) || md5((i + 1)::text),
+           CASE WHEN i %% 2 = 0 AND random() < %(stale)s THEN now() - interval '30 days'
+                ELSE now() + interval '30 days' END,
+           CASE WHEN i %% 2 = 1 AND random() < %(stale)s THEN now() - interval '30 days' END,
+           now() - interval '60 days'
+    FROM users u, generate_series(1, %(rows)s) AS i
+    WHERE u.email = 'token-purge-bench@example.com'
+    """,
+    "VACUUM ANALYZE refresh_tokens",
+]
+
+
+def seed(dsn: str, rows: int, stale: float) -> None:
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        for statement in SEED_SQL:
+            started = time.perf_counter()
+            conn.execute(statement, {"rows": rows, "stale": stale} if "%(" in statement else None)
+            print(f"-- seed {time.perf_counter() - started:6.1f}s  {' '.join(statement.split())[:60]}")
+
+
+def main(args: argparse.Namespace) -> None:
+    if not args.skip_seed:
+        seed(args.dsn, args.rows, args.stale)
+    engine = create_engine(args.dsn.replace("postgresql://", "postgresql+psycopg://", 1))
+    with Session(engine) as db:
+        print("bloat before:", table_bloat(db, "refresh_tokens"))
+        result = purge_table(
+            db,
+            "refresh_tokens",
+            batch_size=args.batch_size,
+            batch_budget_ms=args.batch_budget_ms,
+            run_budget_seconds=args.run_budget_seconds,
+            retention_days=7,
+        )
+        print("purge:", result)
+        # pg_stat counters are updated asynchronously; give the collector a moment.
+        time.sleep(1)
+        print("bloat after:", table_bloat(db, "refresh_tokens"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", required=True)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--stale", type=float, default=0.8)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--batch-budget-ms", type=int, default=500)
+    parser.add_argument("--run-budget-seconds", type=float, default=3600)
+    parser.add_argument("--skip-seed", action="store_true")
+    main(parser.parse_args())
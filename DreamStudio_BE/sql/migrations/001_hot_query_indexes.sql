@@ -0,0 +1,50 @@
+-- 001: indexes for the query shapes the API and Celery tasks run.
+--
+-- Apply after table_creation.sql with psql in autocommit mode (the default):
+--   psql -d dreamstudio -f sql/migrations/001_hot_query_indexes.sql
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so do not
+-- wrap this file in BEGIN/COMMIT or run it with --single-transaction.
+--
+-- EXPLAIN before/after on seeded data: 001_hot_query_indexes.explain.txt
+-- (regenerate with bench/explain_hot_queries.py).
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version     TEXT PRIMARY KEY,
+  applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- current_goals_for_user: g.user_id = :user_id AND g.deadline >= now()
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goals_user_deadline
+  ON goals (user_id, deadline);
+
+-- current_goals_for_user LATERAL: WHERE v.goal_id = g.id ORDER BY v.updated_at DESC LIMIT 1
+-- finalize_goal_at_deadline: latest verification for the goal
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_verifications_goal_updated
+  ON verifications (goal_id, updated_at DESC);
+
+-- sweep_overdue_goals: deadline <= now AND finalized_at IS NULL AND status IN (...)
+-- Only open goals are indexed, so the index stays small as goals finalize.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goals_open_deadline
+  ON goals (deadline)
+  WHERE finalized_at IS NULL AND status IN ('pending', 'validating');
+
+-- get_quizzes / evaluate_quiz_submission / get_verification_type
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goal_quiz_questions_goal
+  ON goal_quiz_questions (goal_id);
+
+-- finalize_goal_at_deadline: terminal ledger entry lookup by (goal_id, type)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bounty_ledger_goal_type
+  ON bounty_ledger (goal_id, type);
+
+-- login_manual: email = :email AND provider = 'password'
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auth_identities_email_provider
+  ON auth_identities (email, provider);
+
+-- distribute_weekly_pool: status = 'finalized' AND verification_status = :vs
+-- AND finalized_at in [week_start, week_end)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goals_finalized_window
+  ON goals (verification_status, finalized_at)
+  WHERE status = 'finalized';
+
+INSERT INTO schema_migrations (version) VALUES ('001_hot_query_indexes')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,31 @@
+-- 002: denormalized latest-verification pointer on goals.
+--
+-- Replaces the per-goal "ORDER BY updated_at DESC LIMIT 1" over verifications
+-- in current_goals_for_user and finalize_goal_at_deadline. Writers keep it up
+-- to date through src.helpers.latest_verification_utils; existing rows are
+-- filled by the backfill_latest_verifications Celery task after this runs.
+
+ALTER TABLE goals
+  ADD COLUMN IF NOT EXISTS latest_verification_id     UUID,
+  ADD COLUMN IF NOT EXISTS latest_verification_result TEXT
+    CHECK (latest_verification_result IN ('pending', 'approved', 'rejected')),
+  ADD COLUMN IF NOT EXISTS latest_verification_at     TIMESTAMPTZ;
+
+-- Deferred so a new verification and the goal pointing at it can be written
+-- in one flush regardless of statement order. NOT VALID + VALIDATE avoids
+-- holding the stronger lock during the scan.
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'goals_latest_verification_id_fkey') THEN
+    ALTER TABLE goals
+      ADD CONSTRAINT goals_latest_verification_id_fkey
+      FOREIGN KEY (latest_verification_id) REFERENCES verifications(id)
+      ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED NOT VALID;
+  END IF;
+END;
+$$;
+
+ALTER TABLE goals VALIDATE CONSTRAINT goals_latest_verification_id_fkey;
+
+INSERT INTO schema_migrations (version) VALUES ('002_goal_latest_verification')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,33 @@
+-- 003: outbox for transactional email.
+--
+-- Rows are written in the same transaction as the data they announce (e.g.
+-- the email verification token) and sent by the drain_email_outbox Celery
+-- task with SES bulk templated sends. template_data is cleared once a row
+-- reaches a terminal status so raw tokens do not linger.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+  id               UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  template         TEXT NOT NULL,
+  recipient        CITEXT NOT NULL,
+  template_data    JSONB,
+  status           TEXT NOT NULL DEFAULT 'pending'
+                   CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+  attempts         INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  last_error       TEXT,
+  ses_message_id   TEXT,
+  created_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+  sent_at          TIMESTAMPTZ
+);
+
+-- drain_email_outbox: due rows that are pending or whose send lease expired.
+CREATE INDEX IF NOT EXISTS ix_email_outbox_due
+  ON email_outbox (next_attempt_at)
+  WHERE status IN ('pending', 'sending');
+
+INSERT INTO schema_migrations (version) VALUES ('003_email_outbox')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,23 @@
+-- 004: transactional outbox for Celery task dispatch.
+--
+-- Routes add a row in the same transaction as the data the task works on;
+-- the relay_task_outbox task publishes due rows to the Redis broker in
+-- pipelined batches and deletes them in the transaction that claimed them.
+-- Rows are short-lived, so the table is vacuumed aggressively.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS task_outbox (
+  id          BIGSERIAL PRIMARY KEY,
+  task_id     UUID NOT NULL DEFAULT gen_random_uuid(),
+  task_name   TEXT NOT NULL,
+  args        JSONB NOT NULL DEFAULT '[]'::jsonb,
+  kwargs      JSONB NOT NULL DEFAULT '{}'::jsonb,
+  eta         TIMESTAMPTZ,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+) WITH (autovacuum_vacuum_scale_factor = 0.0, autovacuum_vacuum_threshold = 1000);
+
+INSERT INTO schema_migrations (version) VALUES ('004_task_outbox')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,66 @@
+-- 005: versions for conditional GETs on polled per-user reads.
+--
+-- getcurrentgoals builds its ETag from a per-user counter that statement-level
+-- triggers bump on every write to that user's goals, whichever code path
+-- (route, Celery task, raw SQL) made it. /user/profile uses users.updated_at,
+-- which a trigger now sets on every real change instead of relying on the
+-- ORM's onupdate.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS user_goal_versions (
+  user_id  UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  version  BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION bump_user_goal_versions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  -- One upsert per statement; users in id order so concurrent batch writes
+  -- take the version row locks in the same order. The join skips users
+  -- being deleted: their goals go with them by cascade, and a version row
+  -- for them would fail the delete on the foreign key.
+  INSERT INTO user_goal_versions (user_id, version)
+  SELECT DISTINCT c.user_id, 1
+  FROM changed_goals c
+  JOIN users u ON u.id = c.user_id
+  ORDER BY c.user_id
+  ON CONFLICT (user_id) DO UPDATE SET version = user_goal_versions.version + 1;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS goals_bump_version_insert ON goals;
+CREATE TRIGGER goals_bump_version_insert
+  AFTER INSERT ON goals REFERENCING NEW TABLE AS changed_goals
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_user_goal_versions();
+
+DROP TRIGGER IF EXISTS goals_bump_version_update ON goals;
+CREATE TRIGGER goals_bump_version_update
+  AFTER UPDATE ON goals REFERENCING NEW TABLE AS changed_goals
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_user_goal_versions();
+
+DROP TRIGGER IF EXISTS goals_bump_version_delete ON goals;
+CREATE TRIGGER goals_bump_version_delete
+  AFTER DELETE ON goals REFERENCING OLD TABLE AS changed_goals
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_user_goal_versions();
+
+CREATE OR REPLACE FUNCTION touch_users_updated_at() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  IF NEW IS DISTINCT FROM OLD THEN
+    NEW.updated_at := clock_timestamp();
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS users_touch_updated_at ON users;
+CREATE TRIGGER users_touch_updated_at
+  BEFORE UPDATE ON users
+  FOR EACH ROW EXECUTE FUNCTION touch_users_updated_at();
+
+INSERT INTO schema_migrations (version) VALUES ('005_user_data_versions')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,25 @@
+-- 006: covering index for keyset-paginated goal history.
+--
+-- Apply with psql in autocommit mode (CREATE/DROP INDEX CONCURRENTLY), as
+-- with 001.
+--
+-- goal_history_page: user_id = :user_id AND (deadline, id) < (:deadline, :id)
+-- ORDER BY deadline DESC, id DESC LIMIT n, optionally filtered on status,
+-- verification_status and goal_type_id. Every column the page returns except
+-- title is in the index, so a page is one range scan plus a heap fetch per
+-- returned row, however many goals the user has. title is unbounded and
+-- would push index rows past the B-tree row size limit (migration 010). It
+-- also serves current_goals_for_user/current_goals_version
+-- (user_id = :user_id AND deadline >= now()), which makes
+-- ix_goals_user_deadline redundant.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goals_user_deadline_id_covering
+  ON goals (user_id, deadline, id)
+  INCLUDE (status, verification_status, goal_type_id, bounty_amount,
+           finalized_at, created_at, latest_verification_id,
+           latest_verification_result, latest_verification_at);
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_goals_user_deadline;
+
+INSERT INTO schema_migrations (version) VALUES ('006_goal_history_index')
+ON CONFLICT (version) DO NOTHING;
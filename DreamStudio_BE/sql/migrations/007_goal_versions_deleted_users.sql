@@ -0,0 +1,28 @@
+-- 007: skip goal version bumps for users being deleted.
+--
+-- Deleting a user cascades to their goals, and the 005 delete trigger then
+-- tried to upsert a user_goal_versions row for the user that no longer
+-- exists, failing the delete on the foreign key. 005 now creates the fixed
+-- function itself; this replaces it on databases that ran the earlier 005.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION bump_user_goal_versions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  -- One upsert per statement; users in id order so concurrent batch writes
+  -- take the version row locks in the same order.
+  INSERT INTO user_goal_versions (user_id, version)
+  SELECT DISTINCT c.user_id, 1
+  FROM changed_goals c
+  JOIN users u ON u.id = c.user_id
+  ORDER BY c.user_id
+  ON CONFLICT (user_id) DO UPDATE SET version = user_goal_versions.version + 1;
+  RETURN NULL;
+END;
+$$;
+
+INSERT INTO schema_migrations (version) VALUES ('007_goal_versions_deleted_users')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
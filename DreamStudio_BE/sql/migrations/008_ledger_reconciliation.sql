@@ -0,0 +1,45 @@
+-- 008: bounty ledger reconciliation.
+--
+-- Apply with psql in autocommit mode (CREATE INDEX CONCURRENTLY), as with
+-- 001.
+--
+-- The reconcile_bounty_ledger task compares users.bounty_balance with the
+-- sum of each user's ledger entries and records mismatches in
+-- ledger_discrepancies. ledger_user_totals keeps each user's ledger sum up
+-- to the last run's high-water mark, so an incremental run only reads
+-- ledger rows created after it.
+
+CREATE TABLE IF NOT EXISTS ledger_reconciliation_runs (
+  id               BIGSERIAL PRIMARY KEY,
+  mode             TEXT NOT NULL CHECK (mode IN ('full', 'incremental')),
+  started_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+  finished_at      TIMESTAMPTZ,
+  -- Ledger rows created at or before this are included in ledger_user_totals.
+  high_water_mark  TIMESTAMPTZ NOT NULL,
+  users_checked    BIGINT NOT NULL DEFAULT 0,
+  ledger_rows      BIGINT NOT NULL DEFAULT 0,
+  discrepancies    BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS ledger_user_totals (
+  user_id         UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  ledger_balance  BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ledger_discrepancies (
+  id                BIGSERIAL PRIMARY KEY,
+  run_id            BIGINT NOT NULL REFERENCES ledger_reconciliation_runs(id) ON DELETE CASCADE,
+  user_id           UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  recorded_balance  BIGINT NOT NULL,
+  ledger_balance    BIGINT NOT NULL,
+  created_at        TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_ledger_discrepancies_run ON ledger_discrepancies (run_id);
+
+-- Incremental runs: created_at > :high_water_mark.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bounty_ledger_created_at
+  ON bounty_ledger (created_at);
+
+INSERT INTO schema_migrations (version) VALUES ('008_ledger_reconciliation')
+ON CONFLICT (version) DO NOTHING;
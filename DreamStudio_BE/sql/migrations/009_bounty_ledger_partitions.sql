@@ -0,0 +1,119 @@
+-- 009: monthly range partitions for bounty_ledger, plus balance snapshots.
+--
+-- Apply with psql in autocommit mode (CREATE INDEX CONCURRENTLY), as with
+-- 001; the file uses psql's \if, so it must be run through psql.
+--
+-- The existing table is not copied. It becomes the partition
+-- bounty_ledger_legacy, holding everything before the first of next month
+-- (UTC); new monthly partitions start there. A validated CHECK constraint
+-- lets ATTACH skip scanning it, and the unique (id, created_at) index built
+-- here becomes its piece of the new primary key, so the only exclusive lock
+-- is the short rename-and-attach transaction at the end (a DO block runs as
+-- one transaction).
+--
+-- The maintain_bounty_ledger_partitions task then keeps partitions created
+-- ahead of time, writes bounty_balance_snapshots at each closed partition
+-- boundary, and detaches expired partitions into the ledger_archive schema.
+
+CREATE SCHEMA IF NOT EXISTS ledger_archive;
+
+-- Each user's ledger sum over entries created before period_end.
+CREATE TABLE IF NOT EXISTS bounty_balance_snapshots (
+  period_end      TIMESTAMPTZ NOT NULL,
+  user_id         UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  ledger_balance  BIGINT NOT NULL,
+  PRIMARY KEY (period_end, user_id)
+);
+
+-- A partitioned table cannot be indexed concurrently, so skip this on rerun.
+SELECT relkind = 'r' AS ledger_unpartitioned
+FROM pg_class WHERE oid = 'bounty_ledger'::regclass \gset
+\if :ledger_unpartitioned
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS bounty_ledger_id_created_at_key
+  ON bounty_ledger (id, created_at);
+\endif
+
+DO $$
+DECLARE
+  boundary TIMESTAMPTZ := date_trunc('month', now(), 'UTC') + interval '1 month';
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = 'bounty_ledger'::regclass) = 'r'
+     AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'bounty_ledger_legacy_range') THEN
+    EXECUTE format(
+      'ALTER TABLE bounty_ledger ADD CONSTRAINT bounty_ledger_legacy_range CHECK (created_at < %L) NOT VALID',
+      boundary
+    );
+  END IF;
+END;
+$$;
+
+-- Scans the table without blocking writes.
+DO $$
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = 'bounty_ledger'::regclass) = 'r' THEN
+    ALTER TABLE bounty_ledger VALIDATE CONSTRAINT bounty_ledger_legacy_range;
+  END IF;
+END;
+$$;
+
+DO $$
+DECLARE
+  boundary TIMESTAMPTZ;
+  month_start TIMESTAMPTZ;
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = 'bounty_ledger'::regclass) = 'p' THEN
+    RETURN;
+  END IF;
+
+  SELECT (regexp_match(pg_get_constraintdef(oid), '''([^'']+)'''))[1]::timestamptz
+  INTO boundary
+  FROM pg_constraint WHERE conname = 'bounty_ledger_legacy_range';
+
+  ALTER TABLE bounty_ledger RENAME TO bounty_ledger_legacy;
+  -- The partitioned primary key must include created_at; nothing references
+  -- bounty_ledger(id), so the old key can go.
+  ALTER TABLE bounty_ledger_legacy DROP CONSTRAINT bounty_ledger_pkey;
+  ALTER TABLE bounty_ledger_legacy
+    ADD CONSTRAINT bounty_ledger_id_created_at_key PRIMARY KEY USING INDEX bounty_ledger_id_created_at_key;
+  ALTER INDEX ix_bounty_ledger_goal_type RENAME TO ix_bounty_ledger_legacy_goal_type;
+  ALTER INDEX ix_bounty_ledger_created_at RENAME TO ix_bounty_ledger_legacy_created_at;
+
+  CREATE TABLE bounty_ledger (
+    id          UUID NOT NULL DEFAULT gen_random_uuid(),
+    user_id     UUID NOT NULL,
+    goal_id     UUID,
+    amount      INTEGER NOT NULL,
+    type        TEXT NOT NULL,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT bounty_ledger_pkey PRIMARY KEY (id, created_at),
+    CONSTRAINT bounty_ledger_type_check
+      CHECK (type = ANY (ARRAY['fund', 'hold', 'release', 'forfeit', 'refund'])),
+    CONSTRAINT bounty_ledger_user_id_fkey
+      FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    CONSTRAINT bounty_ledger_goal_id_fkey
+      FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE SET NULL
+  ) PARTITION BY RANGE (created_at);
+
+  CREATE INDEX ix_bounty_ledger_goal_type ON bounty_ledger (goal_id, type);
+  CREATE INDEX ix_bounty_ledger_created_at ON bounty_ledger (created_at);
+
+  EXECUTE format(
+    'ALTER TABLE bounty_ledger ATTACH PARTITION bounty_ledger_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+    boundary
+  );
+
+  -- The maintenance task keeps creating these ahead; start with three months.
+  FOR i IN 0..2 LOOP
+    month_start := boundary + make_interval(months => i);
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF bounty_ledger FOR VALUES FROM (%L) TO (%L)',
+      'bounty_ledger_p' || to_char(month_start AT TIME ZONE 'UTC', 'YYYYMM'),
+      month_start,
+      month_start + interval '1 month'
+    );
+  END LOOP;
+END;
+$$;
+
+INSERT INTO schema_migrations (version) VALUES ('009_bounty_ledger_partitions')
+ON CONFLICT (version) DO NOTHING;
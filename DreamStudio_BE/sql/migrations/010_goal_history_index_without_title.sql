@@ -0,0 +1,32 @@
+-- 010: rebuild ix_goals_user_deadline_id_covering without title.
+--
+-- Apply with psql in autocommit mode (CREATE/DROP INDEX CONCURRENTLY), as
+-- with 001; the file uses psql's \if, so it must be run through psql.
+--
+-- goals.title has no length limit, and a B-tree index row cannot exceed
+-- 2704 bytes, so with title in INCLUDE any goal with a title over roughly
+-- 2.6 kB failed to insert. Databases that applied the original 006 get the
+-- index rebuilt under a temporary name and swapped in, so goal history
+-- never runs without it; fresh databases already have the new definition.
+
+SELECT NOT EXISTS (
+  SELECT 1 FROM pg_indexes
+  WHERE indexname = 'ix_goals_user_deadline_id_covering' AND indexdef NOT LIKE '%title%'
+) AS covering_index_needs_rebuild \gset
+\if :covering_index_needs_rebuild
+-- Left behind (possibly invalid) if an earlier run was interrupted.
+DROP INDEX CONCURRENTLY IF EXISTS ix_goals_user_deadline_id_covering_new;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goals_user_deadline_id_covering_new
+  ON goals (user_id, deadline, id)
+  INCLUDE (status, verification_status, goal_type_id, bounty_amount,
+           finalized_at, created_at, latest_verification_id,
+           latest_verification_result, latest_verification_at);
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_goals_user_deadline_id_covering;
+
+ALTER INDEX ix_goals_user_deadline_id_covering_new RENAME TO ix_goals_user_deadline_id_covering;
+\endif
+
+INSERT INTO schema_migrations (version) VALUES ('010_goal_history_index_without_title')
+ON CONFLICT (version) DO NOTHING;
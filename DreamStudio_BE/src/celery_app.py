@@ -1,6 +1,9 @@
+import json
+import logging
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun, worker_process_init
 from src.config import settings
 
 
@@ -13,9 +16,16 @@ celery_app = Celery(
     include=[
         "src.tasks.deadline_tasks",
         "src.tasks.distribution_tasks",
+        "src.tasks.email_tasks",
         "src.tasks.evaluations",
+        "src.tasks.latest_verification_tasks",
+        "src.tasks.ledger_reconciliation",
+        "src.tasks.ledger_partitions",
         "src.tasks.maintenance_cost_tasks",
         "src.tasks.quiz_tasks",
+        "src.tasks.refresh_token_audit",
+        "src.tasks.task_outbox_relay",
+        "src.tasks.token_cleanup",
         "src.tasks.verification_cleanup",
     ],
 )
@@ -26,18 +36,109 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,
     task_reject_on_worker_lost=True,
+    # Email sending has its own queue so SES slowness never delays goal work;
+    # run a worker with -Q email (or add it to an existing worker's -Q list).
+    # The task outbox relay also gets its own queue so a backlog of slow goal
+    # tasks cannot hold back the dispatch of new ones; run a worker with
+    # -Q outbox. The goal deadline dispatcher shares it for the same reason.
+    task_routes={
+        "src.tasks.email_tasks.*": {"queue": "email"},
+        "src.tasks.task_outbox_relay.*": {"queue": "outbox"},
+        "src.tasks.deadline_tasks.dispatch_due_goal_deadlines": {"queue": "outbox"},
+    },
 )
 
 
+@worker_process_init.connect
+def _reset_db_pools_after_fork(**kwargs):
+    # Prefork children inherit the parent's pooled sockets; drop them without
+    # closing so each child opens its own connections.
+    from src.helpers.db import engine, async_engine, replica_engines
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    for replica_engine in replica_engines:
+        replica_engine.sync_engine.dispose(close=False)
+
+    from src.helpers.goal_type_registry import goal_type_registry
+
+    goal_type_registry.start()
+
+
+@task_prerun.connect
+def _start_query_stats(task_id=None, task=None, **kwargs):
+    from src.helpers.query_stats import begin_tracking
+
+    task.request.query_stats = begin_tracking()
+
+
+@task_postrun.connect
+def _log_query_stats(task_id=None, task=None, state=None, **kwargs):
+    from src.helpers.query_stats import end_tracking
+
+    tracked = getattr(task.request, "query_stats", None)
+    if tracked is None:
+        return
+    stats, token = tracked
+    end_tracking(token)
+    if not stats.count:
+        return
+    summary = stats.summary()
+    log = logging.warning if summary["n_plus_one"] else logging.info
+    log("db_queries %s", json.dumps({"task": task.name, "task_id": task_id, "state": state, **summary}))
+
+
 celery_app.conf.beat_schedule = {
-    "sweep-overdue-goals-every-minute": {
+    "dispatch-due-goal-deadlines-every-second": {
+        "task": "src.tasks.deadline_tasks.dispatch_due_goal_deadlines",
+        "schedule": 1.0,
+        "options": {"expires": 5},
+    },
+    # Backstop for deadlines lost from Redis; the dispatcher handles the rest.
+    # Several sweeps may overlap: each claims its own chunks.
+    "sweep-overdue-goals-hourly": {
         "task": "src.tasks.deadline_tasks.sweep_overdue_goals",
-        "schedule": crontab(minute="*"),
+        "schedule": crontab(minute=45),
     },
     "cleanup-abandoned-photo-verifications-hourly": {
         "task": "src.tasks.verification_cleanup.cleanup_abandoned_photo_verifications",
         "schedule": crontab(minute=0, hour="*/1"),
     },
+    "check-latest-verification-pointers-daily": {
+        "task": "src.tasks.latest_verification_tasks.check_latest_verification_consistency",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    "flush-refresh-token-audit-every-10-seconds": {
+        "task": "src.tasks.refresh_token_audit.flush_refresh_token_audit",
+        "schedule": 10.0,
+    },
+    "purge-stale-tokens-hourly": {
+        "task": "src.tasks.token_cleanup.purge_stale_tokens",
+        "schedule": crontab(minute=15),
+    },
+    "drain-email-outbox-every-5-seconds": {
+        "task": "src.tasks.email_tasks.drain_email_outbox",
+        "schedule": 5.0,
+    },
+    "relay-task-outbox-every-second": {
+        "task": "src.tasks.task_outbox_relay.relay_task_outbox",
+        "schedule": 1.0,
+        # A run that is still queued after a few seconds is superseded by newer ones.
+        "options": {"expires": 5},
+    },
+    "reconcile-bounty-ledger-hourly": {
+        "task": "src.tasks.ledger_reconciliation.reconcile_bounty_ledger",
+        "schedule": crontab(minute=50),
+    },
+    "reconcile-bounty-ledger-full-weekly": {
+        "task": "src.tasks.ledger_reconciliation.reconcile_bounty_ledger",
+        "schedule": crontab(minute=20, hour=4, day_of_week="sun"),
+        "kwargs": {"full": True},
+    },
+    "maintain-bounty-ledger-partitions-daily": {
+        "task": "src.tasks.ledger_partitions.maintain_bounty_ledger_partitions",
+        "schedule": crontab(minute=10, hour=2),
+    },
     "run-weekly-maintenance-and-distribution": {
         "task": "src.tasks.distribution_tasks.run_weekly_maintenance_and_distribution",
         "schedule": crontab(minute=5, hour=0, day_of_week="mon"),
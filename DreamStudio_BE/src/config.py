@@ -1,4 +1,5 @@
 import os
+from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
 from typing import Literal, Optional
@@ -25,11 +26,25 @@ class Settings(BaseSettings):
 
     google_client_id_web: str
     google_client_secret_web: str
+    google_certs_url: str = Field("https://www.googleapis.com/oauth2/v1/certs", alias="GOOGLE_CERTS_URL")
 
     secret_key: str = Field(..., alias="SECRET_KEY")
     algorithm: str = Field("HS256", alias="ALGORITHM")
     access_token_expire_minutes: int = Field(15, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_days: int = Field(30, alias="REFRESH_TOKEN_EXPIRE_DAYS")
+    # Access tokens whose signature was verified recently, kept until their exp.
+    access_token_cache_size: int = Field(4096, alias="ACCESS_TOKEN_CACHE_SIZE")
+    # argon2 runs in a process pool; requests beyond max_pending get a 503.
+    # Keep max_pending well under the request threadpool size (40).
+    password_hash_workers: int = Field(2, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(8, alias="PASSWORD_HASH_MAX_PENDING")
+    # Pool processes run at lower CPU priority than the request workers.
+    password_hash_worker_niceness: int = Field(10, alias="PASSWORD_HASH_WORKER_NICENESS")
+    # argon2id cost; pick per host with `python -m src.helpers.password_calibration`.
+    # Hashes made with other parameters are upgraded on the next login.
+    argon2_time_cost: int = Field(3, alias="ARGON2_TIME_COST")
+    argon2_memory_cost: int = Field(65536, alias="ARGON2_MEMORY_COST")  # KiB
+    argon2_parallelism: int = Field(4, alias="ARGON2_PARALLELISM")
 
     openai_api_key: str = Field(..., alias="OPENAI_API_KEY")
     openai_admin_api_key: Optional[str] = Field(None, alias="OPENAI_ADMIN_API_KEY")
@@ -55,6 +70,9 @@ class Settings(BaseSettings):
     ses_access_key: str = Field(..., alias="SES_ACCESS_KEY")
     ses_secret_key: str = Field(..., alias="SES_SECRET_KEY")
     sender_email: str = Field(..., alias="SENDER_EMAIL")
+    ses_verify_email_template: str = Field("GoalStudioVerifyEmail", alias="SES_VERIFY_EMAIL_TEMPLATE")
+    email_outbox_batch_size: int = Field(200, alias="EMAIL_OUTBOX_BATCH_SIZE")
+    email_outbox_max_attempts: int = Field(5, alias="EMAIL_OUTBOX_MAX_ATTEMPTS")
 
     postgres_user: str = Field(..., alias="POSTGRES_USER")
     postgres_password: str = Field(..., alias="POSTGRES_PASSWORD")
@@ -62,6 +80,76 @@ class Settings(BaseSettings):
     postgres_port: int = Field(5432, alias="POSTGRES_PORT")
     postgres_db: str = Field(..., alias="POSTGRES_DB")
 
+    # Connection pools are per process: uvicorn workers use the "api" sizing,
+    # Celery workers should run with DB_POOL_ROLE=celery.
+    db_pool_role: Literal["api", "celery"] = Field("api", alias="DB_POOL_ROLE")
+    db_pool_size: int = Field(5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(5, alias="DB_MAX_OVERFLOW")
+    celery_db_pool_size: int = Field(1, alias="CELERY_DB_POOL_SIZE")
+    celery_db_max_overflow: int = Field(1, alias="CELERY_DB_MAX_OVERFLOW")
+    db_pool_timeout: int = Field(10, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(1800, alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(True, alias="DB_POOL_PRE_PING")
+    db_pgbouncer_transaction_mode: bool = Field(False, alias="DB_PGBOUNCER_TRANSACTION_MODE")
+    db_pool_stats_log_interval: int = Field(60, alias="DB_POOL_STATS_LOG_INTERVAL")
+
+    # Comma-separated host[:port] list of streaming replicas for read-only routes.
+    postgres_replica_hosts: str = Field("", alias="POSTGRES_REPLICA_HOSTS")
+    replica_max_lag_seconds: float = Field(5.0, alias="REPLICA_MAX_LAG_SECONDS")
+    replica_lag_check_interval: float = Field(2.0, alias="REPLICA_LAG_CHECK_INTERVAL")
+    read_your_writes_window_seconds: int = Field(10, alias="READ_YOUR_WRITES_WINDOW_SECONDS")
+
+    redis_url: Optional[str] = Field(None, alias="REDIS_URL")
+
+    # src.helpers.goal_type_registry: per-process goal type snapshot, reloaded
+    # on pub/sub invalidation and at least this often.
+    goal_type_registry_max_age_seconds: float = Field(300.0, alias="GOAL_TYPE_REGISTRY_MAX_AGE_SECONDS")
+    goal_type_registry_miss_reload_seconds: float = Field(5.0, alias="GOAL_TYPE_REGISTRY_MISS_RELOAD_SECONDS")
+
+    # "redis" keeps live refresh tokens in Redis and writes issuance/revocation
+    # to refresh_tokens in batches (src.tasks.refresh_token_audit).
+    refresh_token_store: Literal["postgres", "redis"] = Field("postgres", alias="REFRESH_TOKEN_STORE")
+    # When the store was switched to "redis": live refresh_tokens rows created
+    # before it are still accepted once and moved into Redis. Unset, only
+    # tokens already in Redis are accepted.
+    refresh_token_redis_cutover: Optional[datetime] = Field(None, alias="REFRESH_TOKEN_REDIS_CUTOVER")
+    refresh_token_audit_batch_size: int = Field(500, alias="REFRESH_TOKEN_AUDIT_BATCH_SIZE")
+
+    # src.tasks.token_cleanup: revoked/used/expired token rows are kept this
+    # long (so replays still get a precise error), then deleted in batches.
+    token_purge_retention_days: int = Field(7, alias="TOKEN_PURGE_RETENTION_DAYS")
+    token_purge_batch_size: int = Field(5000, alias="TOKEN_PURGE_BATCH_SIZE")
+    token_purge_batch_budget_ms: int = Field(500, alias="TOKEN_PURGE_BATCH_BUDGET_MS")
+    token_purge_run_budget_seconds: int = Field(300, alias="TOKEN_PURGE_RUN_BUDGET_SECONDS")
+
+    # src.tasks.task_outbox_relay: Celery messages written by routes are
+    # published to the broker this many per pipelined round trip.
+    task_outbox_batch_size: int = Field(500, alias="TASK_OUTBOX_BATCH_SIZE")
+    task_outbox_run_budget_seconds: float = Field(5.0, alias="TASK_OUTBOX_RUN_BUDGET_SECONDS")
+
+    # src.tasks.deadline_tasks.dispatch_due_goal_deadlines: due goals are
+    # claimed from the deadline sorted set this many at a time; a claim not
+    # published within the lease (the worker died) is claimed again.
+    goal_deadline_dispatch_batch_size: int = Field(500, alias="GOAL_DEADLINE_DISPATCH_BATCH_SIZE")
+    goal_deadline_claim_lease_seconds: float = Field(60.0, alias="GOAL_DEADLINE_CLAIM_LEASE_SECONDS")
+    # Goals finalized per transaction by the chunked finalizer, and how long
+    # one sweep keeps claiming chunks.
+    goal_finalize_batch_size: int = Field(200, alias="GOAL_FINALIZE_BATCH_SIZE")
+    goal_finalize_run_budget_seconds: float = Field(30.0, alias="GOAL_FINALIZE_RUN_BUDGET_SECONDS")
+
+    # src.tasks.ledger_reconciliation: rows fetched per server-side cursor
+    # round trip, and how far behind now the high-water mark is kept so
+    # transactions still in flight are read again next run.
+    ledger_reconciliation_batch_size: int = Field(5000, alias="LEDGER_RECONCILIATION_BATCH_SIZE")
+    ledger_reconciliation_lag_seconds: int = Field(600, alias="LEDGER_RECONCILIATION_LAG_SECONDS")
+    # src.tasks.ledger_partitions: monthly bounty_ledger partitions are
+    # created this many months ahead, and detached into ledger_archive after
+    # this many months. A partition boundary's balance snapshot waits for the
+    # lag so transactions that started before the boundary have committed.
+    ledger_partition_months_ahead: int = Field(3, alias="LEDGER_PARTITION_MONTHS_AHEAD")
+    ledger_partition_retention_months: int = Field(24, alias="LEDGER_PARTITION_RETENTION_MONTHS")
+    ledger_snapshot_lag_seconds: int = Field(3600, alias="LEDGER_SNAPSHOT_LAG_SECONDS")
+
     @computed_field
     @property
     def database_url(self) -> str:
@@ -71,6 +159,22 @@ class Settings(BaseSettings):
             f"{self.postgres_port}/{self.postgres_db}"
         )
 
+    @computed_field
+    @property
+    def replica_database_urls(self) -> list[str]:
+        urls = []
+        for entry in self.postgres_replica_hosts.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            host, _, port = entry.partition(":")
+            urls.append(
+                f"postgresql+psycopg://{self.postgres_user}:"
+                f"{self.postgres_password}@{host}:"
+                f"{port or self.postgres_port}/{self.postgres_db}"
+            )
+        return urls
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -4,7 +4,7 @@ from openai import AsyncOpenAI
 from sqlalchemy.orm import Session
 from src.config import settings
 from src.helpers.db import SessionLocal, get_db
-from src.models import goal_schemas
+from src.helpers.goal_type_registry import goal_type_registry
 import logging
 
 client = AsyncOpenAI(api_key=settings.openai_api_key)
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/api/v1/openai", tags=["gpt"])
 
 async def generate_questions(user_input: str, goal_type_id: str, db: Session):
 
-    goal_type = db.get(goal_schemas.GoalType, goal_type_id)
+    goal_type = await goal_type_registry.get_async(goal_type_id)
     if goal_type is None:
         logging.warning("Goal Type not found %s", goal_type_id)
         #raise HTTPException(status_code=404, detail="Goal type not found") #what should the status code be?
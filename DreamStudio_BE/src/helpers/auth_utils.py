@@ -2,13 +2,16 @@ from ..config import settings
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from jose import jwt, JWTError, ExpiredSignatureError
 from uuid import UUID
 from sqlalchemy.orm import Session
+from collections import OrderedDict
+from threading import Lock
 import secrets
 import hashlib
-from ..models.auth_schemas import RefreshToken
+import time
+from ..models.auth_schemas import RefreshToken, User
 
 oauth2_scheme = OAuth2PasswordBearer("/api/v1/auth/manual/login")
 
@@ -45,12 +48,69 @@ def create_refresh_token(db: Session, user_id: str) -> str:
     return new_refresh_token
 
 
-def validate_access_token(token: str = Depends(oauth2_scheme)):
+class VerifiedTokenCache:
+    """
+    LRU of access tokens that already passed signature verification, mapped to
+    their claims. Entries are only served until the token's exp.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            if claims["exp"] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        if self._maxsize <= 0 or not isinstance(claims.get("exp"), (int, float)):
+            return
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.access_token_cache_size)
+
+
+def decode_access_token(token: str) -> dict:
+    """Verified claims for token; raises JWTError / ExpiredSignatureError."""
+    claims = verified_tokens.get(token)
+    if claims is None:
+        #jose.jwt will check if it is expired. verify_exp: False will not automatically check
+        claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        verified_tokens.put(token, claims)
+    return claims
+
+
+def request_access_claims(request: Request, token: str) -> dict:
+    """Verify the bearer token at most once per request; claims live on request.state."""
+    cached = getattr(request.state, "access_token_claims", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    claims = decode_access_token(token)
+    request.state.access_token_claims = (token, claims)
+    return claims
+
+
+# async so it never waits for a threadpool slot behind slow sync routes.
+async def validate_access_token(request: Request, token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token,
-                             settings.secret_key,
-                             algorithms=["HS256"]
-        )  #jose.jwt will check if it is expired. verify_exp: False will not automatically check
+        payload = request_access_claims(request, token)
         user_id = UUID(payload.get("sub"))
         return user_id
 
@@ -58,4 +118,11 @@ def validate_access_token(token: str = Depends(oauth2_scheme)):
         raise HTTPException(status_code=401, detail="Token expired")
     
     except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def require_admin(db: Session, user_id: UUID) -> User:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return user
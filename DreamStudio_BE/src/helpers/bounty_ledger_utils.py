@@ -1,7 +1,49 @@
 from uuid import UUID
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from src.models import auth_schemas
-from src.models.bounty_schemas import BountyLedger
+
+LedgerEntry = tuple[UUID, UUID | None, str, int]
+
+
+def balance_delta(ledger_type: str, bounty_amount: int) -> int:
+    """Change to available balance for one ledger entry."""
+    # Hold deducts at goal creation. Forfeit records terminal loss but does not
+    # change available balance a second time.
+    if ledger_type in ("fund", "release", "refund"):
+        return bounty_amount
+    if ledger_type == "forfeit":
+        return 0
+    return -bounty_amount
+
+
+# balance_delta over bounty_ledger columns, for set-based sums.
+BALANCE_DELTA_SQL = (
+    "CASE WHEN type IN ('fund', 'release', 'refund') THEN amount "
+    "WHEN type = 'forfeit' THEN 0 ELSE -amount END"
+)
+
+
+# The balance change and its ledger row in one statement. The conditional
+# UPDATE takes the user's row lock and checks the new balance atomically, so
+# concurrent writers (webhook funding, holds, payouts) queue on the row
+# instead of overwriting each other's arithmetic. No row comes back when the
+# user is missing or would go negative.
+APPLY_ENTRY_SQL = text(
+    """
+WITH updated AS (
+  UPDATE users
+  SET bounty_balance = bounty_balance + :delta
+  WHERE id = :user_id AND bounty_balance + :delta >= 0
+  RETURNING id, bounty_balance
+)
+INSERT INTO bounty_ledger (user_id, goal_id, type, amount)
+SELECT id, :goal_id, :ledger_type, :bounty_amount FROM updated
+RETURNING (SELECT bounty_balance FROM updated)
+    """
+)
+
+USER_EXISTS_SQL = text("SELECT 1 FROM users WHERE id = :user_id")
+
 
 def apply_bounty_ledger_entry(
     user_id: UUID,
@@ -9,30 +51,102 @@ def apply_bounty_ledger_entry(
     ledger_type: str,
     bounty_amount: int,
     db: Session,
-):
-    user = db.query(auth_schemas.User).filter(auth_schemas.User.id == user_id).first()
-    if not user:
-        raise ValueError("User not found for bounty ledger entry")
+) -> int:
+    """Apply one ledger entry and return the user's new balance."""
+    balance = db.execute(
+        APPLY_ENTRY_SQL,
+        {
+            "user_id": user_id,
+            "goal_id": goal_id,
+            "ledger_type": ledger_type,
+            "bounty_amount": bounty_amount,
+            "delta": balance_delta(ledger_type, bounty_amount),
+        },
+    ).scalar()
+    if balance is None:
+        if db.execute(USER_EXISTS_SQL, {"user_id": user_id}).first() is None:
+            raise ValueError("User not found for bounty ledger entry")
+        raise ValueError("Insufficient bounty balance for ledger entry")
+    return balance
 
-    
-    
-    # Hold deducts at goal creation. Forfeit records terminal loss but does not
-    # change available balance a second time.
-    if ledger_type in ("fund", "release", "refund"):
-        next_balance = user.bounty_balance + bounty_amount
-    elif ledger_type == "forfeit":
-        next_balance = user.bounty_balance
-    else:
-        next_balance = user.bounty_balance - bounty_amount
 
-    if next_balance < 0:
+# Net change per user in one statement. Users are locked in id order so
+# concurrent bulk writers cannot deadlock; a user whose balance would go
+# negative (or who does not exist) is left out of RETURNING.
+APPLY_USER_DELTAS_SQL = text(
+    """
+WITH locked AS (
+  SELECT id FROM users
+  WHERE id = ANY(CAST(:user_ids AS uuid[]))
+  ORDER BY id
+  FOR UPDATE
+)
+UPDATE users u
+SET bounty_balance = u.bounty_balance + delta.amount
+FROM unnest(CAST(:user_ids AS uuid[]), CAST(:deltas AS bigint[])) AS delta(user_id, amount)
+JOIN locked ON locked.id = delta.user_id
+WHERE u.id = delta.user_id
+  AND u.bounty_balance + delta.amount >= 0
+RETURNING u.id, u.bounty_balance
+    """
+)
+
+INSERT_LEDGER_ENTRIES_SQL = text(
+    """
+INSERT INTO bounty_ledger (user_id, goal_id, type, amount)
+SELECT * FROM unnest(
+  CAST(:user_ids AS uuid[]),
+  CAST(:goal_ids AS uuid[]),
+  CAST(:types AS text[]),
+  CAST(:amounts AS integer[])
+)
+    """
+)
+
+
+def apply_bounty_ledger_entries(entries: list[LedgerEntry], db: Session) -> dict[UUID, int]:
+    """
+    Apply many (user_id, goal_id, ledger_type, bounty_amount) entries in two
+    statements: one balance update with each user's net change, then one
+    ledger insert. Raises ValueError, before anything is inserted, if any
+    user would end up below zero; the caller rolls back. Returns each user's
+    new balance.
+    """
+    if not entries:
+        return {}
+    net: dict[UUID, int] = {}
+    for user_id, _, ledger_type, bounty_amount in entries:
+        net[user_id] = net.get(user_id, 0) + balance_delta(ledger_type, bounty_amount)
+
+    user_ids = sorted(net)
+    balances = dict(
+        db.execute(
+            APPLY_USER_DELTAS_SQL,
+            {"user_ids": user_ids, "deltas": [net[user_id] for user_id in user_ids]},
+        ).all()
+    )
+    if len(balances) < len(user_ids):
         raise ValueError("Insufficient bounty balance for ledger entry")
 
-    user.bounty_balance = next_balance
-    bounty_ledger = BountyLedger(
-        user_id=user_id,
-        goal_id=goal_id,
-        amount=bounty_amount,
-        type=ledger_type,
+    db.execute(
+        INSERT_LEDGER_ENTRIES_SQL,
+        {
+            "user_ids": [entry[0] for entry in entries],
+            "goal_ids": [entry[1] for entry in entries],
+            "types": [entry[2] for entry in entries],
+            "amounts": [entry[3] for entry in entries],
+        },
+    )
+    return balances
+
+
+def apply_bounty_holds(
+    user_id: UUID,
+    holds: list[tuple[UUID, int]],
+    db: Session,
+) -> int:
+    """Hold the bounty of several new goals for one user; returns the remaining balance."""
+    balances = apply_bounty_ledger_entries(
+        [(user_id, goal_id, "hold", amount) for goal_id, amount in holds], db
     )
-    db.add(bounty_ledger)
+    return balances[user_id]
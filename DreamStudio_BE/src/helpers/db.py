@@ -1,16 +1,55 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from src.config import get_settings
+from src.helpers.db_pool import engine_kwargs, install_pool_logging
+from src.helpers.query_stats import install_query_stats
 
-DATABASE_URL = get_settings().database_url
+settings = get_settings()
+DATABASE_URL = settings.database_url
 
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_engine(DATABASE_URL, echo=False, **engine_kwargs(settings, is_async=False))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+# psycopg 3 serves both engines from the same postgresql+psycopg URL.
+async_engine = create_async_engine(DATABASE_URL, echo=False, **engine_kwargs(settings, is_async=True))
+# expire_on_commit=False so routes can serialize ORM rows after commit
+# without triggering an implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Read-only replicas, used through src.helpers.read_routing.get_async_read_db.
+replica_engines = [
+    create_async_engine(
+        url,
+        echo=False,
+        **engine_kwargs(settings, is_async=True, name=f"{settings.db_pool_role}-replica{i}"),
+    )
+    for i, url in enumerate(settings.replica_database_urls)
+]
+
+install_pool_logging(engine, settings.db_pool_stats_log_interval)
+install_pool_logging(async_engine.sync_engine, settings.db_pool_stats_log_interval)
+for replica_engine in replica_engines:
+    install_pool_logging(replica_engine.sync_engine, settings.db_pool_stats_log_interval)
+
+install_query_stats(engine)
+install_query_stats(async_engine.sync_engine)
+for replica_engine in replica_engines:
+    install_query_stats(replica_engine.sync_engine)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
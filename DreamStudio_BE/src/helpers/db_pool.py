@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.config import Settings
+
+
+@dataclass
+class PoolStats:
+    """Checkout counters for one engine's pool, shared across pool recreation."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total_seconds: float = 0.0
+    wait_max_seconds: float = 0.0
+    last_logged_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total_seconds += waited
+            if waited > self.wait_max_seconds:
+                self.wait_max_seconds = waited
+
+
+# Keyed by the engine's pool_logging_name. Pool.recreate() (e.g. on dispose)
+# builds a fresh pool object, so counters cannot live on the pool itself.
+POOL_STATS: dict[str, PoolStats] = {}
+
+
+def _stats_for(pool: QueuePool) -> PoolStats:
+    name = pool._orig_logging_name or "default"
+    return POOL_STATS.setdefault(name, PoolStats())
+
+
+class _TimedCheckoutMixin:
+    def connect(self):
+        stats = _stats_for(self)
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        stats.record(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_kwargs(
+    settings: Settings, *, is_async: bool, name: str | None = None
+) -> dict[str, Any]:
+    """
+    create_engine/create_async_engine keyword arguments for this process role.
+
+    Every uvicorn worker and every Celery prefork child builds its own pools,
+    so the per-process numbers here multiply by the process count.
+    """
+    if settings.db_pool_role == "celery":
+        pool_size = settings.celery_db_pool_size
+        max_overflow = settings.celery_db_max_overflow
+    else:
+        pool_size = settings.db_pool_size
+        max_overflow = settings.db_max_overflow
+
+    kwargs: dict[str, Any] = {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_logging_name": name or f"{settings.db_pool_role}-{'async' if is_async else 'sync'}",
+    }
+    if settings.db_pgbouncer_transaction_mode:
+        # PgBouncer in transaction mode hands each transaction a different
+        # server connection, so server-side prepared statements cannot be reused.
+        kwargs["connect_args"] = {"prepare_threshold": None}
+    return kwargs
+
+
+def pool_snapshot(engine: Engine) -> dict[str, Any]:
+    pool = engine.pool
+    stats = _stats_for(pool)
+    with stats.lock:
+        checkouts = stats.checkouts
+        avg_wait_ms = (stats.wait_total_seconds / checkouts * 1000) if checkouts else 0.0
+        return {
+            "pool": pool._orig_logging_name,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": checkouts,
+            "timeouts": stats.timeouts,
+            "wait_avg_ms": round(avg_wait_ms, 3),
+            "wait_max_ms": round(stats.wait_max_seconds * 1000, 3),
+        }
+
+
+def install_pool_logging(engine: Engine, interval_seconds: int) -> None:
+    """Log a pool snapshot on check-in, at most once per interval."""
+    if interval_seconds <= 0:
+        return
+
+    @event.listens_for(engine, "checkin")
+    def _log_pool_stats(dbapi_connection, connection_record):
+        pool = engine.pool
+        stats = _stats_for(pool)
+        now = time.monotonic()
+        if now - stats.last_logged_at < interval_seconds:
+            return
+        stats.last_logged_at = now
+        logging.info("db_pool %s", pool_snapshot(engine))
@@ -0,0 +1,63 @@
+"""
+Goal deadlines in a Redis sorted set (member goal id, score deadline epoch).
+
+Replaces a Celery ETA message per goal, which workers held in memory until
+the deadline and Redis redelivered after every visibility timeout. Goals
+are added by the task outbox relay when it meets a finalize_goal_at_deadline
+message with an eta, so scheduling commits with the goal. The
+dispatch_due_goal_deadlines task claims due ids in batches and publishes
+their finalization.
+"""
+
+from datetime import datetime
+
+GOAL_DEADLINES_KEY = "goal_deadlines"
+# Claimed ids, scored by lease expiry, until their finalization is published.
+GOAL_DEADLINES_CLAIMED_KEY = "goal_deadlines:claimed"
+
+# Move up to ARGV[2] ids due at ARGV[1] (and claims whose lease ran out) to
+# the claimed set with lease expiry ARGV[3]; returns the claimed ids.
+CLAIM_DUE_LUA = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+local room = tonumber(ARGV[2]) - #ids
+if room > 0 then
+  local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, room)
+  for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], id)
+    table.insert(ids, id)
+  end
+end
+for _, id in ipairs(ids) do
+  redis.call('ZADD', KEYS[2], ARGV[3], id)
+end
+return ids
+"""
+
+
+def queue_goal_deadline(pipe, goal_id, deadline: datetime) -> None:
+    pipe.zadd(GOAL_DEADLINES_KEY, {str(goal_id): deadline.timestamp()})
+
+
+def unschedule_goal_deadline(redis_client, goal_id) -> bool:
+    """Drop a goal's deadline, e.g. when it is canceled; True if it was scheduled."""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zrem(GOAL_DEADLINES_KEY, str(goal_id))
+    pipe.zrem(GOAL_DEADLINES_CLAIMED_KEY, str(goal_id))
+    return any(pipe.execute())
+
+
+def claim_due_goals(redis_client, now: float, batch_size: int, lease_seconds: float) -> list[str]:
+    claimed = redis_client.eval(
+        CLAIM_DUE_LUA,
+        2,
+        GOAL_DEADLINES_KEY,
+        GOAL_DEADLINES_CLAIMED_KEY,
+        now,
+        batch_size,
+        now + lease_seconds,
+    )
+    return [goal_id.decode() if isinstance(goal_id, bytes) else goal_id for goal_id in claimed]
+
+
+def scheduled_count(redis_client) -> int:
+    return redis_client.zcard(GOAL_DEADLINES_KEY)
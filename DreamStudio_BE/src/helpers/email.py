@@ -1,7 +1,10 @@
 import boto3
+import json
 import logging
 from botocore.exceptions import ClientError
+from sqlalchemy.orm import Session
 from ..config import settings
+from ..models.email_schemas import EmailOutbox
 
 _ses = boto3.client(
     "ses",
@@ -10,34 +13,78 @@ _ses = boto3.client(
     aws_secret_access_key=settings.ses_secret_key,
 )
 
+# Outbox template key -> SES template. Placeholders are filled per recipient
+# from email_outbox.template_data.
+EMAIL_TEMPLATES = {
+    "verify_email": {
+        "TemplateName": settings.ses_verify_email_template,
+        "SubjectPart": "Verify your Goal Studio email",
+        "HtmlPart": (
+            "<p>Hi {{first_name}},</p>"
+            "<p>Click the link below to verify your email. "
+            "This link expires in 24 hours.</p>"
+            '<p><a href="{{verification_url}}">{{verification_url}}</a></p>'
+        ),
+        "TextPart": (
+            "Hi {{first_name}},\n\n"
+            "Verify your email by visiting:\n{{verification_url}}\n\n"
+            "This link expires in 24 hours."
+        ),
+    },
+}
 
-def send_verification_email(to_email: str, first_name: str, token: str) -> None:
-    verification_url = f"goalstudio://verify-email?token={token}"
-    try:
-        _ses.send_email(
-            Source=settings.sender_email,
-            Destination={"ToAddresses": [to_email]},
-            Message={
-                "Subject": {"Data": "Verify your Goal Studio email"},
-                "Body": {
-                    "Html": {
-                        "Data": (
-                            f"<p>Hi {first_name},</p>"
-                            f"<p>Click the link below to verify your email. "
-                            f"This link expires in 24 hours.</p>"
-                            f'<p><a href="{verification_url}">{verification_url}</a></p>'
-                        )
-                    },
-                    "Text": {
-                        "Data": (
-                            f"Hi {first_name},\n\n"
-                            f"Verify your email by visiting:\n{verification_url}\n\n"
-                            f"This link expires in 24 hours."
-                        )
-                    },
-                },
+# SES accepts at most 50 destinations per SendBulkTemplatedEmail call.
+SES_BULK_LIMIT = 50
+
+
+def get_ses_client():
+    return _ses
+
+
+def queue_verification_email(db: Session, to_email: str, first_name: str, token: str) -> None:
+    """Add the verification email to the outbox; it is sent once the caller commits."""
+    db.add(
+        EmailOutbox(
+            template="verify_email",
+            recipient=to_email,
+            template_data={
+                "first_name": first_name,
+                "verification_url": f"goalstudio://verify-email?token={token}",
             },
         )
-    except ClientError:
-        logging.exception("SES failed to send verification email to %s", to_email)
-        raise
+    )
+
+
+def ensure_email_templates(ses) -> None:
+    """Create or update every SES template in EMAIL_TEMPLATES."""
+    for template in EMAIL_TEMPLATES.values():
+        try:
+            ses.create_template(Template=template)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] != "AlreadyExists":
+                raise
+            ses.update_template(Template=template)
+
+
+def send_bulk_templated(ses, template: str, recipients: list[tuple[str, dict]]) -> list[dict]:
+    """
+    One SendBulkTemplatedEmail call for up to SES_BULK_LIMIT recipients.
+    Returns SES's per-destination statuses in recipient order.
+    """
+    response = ses.send_bulk_templated_email(
+        Source=settings.sender_email,
+        Template=EMAIL_TEMPLATES[template]["TemplateName"],
+        DefaultTemplateData=json.dumps({"first_name": "there"}),
+        Destinations=[
+            {
+                "Destination": {"ToAddresses": [recipient]},
+                "ReplacementTemplateData": json.dumps(data or {}),
+            }
+            for recipient, data in recipients
+        ],
+    )
+    statuses = response["Status"]
+    for (recipient, _), status in zip(recipients, statuses):
+        if status["Status"] != "Success":
+            logging.warning("SES did not accept %s email to %s: %s", template, recipient, status)
+    return statuses
@@ -0,0 +1,211 @@
+"""
+In-process registry of goal types.
+
+goal_types changes a few times a year but is read on every goal creation,
+quiz generation and photo evaluation. Each API and Celery worker process
+keeps an immutable snapshot of the table and swaps in a new one when any
+process publishes on GOAL_TYPES_CHANNEL (after changing goal types, run
+``python -m src.helpers.goal_type_registry``). The snapshot is also
+reloaded after the subscription drops and every max_age seconds, so a
+missed message only delays a change.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from src.config import settings
+from src.helpers.db import SessionLocal
+from src.helpers.redis_client import get_redis
+from src.models import goal_schemas
+
+GOAL_TYPES_CHANNEL = "goal_types:invalidate"
+
+
+@dataclass(frozen=True)
+class GoalTypeInfo:
+    id: UUID
+    name: str
+    description: str | None
+    verification_type: str
+    question_count: int | None
+    gpt_prompt: str | None
+    meta: Mapping
+
+
+@dataclass(frozen=True)
+class GoalTypeSnapshot:
+    by_id: Mapping[UUID, GoalTypeInfo]
+    ordered: tuple[GoalTypeInfo, ...]
+    loaded_at: float
+    # Changes whenever any goal type's content does; used in response ETags.
+    fingerprint: str
+
+    @classmethod
+    def build(cls, ordered: tuple[GoalTypeInfo, ...]) -> "GoalTypeSnapshot":
+        content = [
+            (info.id, info.name, info.description, info.verification_type,
+             info.question_count, info.gpt_prompt, sorted(info.meta.items()))
+            for info in ordered
+        ]
+        digest = hashlib.sha1(repr(content).encode()).hexdigest()
+        return cls(
+            by_id=MappingProxyType({info.id: info for info in ordered}),
+            ordered=ordered,
+            loaded_at=time.monotonic(),
+            fingerprint=digest[:16],
+        )
+
+
+def _load_snapshot() -> GoalTypeSnapshot:
+    db = SessionLocal()
+    try:
+        rows = db.scalars(select(goal_schemas.GoalType).order_by(goal_schemas.GoalType.created_at)).all()
+        ordered = tuple(
+            GoalTypeInfo(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                verification_type=row.verification_type,
+                question_count=row.question_count,
+                gpt_prompt=row.gpt_prompt,
+                meta=MappingProxyType(dict(row.meta or {})),
+            )
+            for row in rows
+        )
+    finally:
+        db.close()
+    return GoalTypeSnapshot.build(ordered)
+
+
+class GoalTypeRegistry:
+    """
+    Serves goal types from the current snapshot. The first read in a process
+    loads it (call start() at process startup to do that eagerly and begin
+    listening for invalidations); afterwards reads never touch the database,
+    except that an unknown id forces one reload per miss_reload_interval so a
+    goal type created moments ago is found before its message arrives.
+    Async code uses get_async/snapshot_async, which load in the threadpool so
+    a burst of unknown ids cannot block the event loop.
+    """
+
+    def __init__(self, loader=_load_snapshot, max_age: float = 300.0, miss_reload_interval: float = 5.0):
+        self._loader = loader
+        self._max_age = max_age
+        self._miss_reload_interval = miss_reload_interval
+        self._snapshot: GoalTypeSnapshot | None = None
+        self._reload_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+        self.reloads = 0
+
+    def reload(self) -> GoalTypeSnapshot:
+        with self._reload_lock:
+            self._snapshot = self._loader()
+            self.reloads += 1
+            return self._snapshot
+
+    def _reload_unless_replaced(self, seen: GoalTypeSnapshot | None) -> GoalTypeSnapshot:
+        # Callers that queued behind a reload use its result instead of
+        # loading again.
+        with self._reload_lock:
+            if self._snapshot is not seen:
+                return self._snapshot
+            self._snapshot = self._loader()
+            self.reloads += 1
+            return self._snapshot
+
+    def _should_reload_for_miss(self, snapshot: GoalTypeSnapshot) -> bool:
+        return time.monotonic() - snapshot.loaded_at >= self._miss_reload_interval
+
+    def snapshot(self) -> GoalTypeSnapshot:
+        snapshot = self._snapshot
+        return snapshot if snapshot is not None else self._reload_unless_replaced(None)
+
+    async def snapshot_async(self) -> GoalTypeSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await run_in_threadpool(self._reload_unless_replaced, None)
+        return snapshot
+
+    def all(self) -> tuple[GoalTypeInfo, ...]:
+        return self.snapshot().ordered
+
+    def get(self, goal_type_id: UUID | str) -> GoalTypeInfo | None:
+        if not isinstance(goal_type_id, UUID):
+            goal_type_id = UUID(str(goal_type_id))
+        snapshot = self.snapshot()
+        info = snapshot.by_id.get(goal_type_id)
+        if info is None and self._should_reload_for_miss(snapshot):
+            info = self._reload_unless_replaced(snapshot).by_id.get(goal_type_id)
+        return info
+
+    async def get_async(self, goal_type_id: UUID | str) -> GoalTypeInfo | None:
+        if not isinstance(goal_type_id, UUID):
+            goal_type_id = UUID(str(goal_type_id))
+        snapshot = await self.snapshot_async()
+        info = snapshot.by_id.get(goal_type_id)
+        if info is None and self._should_reload_for_miss(snapshot):
+            snapshot = await run_in_threadpool(self._reload_unless_replaced, snapshot)
+            info = snapshot.by_id.get(goal_type_id)
+        return info
+
+    def _listen(self) -> None:
+        backoff, dropped = 1.0, False
+        while True:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(GOAL_TYPES_CHANNEL)
+                if dropped:
+                    # Anything published while we were not subscribed was missed.
+                    self.reload()
+                backoff, dropped = 1.0, False
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None or time.monotonic() - self.snapshot().loaded_at >= self._max_age:
+                        self.reload()
+            except Exception:
+                # Keep serving the snapshot we have; resubscribe shortly.
+                logging.warning("Goal type registry listener failed", exc_info=True)
+                dropped = True
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                pubsub.close()
+
+    def start(self) -> None:
+        """Load now and listen for invalidations; call once per process (after fork)."""
+        with self._start_lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            try:
+                self.reload()
+            except Exception:
+                # The listener retries, and the first read loads on demand.
+                logging.warning("Initial goal type load failed", exc_info=True)
+            self._listener = threading.Thread(target=self._listen, name="goal-type-registry", daemon=True)
+            self._listener.start()
+
+
+def publish_goal_types_changed() -> int:
+    """Tell every process to reload goal types; returns the number of subscribers reached."""
+    return get_redis().publish(GOAL_TYPES_CHANNEL, "changed")
+
+
+goal_type_registry = GoalTypeRegistry(
+    max_age=settings.goal_type_registry_max_age_seconds,
+    miss_reload_interval=settings.goal_type_registry_miss_reload_seconds,
+)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.info("Goal type invalidation reached %s processes", publish_goal_types_changed())
@@ -1,28 +1,104 @@
+from datetime import datetime
 from uuid import UUID
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def current_goals_for_user(user_id: UUID, db: Session):
+# Everything getcurrentgoals' response depends on besides goal types: the
+# user's goal write counter (migration 005) and how many goals are still
+# before their deadline, which changes when one passes without a write.
+CURRENT_GOALS_VERSION_SQL = text(
+    """
+SELECT
+  COALESCE((SELECT version FROM user_goal_versions WHERE user_id = :user_id), 0) AS version,
+  (SELECT count(*) FROM goals WHERE user_id = :user_id AND deadline >= now()) AS current_count
+    """
+)
+
+
+async def current_goals_version(user_id: UUID, db: AsyncSession) -> tuple[int, int]:
+    row = (await db.execute(CURRENT_GOALS_VERSION_SQL, {"user_id": str(user_id)})).one()
+    return row.version, row.current_count
+
+
+async def current_goals_for_user(user_id: UUID, db: AsyncSession):
     query = """
 SELECT
   g.*,
-  v_latest.id          AS verification_id,
-  gt.name              AS goal_type_name,
-  gt.verification_type AS verification_type,
-  v_latest.result      AS verification_result,
-  v_latest.updated_at  AS verification_updated_at
+  g.latest_verification_id     AS verification_id,
+  gt.name                      AS goal_type_name,
+  gt.verification_type         AS verification_type,
+  g.latest_verification_result AS verification_result,
+  g.latest_verification_at     AS verification_updated_at,
+  COALESCE(ugv.version, 0)     AS goals_version
 FROM goals g
 LEFT JOIN goal_types gt
   ON gt.id = g.goal_type_id
-LEFT JOIN LATERAL (
-  SELECT v.*
-  FROM verifications v
-  WHERE v.goal_id = g.id
-  ORDER BY v.updated_at DESC
-  LIMIT 1
-) v_latest ON TRUE
+LEFT JOIN user_goal_versions ugv
+  ON ugv.user_id = g.user_id
 WHERE g.deadline >= now()
 AND g.user_id = :user_id;
             """
 
-    return db.execute(text(query), {"user_id": str(user_id)}).fetchall()
+    result = await db.execute(text(query), {"user_id": str(user_id)})
+    return result.fetchall()
+
+
+# Columns of a goal history item; all but title are in
+# ix_goals_user_deadline_id_covering (migration 006), so the filters are
+# applied in the index and only returned rows touch the heap (for title,
+# which is too long to index). The latest verification comes from the denormalized
+# goals.latest_verification_* pointer instead of a per-row LATERAL sort.
+GOAL_HISTORY_SQL = """
+SELECT
+  id,
+  goal_type_id,
+  title,
+  bounty_amount,
+  deadline,
+  status,
+  verification_status,
+  finalized_at,
+  created_at,
+  latest_verification_id     AS verification_id,
+  latest_verification_result AS verification_result,
+  latest_verification_at     AS verification_updated_at
+FROM goals
+WHERE user_id = :user_id
+{filters}
+ORDER BY deadline DESC, id DESC
+LIMIT :limit
+"""
+
+
+async def goal_history_page(
+    user_id: UUID,
+    db: AsyncSession,
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+    statuses: list[str] | None = None,
+    verification_statuses: list[str] | None = None,
+    goal_type_ids: list[UUID] | None = None,
+):
+    """
+    One page of the user's goals, latest deadline first, starting after the
+    (deadline, id) keyset cursor. Fetches limit + 1 rows so the caller can
+    tell whether another page exists.
+    """
+    filters = []
+    params = {"user_id": str(user_id), "limit": limit + 1}
+    if after is not None:
+        filters.append("AND (deadline, id) < (:after_deadline, :after_id)")
+        params["after_deadline"], params["after_id"] = after[0], str(after[1])
+    if statuses:
+        filters.append("AND status = ANY(:statuses)")
+        params["statuses"] = statuses
+    if verification_statuses:
+        filters.append("AND verification_status = ANY(:verification_statuses)")
+        params["verification_statuses"] = verification_statuses
+    if goal_type_ids:
+        filters.append("AND goal_type_id = ANY(:goal_type_ids)")
+        params["goal_type_ids"] = goal_type_ids
+
+    query = GOAL_HISTORY_SQL.format(filters="\n".join(filters))
+    result = await db.execute(text(query), params)
+    return result.fetchall()
@@ -0,0 +1,118 @@
+import logging
+import re
+import threading
+import time
+
+import requests
+from google.auth import jwt as google_jwt
+
+from src.config import settings
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _max_age(cache_control: str | None, default: int) -> int:
+    match = _MAX_AGE_RE.search(cache_control or "")
+    return int(match.group(1)) if match else default
+
+
+class GoogleIdTokenVerifier:
+    """
+    Verifies Google ID tokens against signing certs held in memory.
+
+    Certs are fetched once, then refreshed by a daemon thread shortly before
+    the Cache-Control max-age of the last response runs out, so verification
+    never waits on the network. A token signed with a kid we have not seen
+    forces one early refresh (at most once per min_refresh_interval).
+    """
+
+    def __init__(
+        self,
+        certs_url: str,
+        audience: str | None,
+        default_max_age: int = 3600,
+        refresh_margin: int = 300,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 5.0,
+    ):
+        self._certs_url = certs_url
+        self._audience = audience
+        self._default_max_age = default_max_age
+        self._refresh_margin = refresh_margin
+        self._min_refresh_interval = min_refresh_interval
+        self._timeout = timeout
+        self._session = requests.Session()
+        self._certs: dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._refresher: threading.Thread | None = None
+        self.fetches = 0
+
+    def _fetch(self) -> None:
+        response = self._session.get(self._certs_url, timeout=self._timeout)
+        response.raise_for_status()
+        certs = response.json()
+        max_age = _max_age(response.headers.get("Cache-Control"), self._default_max_age)
+        now = time.monotonic()
+        with self._lock:
+            self._certs = certs
+            self._fetched_at = now
+            self._expires_at = now + max_age
+            self.fetches += 1
+
+    def _refresh_loop(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._expires_at - self._refresh_margin - time.monotonic()
+            # Short max-ages: refresh halfway through instead of after expiry.
+            wait = max(wait, (self._expires_at - time.monotonic()) / 2, 1.0)
+            time.sleep(wait)
+            try:
+                self._fetch()
+            except Exception:
+                # Keep serving the certs we have; try again shortly.
+                logging.warning("Google cert refresh failed", exc_info=True)
+                time.sleep(min(self._refresh_margin, 60))
+
+    def _ensure_started(self) -> None:
+        if self._refresher is not None:
+            return
+        with self._start_lock:
+            if self._refresher is not None:
+                return
+            # A failed first fetch raises here and is retried on the next call.
+            self._fetch()
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="google-certs", daemon=True
+            )
+            self._refresher.start()
+
+    def _refresh_now(self) -> bool:
+        with self._lock:
+            if time.monotonic() - self._fetched_at < self._min_refresh_interval:
+                return False
+        self._fetch()
+        return True
+
+    def verify(self, token: str) -> dict:
+        """Claims of a valid Google ID token; raises ValueError otherwise."""
+        self._ensure_started()
+        try:
+            claims = google_jwt.decode(token, certs=self._certs, audience=self._audience)
+        except ValueError as exc:
+            if "Certificate for key id" not in str(exc) or not self._refresh_now():
+                raise
+            claims = google_jwt.decode(token, certs=self._certs, audience=self._audience)
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {claims.get('iss')}")
+        return claims
+
+
+google_id_token_verifier = GoogleIdTokenVerifier(
+    certs_url=settings.google_certs_url,
+    audience=settings.google_client_id_web,
+)
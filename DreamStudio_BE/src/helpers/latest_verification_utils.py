@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.models.goal_schemas import Goal
+from src.models.verifications_schemas import Verification
+
+
+def record_latest_verification(
+    goal: Goal, verification: Verification, now: datetime | None = None
+) -> None:
+    """
+    Point goal at verification as its most recently written one.
+
+    Call before the flush that writes the verification: updated_at is set
+    here instead of by the column default so both rows carry the same
+    timestamp, and the goals -> verifications FK is deferred to commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    if verification.id is None:
+        verification.id = uuid.uuid4()
+    verification.updated_at = now
+    goal.latest_verification_id = verification.id
+    goal.latest_verification_result = verification.result
+    goal.latest_verification_at = now
+
+
+# Latest verification per goal, computed the way the old LATERAL did.
+_LATEST_FOR_GOALS_SQL = """
+SELECT DISTINCT ON (v.goal_id) v.goal_id, v.id, v.result, v.updated_at
+FROM verifications v
+WHERE v.goal_id = ANY(:goal_ids)
+ORDER BY v.goal_id, v.updated_at DESC
+"""
+
+_SYNC_POINTERS_SQL = f"""
+WITH latest AS ({_LATEST_FOR_GOALS_SQL})
+UPDATE goals g
+SET latest_verification_id = latest.id,
+    latest_verification_result = latest.result,
+    latest_verification_at = latest.updated_at
+FROM unnest(CAST(:goal_ids AS uuid[])) AS batch(goal_id)
+LEFT JOIN latest ON latest.goal_id = batch.goal_id
+WHERE g.id = batch.goal_id
+  AND (g.latest_verification_id IS DISTINCT FROM latest.id
+       OR g.latest_verification_result IS DISTINCT FROM latest.result
+       OR g.latest_verification_at IS DISTINCT FROM latest.updated_at)
+RETURNING g.id
+"""
+
+_FIND_STALE_SQL = f"""
+WITH latest AS ({_LATEST_FOR_GOALS_SQL})
+SELECT g.id
+FROM goals g
+LEFT JOIN latest ON latest.goal_id = g.id
+WHERE g.id = ANY(:goal_ids)
+  AND (g.latest_verification_id IS DISTINCT FROM latest.id
+       OR g.latest_verification_result IS DISTINCT FROM latest.result
+       OR g.latest_verification_at IS DISTINCT FROM latest.updated_at)
+"""
+
+
+def goal_id_batch(db: Session, after_id: UUID | None, batch_size: int) -> list[UUID]:
+    query = db.query(Goal.id)
+    if after_id is not None:
+        query = query.filter(Goal.id > after_id)
+    return [goal_id for (goal_id,) in query.order_by(Goal.id).limit(batch_size).all()]
+
+
+def sync_latest_verifications(db: Session, goal_ids: list[UUID]) -> list[UUID]:
+    """Recompute the pointer for goal_ids; returns the goals that changed."""
+    if not goal_ids:
+        return []
+    rows = db.execute(text(_SYNC_POINTERS_SQL), {"goal_ids": list(goal_ids)}).fetchall()
+    return [row.id for row in rows]
+
+
+def find_stale_latest_verifications(db: Session, goal_ids: list[UUID]) -> list[UUID]:
+    if not goal_ids:
+        return []
+    rows = db.execute(text(_FIND_STALE_SQL), {"goal_ids": list(goal_ids)}).fetchall()
+    return [row.id for row in rows]
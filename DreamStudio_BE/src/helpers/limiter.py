@@ -1,8 +1,9 @@
 from fastapi import Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from jose import jwt, JWTError
+from jose import JWTError
 from ..config import settings
+from .auth_utils import request_access_claims
 
 
 def _get_user_id_key(request: Request) -> str:
@@ -14,9 +15,7 @@ def _get_user_id_key(request: Request) -> str:
     if auth.startswith("Bearer "):
         token = auth[7:]
         try:
-            payload = jwt.decode(
-                token, settings.secret_key, algorithms=[settings.algorithm]
-            )
+            payload = request_access_claims(request, token)
             user_id = payload.get("sub")
             if user_id:
                 return f"user:{user_id}"
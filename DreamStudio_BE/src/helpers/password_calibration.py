@@ -0,0 +1,74 @@
+"""
+Pick argon2id time and memory cost for a target verify latency on this host.
+
+Run on the hardware that serves logins (ideally while it is otherwise idle),
+then copy the printed values into the environment:
+
+    python -m src.helpers.password_calibration --target-ms 250 --parallelism 4
+
+Memory is held at --max-memory-mib and time cost raised while verify stays
+under the target; if even time_cost=1 is too slow, memory is halved down to
+--min-memory-mib.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from src.helpers.password_hashing import configured_hasher
+
+
+def measure_verify_ms(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    hasher = configured_hasher(time_cost, memory_cost, parallelism)
+    password_hash = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.verify("calibration-password", password_hash)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, parallelism: int, min_memory_kib: int, max_memory_kib: int, samples: int) -> dict:
+    memory_cost = max_memory_kib
+    latency = measure_verify_ms(1, memory_cost, parallelism, samples)
+    while latency > target_ms and memory_cost // 2 >= min_memory_kib:
+        memory_cost //= 2
+        latency = measure_verify_ms(1, memory_cost, parallelism, samples)
+
+    time_cost = 1
+    while True:
+        next_latency = measure_verify_ms(time_cost + 1, memory_cost, parallelism, samples)
+        if next_latency > target_ms:
+            break
+        time_cost, latency = time_cost + 1, next_latency
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "verify_ms": round(latency, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--min-memory-mib", type=int, default=19)
+    parser.add_argument("--max-memory-mib", type=int, default=64)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    result = calibrate(
+        args.target_ms,
+        args.parallelism,
+        args.min_memory_mib * 1024,
+        args.max_memory_mib * 1024,
+        args.samples,
+    )
+    print(f"# median verify {result['verify_ms']}ms (target {args.target_ms}ms)")
+    print(f"ARGON2_TIME_COST={result['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={result['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={result['parallelism']}")
@@ -0,0 +1,183 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from threading import Lock
+
+from fastapi import HTTPException
+from passlib.hash import argon2
+
+from src.config import settings
+
+
+def configured_hasher(time_cost: int, memory_cost: int, parallelism: int):
+    return argon2.using(
+        type="ID", rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+
+
+hasher = configured_hasher(
+    settings.argon2_time_cost, settings.argon2_memory_cost, settings.argon2_parallelism
+)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True when the hash was made with parameters other than the configured ones."""
+    try:
+        parsed = argon2.from_string(password_hash)
+    except ValueError:
+        return True
+    return (
+        parsed.type != "id"
+        or parsed.rounds != settings.argon2_time_cost
+        or parsed.memory_cost != settings.argon2_memory_cost
+        or parsed.parallelism != settings.argon2_parallelism
+    )
+
+
+def _init_worker(niceness: int) -> None:
+    os.nice(niceness)
+
+
+def _hash(password: str) -> tuple[str, float, float]:
+    started = time.monotonic()
+    return hasher.hash(password), started, time.monotonic()
+
+
+def _verify_and_update(password: str, password_hash: str) -> tuple[tuple[bool, str | None], float, float]:
+    started = time.monotonic()
+    ok = hasher.verify(password, password_hash)
+    new_hash = hasher.hash(password) if ok and needs_rehash(password_hash) else None
+    return (ok, new_hash), started, time.monotonic()
+
+
+@dataclass
+class PasswordHashStats:
+    completed: int = 0
+    rejected: int = 0
+    pool_restarts: int = 0
+    in_flight: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    run_total: float = 0.0
+    run_max: float = 0.0
+    lock: Lock = field(default_factory=Lock, repr=False)
+
+    def record(self, wait: float, run: float) -> None:
+        with self.lock:
+            self.completed += 1
+            self.queue_wait_total += wait
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+            self.run_total += run
+            self.run_max = max(self.run_max, run)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            done = self.completed or 1
+            return {
+                "workers": settings.password_hash_workers,
+                "max_pending": settings.password_hash_max_pending,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "pool_restarts": self.pool_restarts,
+                "queue_wait_avg_ms": round(self.queue_wait_total / done * 1000, 3),
+                "queue_wait_max_ms": round(self.queue_wait_max * 1000, 3),
+                "run_avg_ms": round(self.run_total / done * 1000, 3),
+                "run_max_ms": round(self.run_max * 1000, 3),
+            }
+
+
+class PasswordHasher:
+    """
+    Runs argon2 in a small process pool so password work cannot occupy the
+    request threadpool. At most max_pending operations are queued or running;
+    callers past that get a 503 immediately instead of waiting in line. If a
+    worker dies (e.g. OOM-killed) the pool is broken for good, so it is
+    replaced and the operation retried once before answering 503.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._workers = workers
+        self._max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = Lock()
+        self.stats = PasswordHashStats()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(settings.password_hash_worker_niceness,),
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            if self._executor is not executor:
+                return  # another caller already replaced it
+            self._executor = None
+        with self.stats.lock:
+            self.stats.pool_restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _unavailable() -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="Too many sign-in attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    def _run(self, fn, *args):
+        stats = self.stats
+        with stats.lock:
+            if stats.in_flight >= self._max_pending:
+                stats.rejected += 1
+                rejected = stats.rejected
+                admitted = False
+            else:
+                stats.in_flight += 1
+                admitted = True
+        if not admitted:
+            if rejected % 100 == 1:
+                logging.warning("password_hashing saturated %s", self.stats.snapshot())
+            raise self._unavailable()
+
+        submitted = time.monotonic()
+        try:
+            for _ in range(2):
+                executor = self._get_executor()
+                try:
+                    result, started, finished = executor.submit(fn, *args).result()
+                    break
+                except BrokenProcessPool:
+                    logging.warning("password_hashing worker died; replacing the pool", exc_info=True)
+                    self._discard_executor(executor)
+            else:
+                raise self._unavailable()
+        finally:
+            with stats.lock:
+                stats.in_flight -= 1
+        stats.record(max(started - submitted, 0.0), finished - started)
+        return result
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify_and_update(self, password: str, password_hash: str) -> tuple[bool, str | None]:
+        """(matches, replacement hash when the stored one uses outdated parameters)."""
+        return self._run(_verify_and_update, password, password_hash)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
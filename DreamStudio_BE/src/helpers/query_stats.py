@@ -0,0 +1,83 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# The same statement text this many times in one unit of work is reported as
+# a likely N+1. SQLAlchemy statements are parameterized, so identical text
+# means an identical shape with different bind values.
+N_PLUS_ONE_THRESHOLD = 5
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.shapes[statement] += 1
+
+    def repeated_statements(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self) -> dict:
+        repeated = self.repeated_statements()
+        return {
+            "db_queries": self.count,
+            "db_ms": round(self.total_seconds * 1000, 3),
+            "n_plus_one": [
+                {"count": n, "statement": " ".join(shape.split())[:200]} for shape, n in repeated
+            ],
+        }
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def begin_tracking() -> tuple[QueryStats, Token]:
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end_tracking(token: Token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def track_queries():
+    """Collect statement counts for everything executed in this context."""
+    stats, token = begin_tracking()
+    try:
+        yield stats
+    finally:
+        end_tracking(token)
+
+
+def install_query_stats(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is None:
+            return
+        starts = conn.info.get("query_stats_start")
+        elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+        stats.record(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("query_stats_start") if conn is not None else None
+        if starts:
+            starts.pop()
@@ -0,0 +1,114 @@
+import logging
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+from src.helpers.auth_utils import validate_access_token
+from src.helpers.db import AsyncSessionLocal, replica_engines
+from src.helpers.redis_client import get_async_redis
+
+# When the replica has replayed everything it received, replay_timestamp only
+# tells us when the primary last wrote, so treat it as caught up.
+REPLICA_LAG_SQL = text(
+    """
+SELECT CASE
+  WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+  ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END AS lag_seconds
+    """
+)
+
+
+def _recent_write_key(user_id: UUID) -> str:
+    return f"ryw:user:{user_id}"
+
+
+@dataclass
+class _Replica:
+    engine: AsyncEngine
+    lag_seconds: float | None = None
+    checked_at: float = 0.0
+
+
+class ReplicaRouter:
+    """Round-robins reads over replicas whose measured lag is within bounds."""
+
+    def __init__(self, engines: list[AsyncEngine], max_lag_seconds: float, check_interval: float):
+        self._replicas = [_Replica(engine=e) for e in engines]
+        self._max_lag_seconds = max_lag_seconds
+        self._check_interval = check_interval
+        self._next = 0
+
+    async def _refresh_lag(self, replica: _Replica) -> None:
+        replica.checked_at = time.monotonic()
+        try:
+            async with replica.engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+            replica.lag_seconds = float(lag) if lag is not None else None
+        except Exception:
+            logging.warning("Replica lag check failed for %s", replica.engine.url.host, exc_info=True)
+            replica.lag_seconds = None
+
+    async def pick(self) -> AsyncEngine | None:
+        count = len(self._replicas)
+        for offset in range(count):
+            replica = self._replicas[(self._next + offset) % count]
+            if time.monotonic() - replica.checked_at >= self._check_interval:
+                await self._refresh_lag(replica)
+            if replica.lag_seconds is not None and replica.lag_seconds <= self._max_lag_seconds:
+                self._next = (self._next + offset + 1) % count
+                return replica.engine
+        return None
+
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    check_interval=settings.replica_lag_check_interval,
+)
+
+
+async def mark_user_write(user_id: UUID) -> None:
+    """Pin this user's reads to the primary for the read-your-writes window."""
+    if not replica_engines:
+        return
+    try:
+        await get_async_redis().set(
+            _recent_write_key(user_id), "1", ex=settings.read_your_writes_window_seconds
+        )
+    except Exception:
+        logging.warning("Could not record recent write for user %s", user_id, exc_info=True)
+
+
+async def _wrote_recently(user_id: UUID) -> bool:
+    try:
+        return bool(await get_async_redis().exists(_recent_write_key(user_id)))
+    except Exception:
+        # Without the marker we cannot rule out a stale read.
+        return True
+
+
+async def read_bind_for(user_id: UUID) -> AsyncEngine | None:
+    """A fresh-enough replica for this user's reads, or None for the primary."""
+    if replica_engines and not await _wrote_recently(user_id):
+        return await replica_router.pick()
+    return None
+
+
+async def get_async_read_db(user_id: UUID = Depends(validate_access_token)):
+    """
+    AsyncSession for read-only routes: a fresh-enough replica when one is
+    available and the user has not written recently, otherwise the primary.
+    """
+    bind = await read_bind_for(user_id)
+    if bind is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        async with AsyncSessionLocal(bind=bind) as db:
+            yield db
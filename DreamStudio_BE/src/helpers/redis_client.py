@@ -0,0 +1,26 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+
+from src.config import settings
+
+
+def _redis_url() -> str:
+    return settings.redis_url or settings.celery_redis_url
+
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(_redis_url(), decode_responses=True)
+
+
+@lru_cache
+def get_async_redis() -> aioredis.Redis:
+    return aioredis.Redis.from_url(_redis_url(), decode_responses=True)
+
+
+@lru_cache
+def get_broker_redis() -> redis.Redis:
+    """Raw client for the Celery broker, for publishing pre-encoded task messages."""
+    return redis.Redis.from_url(settings.celery_redis_url)
@@ -0,0 +1,327 @@
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from typing import Literal, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.helpers.auth_utils import create_refresh_token, generate_refresh_token, hash_refresh_token
+from src.helpers.db import AsyncSessionLocal
+from src.helpers.read_routing import read_bind_for
+from src.helpers.redis_client import get_async_redis, get_redis
+from src.models.auth_schemas import User
+
+# Revoke the presented token and issue its replacement in one statement; the
+# user's profile columns come back with it so no further lookups are needed.
+ROTATE_REFRESH_TOKEN_SQL = text(
+    """
+WITH revoked AS (
+  UPDATE refresh_tokens
+  SET revoked_at = now()
+  WHERE refresh_token = :old_hash
+    AND revoked_at IS NULL
+    AND expires_at >= now()
+  RETURNING user_id
+), issued AS (
+  INSERT INTO refresh_tokens (user_id, refresh_token, expires_at)
+  SELECT user_id, :new_hash, now() + make_interval(days => :expire_days)
+  FROM revoked
+  RETURNING user_id
+)
+SELECT u.id, u.email, u.first_name, u.last_name
+FROM issued
+JOIN users u ON u.id = issued.user_id
+    """
+)
+
+# Only run when rotation matched nothing. A revoked token being presented again
+# means it was copied, so every live token for that user is revoked with it.
+DIAGNOSE_REFRESH_TOKEN_SQL = text(
+    """
+WITH presented AS (
+  SELECT user_id, revoked_at, expires_at
+  FROM refresh_tokens
+  WHERE refresh_token = :old_hash
+), revoke_family AS (
+  UPDATE refresh_tokens r
+  SET revoked_at = now()
+  FROM presented p
+  WHERE p.revoked_at IS NOT NULL
+    AND r.user_id = p.user_id
+    AND r.revoked_at IS NULL
+  RETURNING r.id
+)
+SELECT user_id, revoked_at, expires_at, (SELECT count(*) FROM revoke_family) AS family_revoked
+FROM presented
+    """
+)
+
+# Tokens issued before the Redis store was enabled only exist in Postgres.
+# Rows written by the audit flush for Redis-era tokens lag their revocation
+# by up to a flush interval, so they must never be rotated from here.
+REVOKE_LEGACY_REFRESH_TOKEN_SQL = text(
+    """
+UPDATE refresh_tokens
+SET revoked_at = now()
+WHERE refresh_token = :old_hash
+  AND revoked_at IS NULL
+  AND expires_at >= now()
+  AND created_at < :cutover
+RETURNING user_id
+    """
+)
+
+DELETE_REFRESH_TOKEN_SQL = text("DELETE FROM refresh_tokens WHERE refresh_token = :token_hash RETURNING id")
+
+
+@dataclass
+class Rotation:
+    status: Literal["rotated", "invalid", "revoked", "expired"]
+    refresh_token: Optional[str] = None
+    user_id: Optional[UUID] = None
+    email: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+
+
+class PostgresRefreshTokenStore:
+    """Live tokens are rows in refresh_tokens."""
+
+    def issue(self, db: Session, user_id: UUID) -> str:
+        return create_refresh_token(db, user_id)
+
+    async def rotate(self, db: AsyncSession, refresh_token: str) -> Rotation:
+        old_hash = hash_refresh_token(refresh_token)
+        new_refresh_token = generate_refresh_token()
+        row = (
+            await db.execute(
+                ROTATE_REFRESH_TOKEN_SQL,
+                {
+                    "old_hash": old_hash,
+                    "new_hash": hash_refresh_token(new_refresh_token),
+                    "expire_days": settings.refresh_token_expire_days,
+                },
+            )
+        ).first()
+        if row is not None:
+            await db.commit()
+            return Rotation(
+                status="rotated",
+                refresh_token=new_refresh_token,
+                user_id=row.id,
+                email=row.email,
+                first_name=row.first_name,
+                last_name=row.last_name,
+            )
+        return await self.diagnose(db, old_hash)
+
+    async def diagnose(self, db: AsyncSession, old_hash: str) -> Rotation:
+        presented = (await db.execute(DIAGNOSE_REFRESH_TOKEN_SQL, {"old_hash": old_hash})).first()
+        await db.commit()
+        if presented is None:
+            return Rotation(status="invalid")
+        if presented.revoked_at is not None:
+            logging.warning(
+                "Revoked refresh token reused for user %s; revoked %s live tokens",
+                presented.user_id,
+                presented.family_revoked,
+            )
+            return Rotation(status="revoked", user_id=presented.user_id)
+        return Rotation(status="expired", user_id=presented.user_id)
+
+    async def revoke(self, db: AsyncSession, refresh_token: str) -> bool:
+        deleted = (
+            await db.execute(DELETE_REFRESH_TOKEN_SQL, {"token_hash": hash_refresh_token(refresh_token)})
+        ).first()
+        await db.commit()
+        return deleted is not None
+
+
+REFRESH_TOKEN_KEY_PREFIX = "rt:"
+REFRESH_TOKEN_AUDIT_KEY = "rt:audit"
+# Events the audit flush could not write, kept for inspection instead of
+# blocking the queue.
+REFRESH_TOKEN_AUDIT_DEAD_KEY = "rt:audit:dead"
+
+# KEYS: old token, new token, audit list
+# ARGV: old hash, new hash, ttl seconds, key prefix, now, expires_at
+# A revoked token keeps its key until it would have expired, so a replay is
+# recognised and revokes the user's whole token family. The family set
+# outlives members whose keys have expired, so only keys that still exist
+# are marked (HSET keeps their TTL; on a missing key it would create one
+# that never expires).
+#
+# The scripts also touch keys they derive themselves (the family set and its
+# members), which Redis Cluster does not allow: the store needs a single
+# Redis primary (standalone or Sentinel), not a cluster.
+ROTATE_LUA = """
+local user_id = redis.call('HGET', KEYS[1], 'user_id')
+if not user_id then
+  return {'invalid'}
+end
+local family = ARGV[4] .. 'user:' .. user_id
+if redis.call('HGET', KEYS[1], 'revoked') == '1' then
+  local revoked = 0
+  for _, h in ipairs(redis.call('SMEMBERS', family)) do
+    if redis.call('EXISTS', ARGV[4] .. h) == 1 then
+      redis.call('HSET', ARGV[4] .. h, 'revoked', '1')
+      revoked = revoked + 1
+    end
+  end
+  redis.call('DEL', family)
+  redis.call('RPUSH', KEYS[3],
+    '{"event":"reused","user_id":"' .. user_id .. '","at":' .. ARGV[5] .. '}')
+  return {'revoked', user_id, tostring(revoked)}
+end
+redis.call('HSET', KEYS[1], 'revoked', '1')
+redis.call('SREM', family, ARGV[1])
+redis.call('HSET', KEYS[2], 'user_id', user_id, 'revoked', '0')
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('SADD', family, ARGV[2])
+redis.call('EXPIRE', family, ARGV[3])
+redis.call('RPUSH', KEYS[3],
+  '{"event":"rotated","user_id":"' .. user_id .. '","old_hash":"' .. ARGV[1] ..
+  '","new_hash":"' .. ARGV[2] .. '","at":' .. ARGV[5] .. ',"expires_at":' .. ARGV[6] .. '}')
+return {'rotated', user_id}
+"""
+
+# KEYS: token, audit list
+# ARGV: hash, key prefix, now
+# Like rotation, logout keeps the key (marked revoked) until its TTL, so a
+# replay of a logged-out token is caught as reuse instead of looking unknown.
+REVOKE_LUA = """
+local user_id = redis.call('HGET', KEYS[1], 'user_id')
+if not user_id then
+  return 0
+end
+if redis.call('HGET', KEYS[1], 'revoked') == '1' then
+  return 1
+end
+redis.call('HSET', KEYS[1], 'revoked', '1')
+redis.call('SREM', ARGV[2] .. 'user:' .. user_id, ARGV[1])
+redis.call('RPUSH', KEYS[2], '{"event":"revoked","token_hash":"' .. ARGV[1] .. '","at":' .. ARGV[3] .. '}')
+return 1
+"""
+
+
+class RedisRefreshTokenStore:
+    """
+    Live tokens are Redis hashes keyed by token hash with a TTL of
+    refresh_token_expire_days. Every change is queued on rt:audit and written
+    to refresh_tokens in batches by src.tasks.refresh_token_audit.
+    """
+
+    def __init__(self):
+        self._postgres = PostgresRefreshTokenStore()
+        self._rotate = get_async_redis().register_script(ROTATE_LUA)
+        self._revoke = get_async_redis().register_script(REVOKE_LUA)
+
+    @staticmethod
+    def _ttl_seconds() -> int:
+        return int(timedelta(days=settings.refresh_token_expire_days).total_seconds())
+
+    @staticmethod
+    def _key(token_hash: str) -> str:
+        return f"{REFRESH_TOKEN_KEY_PREFIX}{token_hash}"
+
+    def _queue_issue(self, pipe, user_id: UUID) -> str:
+        refresh_token = generate_refresh_token()
+        token_hash = hash_refresh_token(refresh_token)
+        now = time.time()
+        ttl = self._ttl_seconds()
+        family = f"{REFRESH_TOKEN_KEY_PREFIX}user:{user_id}"
+        event = {
+            "event": "issued",
+            "user_id": str(user_id),
+            "token_hash": token_hash,
+            "at": now,
+            "expires_at": now + ttl,
+        }
+        pipe.hset(self._key(token_hash), mapping={"user_id": str(user_id), "revoked": "0"})
+        pipe.expire(self._key(token_hash), ttl)
+        pipe.sadd(family, token_hash)
+        pipe.expire(family, ttl)
+        pipe.rpush(REFRESH_TOKEN_AUDIT_KEY, json.dumps(event))
+        return refresh_token
+
+    def issue(self, db: Session, user_id: UUID) -> str:
+        pipe = get_redis().pipeline(transaction=True)
+        refresh_token = self._queue_issue(pipe, user_id)
+        pipe.execute()
+        return refresh_token
+
+    async def rotate(self, db: AsyncSession, refresh_token: str) -> Rotation:
+        old_hash = hash_refresh_token(refresh_token)
+        new_refresh_token = generate_refresh_token()
+        new_hash = hash_refresh_token(new_refresh_token)
+        now = time.time()
+        ttl = self._ttl_seconds()
+        result = await self._rotate(
+            keys=[self._key(old_hash), self._key(new_hash), REFRESH_TOKEN_AUDIT_KEY],
+            args=[old_hash, new_hash, ttl, REFRESH_TOKEN_KEY_PREFIX, now, now + ttl],
+        )
+        status = result[0]
+        if status == "invalid":
+            legacy_user_id = None
+            cutover = settings.refresh_token_redis_cutover
+            if cutover is not None:
+                legacy_user_id = (
+                    await db.execute(
+                        REVOKE_LEGACY_REFRESH_TOKEN_SQL, {"old_hash": old_hash, "cutover": cutover}
+                    )
+                ).scalar()
+            if legacy_user_id is None:
+                return await self._postgres.diagnose(db, old_hash)
+            await db.commit()
+            pipe = get_async_redis().pipeline(transaction=True)
+            new_refresh_token = self._queue_issue(pipe, legacy_user_id)
+            await pipe.execute()
+            return await self._rotated(new_refresh_token, legacy_user_id)
+        user_id = UUID(result[1])
+        if status == "revoked":
+            logging.warning(
+                "Revoked refresh token reused for user %s; revoked %s live tokens", user_id, result[2]
+            )
+            return Rotation(status="revoked", user_id=user_id)
+        return await self._rotated(new_refresh_token, user_id)
+
+    async def _rotated(self, refresh_token: str, user_id: UUID) -> Rotation:
+        # Profile columns come from a replica when one is fresh enough.
+        bind = await read_bind_for(user_id)
+        read_session = AsyncSessionLocal() if bind is None else AsyncSessionLocal(bind=bind)
+        async with read_session as read_db:
+            user = await read_db.get(User, user_id)
+        if user is None:
+            return Rotation(status="invalid")
+        return Rotation(
+            status="rotated",
+            refresh_token=refresh_token,
+            user_id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+        )
+
+    async def revoke(self, db: AsyncSession, refresh_token: str) -> bool:
+        token_hash = hash_refresh_token(refresh_token)
+        revoked = await self._revoke(
+            keys=[self._key(token_hash), REFRESH_TOKEN_AUDIT_KEY],
+            args=[token_hash, REFRESH_TOKEN_KEY_PREFIX, time.time()],
+        )
+        if revoked:
+            return True
+        return await self._postgres.revoke(db, refresh_token)
+
+
+@lru_cache
+def get_refresh_token_store() -> PostgresRefreshTokenStore | RedisRefreshTokenStore:
+    if settings.refresh_token_store == "redis":
+        return RedisRefreshTokenStore()
+    return PostgresRefreshTokenStore()
@@ -0,0 +1,140 @@
+import base64
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from kombu.serialization import dumps as serialize
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.celery_app import celery_app
+from src.helpers.deadline_scheduler import queue_goal_deadline
+from src.models.task_outbox_schemas import TaskOutbox
+
+# Relay counters, updated in the same Redis pipeline as each published batch.
+TASK_OUTBOX_STATS_KEY = "task_outbox:stats"
+
+CLAIM_SQL = text(
+    """
+SELECT id, task_id, task_name, args, kwargs, eta, created_at
+FROM task_outbox
+ORDER BY id
+LIMIT :batch_size
+FOR UPDATE SKIP LOCKED
+    """
+)
+
+# Messages with an eta that go to the goal deadline sorted set instead of the
+# broker, so workers never hold weeks of ETA messages in memory.
+DEADLINE_SCHEDULED_TASKS = {"src.tasks.deadline_tasks.finalize_goal_at_deadline"}
+
+DELETE_SQL = text("DELETE FROM task_outbox WHERE id = ANY(:ids)")
+
+BACKLOG_SQL = text("SELECT count(*) AS pending, min(created_at) AS oldest FROM task_outbox")
+
+
+def enqueue_task(db, task, args=(), kwargs=None, eta: datetime | None = None) -> None:
+    """
+    Add a Celery task message to the outbox. It is published by the relay
+    once the caller commits, so the task never sees uncommitted rows and a
+    rolled-back request never dispatches. Works with Session and AsyncSession.
+    """
+    db.add(
+        TaskOutbox(
+            task_id=uuid.uuid4(),
+            task_name=task.name,
+            args=list(args),
+            kwargs=kwargs or {},
+            eta=eta,
+        )
+    )
+
+
+def encode_message(row) -> tuple[str, bytes]:
+    """
+    (queue key, payload) for one outbox row, in the envelope kombu's Redis
+    transport LPUSHes for apply_async, so workers consume it unchanged.
+    """
+    task_id = str(row.task_id)
+    queue = celery_app.amqp.router.route({}, row.task_name, row.args, row.kwargs)["queue"]
+    headers, properties, body, _ = celery_app.amqp.as_task_v2(
+        task_id, row.task_name, args=row.args, kwargs=row.kwargs, eta=row.eta
+    )
+    content_type, content_encoding, data = serialize(body, serializer=celery_app.conf.task_serializer)
+    if isinstance(data, str):
+        data = data.encode(content_encoding)
+    message = {
+        "body": base64.b64encode(data).decode(),
+        "content-encoding": content_encoding,
+        "content-type": content_type,
+        "headers": headers,
+        "properties": {
+            **properties,
+            "delivery_mode": 2,
+            # Anonymous exchange: the routing key is the destination queue,
+            # which is also where the worker restores unacked messages.
+            "delivery_info": {"exchange": "", "routing_key": queue.name},
+            "priority": 0,
+            "body_encoding": "base64",
+            "delivery_tag": str(uuid.uuid4()),
+        },
+    }
+    return queue.name, json.dumps(message).encode()
+
+
+def relay_batch(db: Session, broker, batch_size: int) -> tuple[int, float]:
+    """
+    Publish up to batch_size outbox rows with one pipelined broker round trip,
+    then delete them. Returns (published, max lag in seconds from commit to
+    publish). A crash between publish and commit republishes the batch:
+    delivery is at-least-once, and the Celery task id is stable across retries.
+    """
+    rows = db.execute(CLAIM_SQL, {"batch_size": batch_size}).all()
+    if not rows:
+        db.commit()
+        return 0, 0.0
+
+    pipe = broker.pipeline(transaction=False)
+    for row in rows:
+        if row.eta is not None and row.task_name in DEADLINE_SCHEDULED_TASKS:
+            queue_goal_deadline(pipe, row.args[0], row.eta)
+            continue
+        queue, payload = encode_message(row)
+        pipe.lpush(queue, payload)
+
+    now = datetime.now(timezone.utc)
+    max_lag = max((now - row.created_at).total_seconds() for row in rows)
+    pipe.hincrby(TASK_OUTBOX_STATS_KEY, "published_total", len(rows))
+    pipe.hincrby(TASK_OUTBOX_STATS_KEY, "batches_total", 1)
+    pipe.hset(
+        TASK_OUTBOX_STATS_KEY,
+        mapping={
+            "last_batch_size": len(rows),
+            "last_batch_at": now.timestamp(),
+            "last_max_lag_ms": round(max_lag * 1000, 1),
+        },
+    )
+    pipe.execute()
+
+    db.execute(DELETE_SQL, {"ids": [row.id for row in rows]})
+    db.commit()
+    return len(rows), max_lag
+
+
+def relay_stats(db: Session, broker) -> dict:
+    """Outbox backlog and relay counters, for the admin stats route."""
+    backlog = db.execute(BACKLOG_SQL).one()
+    counters = {key.decode(): float(value) for key, value in broker.hgetall(TASK_OUTBOX_STATS_KEY).items()}
+    oldest_age = (datetime.now(timezone.utc) - backlog.oldest).total_seconds() if backlog.oldest else 0.0
+    return {
+        "pending": backlog.pending,
+        "oldest_pending_age_seconds": round(oldest_age, 3),
+        "published_total": int(counters.get("published_total", 0)),
+        "batches_total": int(counters.get("batches_total", 0)),
+        "last_batch_size": int(counters.get("last_batch_size", 0)),
+        "last_batch_age_seconds": (
+            round(time.time() - counters["last_batch_at"], 3) if "last_batch_at" in counters else None
+        ),
+        "last_max_lag_ms": counters.get("last_max_lag_ms"),
+    }
@@ -2,10 +2,14 @@ import logging
 
 from src.models import verifications_schemas, goal_schemas, auth_schemas
 from src.models.verifications_models import UserSubmission
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 from fastapi import HTTPException
 from src.helpers.serper import reverse_image_search, SerperError
+from src.helpers.latest_verification_utils import record_latest_verification
+from src.helpers.goal_type_registry import GoalTypeInfo, goal_type_registry
 import requests
 import imagehash
 from PIL import Image
@@ -13,34 +17,34 @@ from io import BytesIO
 
 DISTANCE_THRESHHOLD=10
 
-def get_user(db: Session, user_id: UUID) -> auth_schemas.User:
-    user = db.query(auth_schemas.User).filter(auth_schemas.User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: UUID) -> auth_schemas.User:
+    user = await db.get(auth_schemas.User, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid user")
     return user
 
-def get_quizzes(db: Session, goal_id: UUID) -> tuple[verifications_schemas.QuizQuestions]:
-    rows = (db.query(verifications_schemas.QuizQuestions)
-                          .filter(verifications_schemas.QuizQuestions.goal_id == goal_id))
-    if not rows:
-        raise HTTPException(status_code=401, detail="No quiz")
+async def get_quizzes(db: AsyncSession, goal_id: UUID) -> list[dict]:
+    rows = await db.scalars(
+        select(verifications_schemas.QuizQuestions)
+        .filter(verifications_schemas.QuizQuestions.goal_id == goal_id)
+    )
     questions = [{"quiz_id": q.id, "question": q.question} for q in rows]
     return questions
 
-def get_verification_and_goal(db: Session, verification_id: str) -> tuple[verifications_schemas.Verification, goal_schemas.Goal]:
+async def get_verification_and_goal(db: AsyncSession, verification_id: str) -> tuple[verifications_schemas.Verification, goal_schemas.Goal]:
     """
     Returns verification, goal joined record of matching verification_id
 
     Args:
-        db: Session()
+        db: AsyncSession()
         verification_id: goal's verification id
     """
-    record = (
-        db.query(verifications_schemas.Verification, goal_schemas.Goal)
+    result = await db.execute(
+        select(verifications_schemas.Verification, goal_schemas.Goal)
         .join(goal_schemas.Goal, verifications_schemas.Verification.goal_id == goal_schemas.Goal.id)
         .filter(verifications_schemas.Verification.id == verification_id)
-        .first()
     )
+    record = result.first()
     if not record:
         raise HTTPException(status_code=404, detail="Verification not found")
     return record
@@ -48,16 +52,17 @@ def get_verification_and_goal(db: Session, verification_id: str) -> tuple[verifi
 def is_admin_or_owner(user: auth_schemas.User, goal_user_id: UUID) -> bool:
     return user.role == "admin" or str(goal_user_id) == str(user.id)
 
-def evaluate_quiz_submission(
-    db: Session,
+async def evaluate_quiz_submission(
+    db: AsyncSession,
     goal_id: UUID,
     user_submission: list[UserSubmission],
 ) -> str:
     rows = (
-        db.query(verifications_schemas.QuizQuestions)
-        .filter(verifications_schemas.QuizQuestions.goal_id == goal_id)
-        .all()
-    )
+        await db.scalars(
+            select(verifications_schemas.QuizQuestions)
+            .filter(verifications_schemas.QuizQuestions.goal_id == goal_id)
+        )
+    ).all()
     if not rows:
         raise HTTPException(status_code=404, detail="Quiz not found for goal")
 
@@ -65,7 +70,7 @@ def evaluate_quiz_submission(
     total = len(user_submission)
     if total == 0:
         raise HTTPException(status_code=400, detail="No answers submitted")
-    goal = db.query(goal_schemas.Goal).filter(goal_schemas.Goal.id == goal_id).first()
+    goal = await db.get(goal_schemas.Goal, goal_id)
     if not goal:
         raise HTTPException(status_code=400, detail="No corresponding goal")
 
@@ -96,8 +101,9 @@ def evaluate_quiz_submission(
         type="quiz",
         result="approved" if result == "pass" else "rejected",
     )
+    record_latest_verification(goal, verification)
     db.add(verification)
-    db.flush()
+    await db.flush()
 
     inputs = [
         verifications_schemas.QuizUserInput(
@@ -109,29 +115,32 @@ def evaluate_quiz_submission(
         for submission, is_correct in graded_submissions
     ]
     db.add_all(inputs)
-    db.commit()
+    await db.commit()
     return result
 
 def get_photo_verification_record(
     db: Session,
     verification_id: str,
-) -> tuple[verifications_schemas.Verification, verifications_schemas.VerificationPhoto, goal_schemas.Goal, goal_schemas.GoalType]:
+) -> tuple[verifications_schemas.Verification, verifications_schemas.VerificationPhoto, goal_schemas.Goal, GoalTypeInfo]:
     record = (
-        db.query(verifications_schemas.Verification, verifications_schemas.VerificationPhoto, goal_schemas.Goal, goal_schemas.GoalType)
+        db.query(verifications_schemas.Verification, verifications_schemas.VerificationPhoto, goal_schemas.Goal)
         .join(verifications_schemas.VerificationPhoto,
               verifications_schemas.VerificationPhoto.verification_id == verifications_schemas.Verification.id)
         .join(goal_schemas.Goal, verifications_schemas.Verification.goal_id == goal_schemas.Goal.id)
-        .join(goal_schemas.GoalType, goal_schemas.Goal.goal_type_id == goal_schemas.GoalType.id)
         .filter(verifications_schemas.Verification.id == verification_id)
         .first()
     )
     if not record:
         raise ValueError("verification not found")
 
-    verification, photo, goal, goal_type = record
+    verification, photo, goal = record
     if verification.type != "photo":
         raise ValueError("verification type must be photo")
 
+    goal_type = goal_type_registry.get(goal.goal_type_id)
+    if goal_type is None:
+        raise ValueError("goal type not found")
+
     return verification, photo, goal, goal_type
 
 def serp_image_search(image_url: str) -> dict:
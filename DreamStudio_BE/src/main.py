@@ -8,22 +8,34 @@ Rate Limiting
 Celery - Django (Async)
 """
 
-from fastapi import FastAPI
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from src.routes import auth_manual, auth_google, goals, auth_refresh, verifications, payments, user, admin_maintenance_costs
+from src.routes import auth_manual, auth_google, goals, auth_refresh, verifications, payments, user, admin_maintenance_costs, admin_db_pool, admin_password_hashing, admin_task_outbox
 from src.gpt import apicalls# no leading dot
 from src.config import settings
+from src.helpers.goal_type_registry import goal_type_registry
 from src.helpers.limiter import limiter
+from src.helpers.query_stats import track_queries
 import logging
 logging.basicConfig(level=logging.INFO)
 
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(goal_type_registry.start)
+    yield
+
+
 app = FastAPI(
     title=settings.app_name,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan,
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -37,6 +49,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def db_query_stats(request: Request, call_next):
+    with track_queries() as stats:
+        response = await call_next(request)
+    summary = stats.summary()
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["Server-Timing"] = f"db;dur={summary['db_ms']};desc=\"{stats.count} queries\""
+    if summary["n_plus_one"]:
+        response.headers["X-DB-N-Plus-One"] = str(len(summary["n_plus_one"]))
+    if stats.count:
+        log = logging.warning if summary["n_plus_one"] else logging.info
+        log("db_queries %s", json.dumps({"method": request.method, "path": request.url.path, **summary}))
+    return response
+
 app.include_router(auth_manual.router)
 app.include_router(auth_google.router)
 app.include_router(goals.router)
@@ -46,3 +73,6 @@ app.include_router(verifications.router)
 app.include_router(payments.router)
 app.include_router(user.router)
 app.include_router(admin_maintenance_costs.router)
+app.include_router(admin_db_pool.router)
+app.include_router(admin_password_hashing.router)
+app.include_router(admin_task_outbox.router)
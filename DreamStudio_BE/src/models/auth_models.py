@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict, EmailStr
 
@@ -36,7 +37,7 @@ class ResendVerificationRequest(BaseModel):
     email: EmailStr
 
 class RefreshRequest(BaseModel):
-    user_id: UUID
+    user_id: Optional[UUID] = None  # unused; the refresh token identifies the user
     refresh_token: str
 
 class RefreshResponse(BaseModel):
@@ -17,7 +17,9 @@ class BountyLedger(Base):
         CheckConstraint("type IN ('fund', 'hold', 'release', 'forfeit', 'refund')"),
         nullable=False,
     )
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Partitioned by month on created_at (migration 009), so the table's
+    # primary key is (id, created_at).
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), primary_key=True)
 
     user = relationship("User")
     goal = relationship("Goal")
@@ -0,0 +1,26 @@
+import uuid
+from sqlalchemy import CheckConstraint, Column, DateTime, Integer, Text, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB, CITEXT
+from src.helpers.db import Base
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'sending', 'sent', 'failed')",
+            name="email_outbox_status_check",
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    template = Column(Text, nullable=False)
+    recipient = Column(CITEXT, nullable=False)
+    template_data = Column(JSONB)
+    status = Column(Text, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
+    ses_message_id = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 class goalRequest(BaseModel):
@@ -12,6 +12,10 @@ class goalRequest(BaseModel):
     deadline: datetime
 
 
+class goalBatchRequest(BaseModel):
+    goals: list[goalRequest] = Field(..., min_length=1, max_length=50)
+
+
 class goalResponse(BaseModel):
     id: UUID
     user_id: UUID
@@ -61,3 +65,24 @@ class currentGoalResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 goalResponse.model_rebuild()
+
+class goalHistoryItem(BaseModel):
+    id: UUID
+    goal_type_id: Optional[UUID] = None
+    goal_type_name: Optional[str] = None
+    title: str
+    bounty_amount: int
+    deadline: datetime
+    status: str
+    verification_status: str
+    finalized_at: Optional[datetime] = None
+    created_at: datetime
+    verification_id: Optional[UUID] = None
+    verification_result: Optional[str] = None
+    verification_updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class goalHistoryPage(BaseModel):
+    items: list[goalHistoryItem]
+    next_cursor: Optional[str] = None
@@ -57,6 +57,22 @@ class Goal(Base):
     verification_status = Column(String, CheckConstraint("verification_status IN ('completed', 'failed', 'not started')"), default="not started")
     finalized_at = Column(DateTime(timezone=True))
     stripe_setup_intent_id = Column(Text)
+    # Denormalized copy of the most recently written verification; see
+    # src.helpers.latest_verification_utils.
+    latest_verification_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey(
+            "verifications.id",
+            ondelete="SET NULL",
+            use_alter=True,
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+    )
+    latest_verification_result = Column(
+        String, CheckConstraint("latest_verification_result IN ('pending', 'approved', 'rejected')")
+    )
+    latest_verification_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
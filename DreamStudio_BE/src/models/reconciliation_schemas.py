@@ -0,0 +1,36 @@
+from sqlalchemy import BigInteger, CheckConstraint, Column, DateTime, ForeignKey, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from src.helpers.db import Base
+
+
+class LedgerReconciliationRun(Base):
+    __tablename__ = "ledger_reconciliation_runs"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    mode = Column(Text, CheckConstraint("mode IN ('full', 'incremental')"), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    high_water_mark = Column(DateTime(timezone=True), nullable=False)
+    users_checked = Column(BigInteger, nullable=False, default=0)
+    ledger_rows = Column(BigInteger, nullable=False, default=0)
+    discrepancies = Column(BigInteger, nullable=False, default=0)
+
+
+class LedgerUserTotal(Base):
+    __tablename__ = "ledger_user_totals"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    ledger_balance = Column(BigInteger, nullable=False)
+
+
+class LedgerDiscrepancy(Base):
+    __tablename__ = "ledger_discrepancies"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    run_id = Column(
+        BigInteger, ForeignKey("ledger_reconciliation_runs.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    recorded_balance = Column(BigInteger, nullable=False)
+    ledger_balance = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,16 @@
+import uuid
+from sqlalchemy import BigInteger, Column, DateTime, Text, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from src.helpers.db import Base
+
+
+class TaskOutbox(Base):
+    __tablename__ = "task_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    task_id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
+    task_name = Column(Text, nullable=False)
+    args = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
+    kwargs = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    eta = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
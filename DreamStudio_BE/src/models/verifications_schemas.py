@@ -56,7 +56,7 @@ class Verification(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
-    goal = relationship("Goal")
+    goal = relationship("Goal", foreign_keys=[goal_id])
     photo = relationship("VerificationPhoto", back_populates="verification", uselist=False)
 
 
@@ -0,0 +1,23 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.helpers.auth_utils import require_admin, validate_access_token
+from src.helpers.db import async_engine, engine, get_db
+from src.helpers.db_pool import pool_snapshot
+
+router = APIRouter(prefix="/api/v1/admin/db-pool", tags=["Admin"])
+
+
+@router.get("/stats")
+def get_pool_stats(
+    user_id: UUID = Depends(validate_access_token),
+    db: Session = Depends(get_db),
+):
+    """Pool usage for the worker process that served this request."""
+    require_admin(db, user_id)
+    return {
+        "sync": pool_snapshot(engine),
+        "async": pool_snapshot(async_engine),
+    }
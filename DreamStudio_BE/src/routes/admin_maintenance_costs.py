@@ -5,9 +5,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from src.helpers.auth_utils import validate_access_token
+from src.helpers.auth_utils import require_admin, validate_access_token
 from src.helpers.db import get_db
-from src.models.auth_schemas import User
 from src.models.maintenance_cost_models import (
     MaintenanceCostIngestRequest,
     MaintenanceCostResponse,
@@ -19,20 +18,13 @@ from src.tasks.maintenance_cost_tasks import ingest_maintenance_costs_for_window
 router = APIRouter(prefix="/api/v1/admin/maintenance-costs", tags=["Admin"])
 
 
-def _require_admin(db: Session, user_id: UUID) -> User:
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user or user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin role required")
-    return user
-
-
 @router.post("/ingest")
 def queue_ingest(
     payload: MaintenanceCostIngestRequest | None = None,
     user_id: UUID = Depends(validate_access_token),
     db: Session = Depends(get_db),
 ):
-    _require_admin(db, user_id)
+    require_admin(db, user_id)
     if payload is None:
         task = ingest_maintenance_costs_for_window.delay()
     else:
@@ -48,7 +40,7 @@ def upsert_costs(
     user_id: UUID = Depends(validate_access_token),
     db: Session = Depends(get_db),
 ):
-    _require_admin(db, user_id)
+    require_admin(db, user_id)
     fee_amount_cents = payload.aws_cost_cents + payload.openai_cost_cents
     stmt = insert(WeeklyMaintenanceCost).values(
         week_start=payload.week_start,
@@ -89,7 +81,7 @@ def get_latest_cost(
     user_id: UUID = Depends(validate_access_token),
     db: Session = Depends(get_db),
 ):
-    _require_admin(db, user_id)
+    require_admin(db, user_id)
     row = (
         db.query(WeeklyMaintenanceCost)
         .order_by(WeeklyMaintenanceCost.week_start.desc())
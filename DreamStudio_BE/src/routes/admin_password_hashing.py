@@ -0,0 +1,20 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.helpers.auth_utils import require_admin, validate_access_token
+from src.helpers.db import get_db
+from src.helpers.password_hashing import password_hasher
+
+router = APIRouter(prefix="/api/v1/admin/password-hashing", tags=["Admin"])
+
+
+@router.get("/stats")
+def get_password_hashing_stats(
+    user_id: UUID = Depends(validate_access_token),
+    db: Session = Depends(get_db),
+):
+    """argon2 pool queue depth and latency for the worker process that served this request."""
+    require_admin(db, user_id)
+    return password_hasher.stats.snapshot()
@@ -0,0 +1,21 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.helpers.auth_utils import require_admin, validate_access_token
+from src.helpers.db import get_db
+from src.helpers.redis_client import get_broker_redis
+from src.helpers.task_outbox import relay_stats
+
+router = APIRouter(prefix="/api/v1/admin/task-outbox", tags=["Admin"])
+
+
+@router.get("/stats")
+def get_task_outbox_stats(
+    user_id: UUID = Depends(validate_access_token),
+    db: Session = Depends(get_db),
+):
+    """Outbox backlog (pending rows, age of the oldest) and relay throughput/lag counters."""
+    require_admin(db, user_id)
+    return relay_stats(db, get_broker_redis())
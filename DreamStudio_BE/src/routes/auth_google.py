@@ -1,21 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from ..models import auth_models, auth_schemas
 from ..helpers.db import get_db
+from ..helpers.google_certs import google_id_token_verifier
 from sqlalchemy.sql import func
-import os
+import logging
 
 router = APIRouter(prefix="/api/v1/auth/google", tags=["Google OAuth2"])
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID_WEB")
 
 @router.post("/signup", response_model=auth_models.LoginResponse)
 def signup_google(payload: auth_models.SignupGoogle, db: Session = Depends(get_db)):
     try:
-        idinfo = id_token.verify_oauth2_token(payload.id_token, requests.Request(), GOOGLE_CLIENT_ID)
-    except Exception:
+        idinfo = google_id_token_verifier.verify(payload.id_token)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid Google token")
+    except Exception:
+        logging.exception("Google signing certs unavailable")
+        raise HTTPException(status_code=503, detail="Auth service unavailable")
 
     email = idinfo.get("email")
     sub = idinfo.get("sub")
@@ -5,11 +5,12 @@ import ipaddress
 import hashlib
 import secrets
 from typing import Optional
-from passlib.hash import argon2
 from ..models import auth_models, auth_schemas
 from ..helpers.db import get_db
 from ..helpers import auth_utils as tk
-from ..helpers.email import send_verification_email
+from ..helpers.email import queue_verification_email
+from ..helpers.password_hashing import password_hasher
+from ..helpers.refresh_token_store import get_refresh_token_store
 from datetime import datetime, timezone, timedelta
 
 
@@ -51,6 +52,9 @@ def _generate_verification_token() -> tuple[str, str]:
 
 @router.post("/signup", response_model=auth_models.SignUpResponse)
 def signup_manual(payload: auth_models.SignupManual, request: Request, db: Session = Depends(get_db)):
+    # Hash before the first query: the session holds a pooled connection from
+    # then until commit, and argon2 can wait behind other sign-ins.
+    password_hash = password_hasher.hash(payload.password)
     existing = db.query(auth_schemas.User).filter(auth_schemas.User.email == payload.email).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -69,7 +73,7 @@ def signup_manual(payload: auth_models.SignupManual, request: Request, db: Sessi
         user_id=user.id,
         provider="password",
         email=payload.email,
-        password_hash=argon2.hash(payload.password),
+        password_hash=password_hash,
     )
     db.add(identity)
 
@@ -80,10 +84,9 @@ def signup_manual(payload: auth_models.SignupManual, request: Request, db: Sessi
         expires_at=datetime.now(timezone.utc) + timedelta(hours=24),
     )
     db.add(verification)
+    queue_verification_email(db, user.email, user.first_name, raw_token)
     db.commit()
     db.refresh(user)
-
-    send_verification_email(user.email, user.first_name, raw_token)
     return user
     
 
@@ -95,13 +98,24 @@ def login_manual(payload: auth_models.ManualLoginRequest, response: Response, db
             .filter(auth_schemas.AuthIdentity.email == payload.email, auth_schemas.AuthIdentity.provider == "password")
             .first()
         )
-    if not identity or not argon2.verify(payload.password, identity.password_hash):
+    if not identity:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    password_hash = identity.password_hash
+    # Return the connection to the pool while argon2 runs; the writes below
+    # start a new transaction.
+    db.rollback()
+    verified, new_hash = password_hasher.verify_and_update(payload.password, password_hash)
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     if not identity.user.is_active:
         raise HTTPException(status_code=403, detail="User not active yet")
+    if new_hash:
+        # Hashed with outdated argon2 parameters; committed with the login writes below.
+        identity.password_hash = new_hash
+        identity.password_updated_at = datetime.now(timezone.utc)
 
     access_token = tk.create_access_token(str(identity.user.id))
-    refresh_token = tk.create_refresh_token(db = db, user_id=identity.user.id)
+    refresh_token = get_refresh_token_store().issue(db, identity.user.id)
 
     identity.user.last_login_at = datetime.now(timezone.utc)
     db.commit()
@@ -153,7 +167,6 @@ def resend_verification(payload: auth_models.ResendVerificationRequest, db: Sess
         expires_at=datetime.now(timezone.utc) + timedelta(hours=24),
     )
     db.add(verification)
+    queue_verification_email(db, user.email, user.first_name, raw_token)
     db.commit()
-
-    send_verification_email(user.email, user.first_name, raw_token)
     return {"message": "If that email exists and is unverified, a new link has been sent"}
@@ -1,37 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from src.helpers.limiter import limiter
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select
+from typing import Literal, Optional
 from jose import jwt, JWTError, ExpiredSignatureError
 
-from src.helpers.goals_utils import current_goals_for_user
+from src.helpers.goals_utils import current_goals_for_user, current_goals_version, goal_history_page
+from src.helpers.etag_utils import etag_matches, make_etag, not_modified, set_etag
 from ..config import settings
 from ..helpers.auth_utils import validate_access_token
 from uuid import UUID
 from ..models import goal_models, goal_schemas
-from ..helpers.db import get_db
+from ..helpers.db import get_async_db
+from ..helpers.read_routing import get_async_read_db, mark_user_write
 from datetime import datetime, timezone
+import base64
 import logging
 from src.tasks.quiz_tasks import generate_quiz_for_goal
 from src.tasks.deadline_tasks import finalize_goal_at_deadline
-from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entry
+from src.helpers.bounty_ledger_utils import apply_bounty_holds, apply_bounty_ledger_entry
+from src.helpers.task_outbox import enqueue_task
+from src.helpers.goal_type_registry import goal_type_registry
 
 
 router = APIRouter(prefix="/api/v1/goals", tags=["Goals"])
+
+# Goal types are the same for every user and change rarely.
+GOAL_TYPES_CACHE_CONTROL = "private, max-age=300"
+
 @router.post("/newgoal", response_model=goal_models.goalResponse)
 @limiter.limit("20/hour")
-def create_goal(
+async def create_goal(
     request: Request,
     payload: goal_models.goalRequest,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    goaltype = (
-        db.query(goal_schemas.GoalType)
-          .filter(goal_schemas.GoalType.id == payload.goal_type_id)
-          .first()
-    )
+    goaltype = await goal_type_registry.get_async(payload.goal_type_id)
     if goaltype is None:
         raise HTTPException(status_code=400, detail="Invalid goal type")
 
@@ -46,42 +51,194 @@ def create_goal(
         created_at=datetime.now(timezone.utc),
     )
     db.add(new_goal)
-    db.flush()
-    apply_bounty_ledger_entry(user_id=user_id, 
-                              goal_id=new_goal.id, 
-                              ledger_type="hold", 
-                              bounty_amount=payload.bounty_amount,
-                              db=db)
-    
-    db.commit()
-    db.refresh(new_goal)
+    await db.flush()
+    await db.run_sync(
+        lambda sync_db: apply_bounty_ledger_entry(user_id=user_id,
+                                                  goal_id=new_goal.id,
+                                                  ledger_type="hold",
+                                                  bounty_amount=payload.bounty_amount,
+                                                  db=sync_db)
+    )
+
+    _enqueue_goal_tasks(db, new_goal, goaltype)
+
+    await db.commit()
+    await db.refresh(new_goal)
+    await mark_user_write(user_id)
+
+    return _goal_response(new_goal, goaltype)
+
 
-    # IMPORTANT: enqueue only AFTER commit
+def _goal_response(goal: goal_schemas.Goal, goaltype) -> goal_models.goalResponse:
+    # goal_type comes from the registry; serializing it must not lazy-load.
+    return goal_models.goalResponse.model_validate(
+        {
+            **{field: getattr(goal, field) for field in goal_models.goalResponse.model_fields if field != "goal_type"},
+            "goal_type": goal_models.goalTypeResponse.model_validate(goaltype),
+        }
+    )
+
+
+def _enqueue_goal_tasks(db: AsyncSession, goal: goal_schemas.Goal, goaltype) -> None:
+    # Follow-up tasks go through the outbox: they commit with the goal and
+    # the relay publishes them, so the request never waits on the broker.
+    # The relay puts the finalize message in the goal deadline sorted set
+    # rather than the broker (src.helpers.deadline_scheduler).
     if goaltype.verification_type == "quiz":
-        generate_quiz_for_goal.delay(str(new_goal.id))
-    deadline_utc = new_goal.deadline
+        enqueue_task(db, generate_quiz_for_goal, args=[str(goal.id)])
+    deadline_utc = goal.deadline
     if deadline_utc.tzinfo is None:
         deadline_utc = deadline_utc.replace(tzinfo=timezone.utc)
-    finalize_goal_at_deadline.apply_async(args=[str(new_goal.id)], eta=deadline_utc)
+    enqueue_task(db, finalize_goal_at_deadline, args=[str(goal.id)], eta=deadline_utc)
+
+
+@router.post("/newgoals", response_model=list[goal_models.goalResponse])
+@limiter.limit("20/hour")
+async def create_goals(
+    request: Request,
+    payload: goal_models.goalBatchRequest,
+    user_id: UUID = Depends(validate_access_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Create several goals in one transaction: every goal is validated first,
+    the total bounty is held with one balance update, and goals, ledger rows
+    and follow-up task messages are each written with one multi-row insert.
+    """
+    goaltypes = [await goal_type_registry.get_async(goal.goal_type_id) for goal in payload.goals]
+    errors = [
+        {"index": index, "detail": "Invalid goal type"}
+        for index, goaltype in enumerate(goaltypes)
+        if goaltype is None
+    ]
+    errors += [
+        {"index": index, "detail": "Bounty amount must not be negative"}
+        for index, goal in enumerate(payload.goals)
+        if goal.bounty_amount < 0
+    ]
+    if errors:
+        raise HTTPException(status_code=400, detail=sorted(errors, key=lambda error: error["index"]))
 
-    return new_goal
+    created_at = datetime.now(timezone.utc)
+    new_goals = (
+        await db.scalars(
+            insert(goal_schemas.Goal).returning(goal_schemas.Goal),
+            [
+                {
+                    "user_id": user_id,
+                    "goal_type_id": goal.goal_type_id,
+                    "title": goal.title,
+                    "description": goal.description,
+                    "user_input": goal.user_input,
+                    "bounty_amount": goal.bounty_amount,
+                    "deadline": goal.deadline,
+                    "created_at": created_at,
+                }
+                for goal in payload.goals
+            ],
+        )
+    ).all()
+
+    try:
+        await db.run_sync(
+            lambda sync_db: apply_bounty_holds(user_id=user_id,
+                                               holds=[(goal.id, goal.bounty_amount) for goal in new_goals],
+                                               db=sync_db)
+        )
+    except ValueError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    for goal, goaltype in zip(new_goals, goaltypes):
+        _enqueue_goal_tasks(db, goal, goaltype)
+
+    await db.commit()
+    await mark_user_write(user_id)
+
+    return [_goal_response(goal, goaltype) for goal, goaltype in zip(new_goals, goaltypes)]
 
 
 
     
 @router.get("/goaltypes", response_model=list[goal_models.goalTypeResponse])
 @limiter.limit("20/minute")
-def get_goal_types(request: Request, user_id: UUID = Depends(validate_access_token), db: Session = Depends(get_db)):
-    goal_types = db.query(goal_schemas.GoalType).all()
-    if not goal_types:
+async def get_goal_types(request: Request, response: Response, user_id: UUID = Depends(validate_access_token)):
+    snapshot = await goal_type_registry.snapshot_async()
+    if not snapshot.ordered:
         raise HTTPException(402, "Goal types not found")
 
-    return [goal_models.goalTypeResponse.model_validate(r) for r in goal_types]
+    etag = make_etag("goaltypes", snapshot.fingerprint)
+    if etag_matches(request, etag):
+        return not_modified(etag, GOAL_TYPES_CACHE_CONTROL)
+    set_etag(response, etag, GOAL_TYPES_CACHE_CONTROL)
+    return [goal_models.goalTypeResponse.model_validate(r) for r in snapshot.ordered]
+
+
+async def _current_goals_etag(version: int, current_count: int) -> str:
+    # No current goals is the same empty list whatever the counter says.
+    if current_count == 0:
+        version = 0
+    snapshot = await goal_type_registry.snapshot_async()
+    return make_etag("currentgoals", version, current_count, snapshot.fingerprint)
+
 
 @router.get("/getcurrentgoals", response_model=list[goal_models.currentGoalResponse])
 @limiter.limit("20/minute")
-def get_current_goals(request: Request, user_id: UUID = Depends(validate_access_token), db: Session = Depends(get_db)):
-    all_goals = current_goals_for_user(user_id, db)
+async def get_current_goals(request: Request, response: Response, user_id: UUID = Depends(validate_access_token), db: AsyncSession = Depends(get_async_read_db)):
+    if request.headers.get("if-none-match"):
+        etag = await _current_goals_etag(*await current_goals_version(user_id, db))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    all_goals = await current_goals_for_user(user_id, db)
+    version = all_goals[0].goals_version if all_goals else 0
+    set_etag(response, await _current_goals_etag(version, len(all_goals)))
     return [goal_models.currentGoalResponse.model_validate(r._mapping) for r in all_goals]
 
 
+def _encode_cursor(deadline: datetime, goal_id: UUID) -> str:
+    raw = f"{deadline.isoformat()}|{goal_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        deadline, goal_id = raw.split("|")
+        return datetime.fromisoformat(deadline), UUID(goal_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/history", response_model=goal_models.goalHistoryPage)
+@limiter.limit("60/minute")
+async def get_goal_history(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    status: Optional[list[Literal["pending", "canceled", "finalized", "validating"]]] = Query(None),
+    verification_status: Optional[list[Literal["completed", "failed", "not started"]]] = Query(None),
+    goal_type_id: Optional[list[UUID]] = Query(None),
+    user_id: UUID = Depends(validate_access_token),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """The user's goals, latest deadline first, one keyset page at a time."""
+    rows = await goal_history_page(
+        user_id,
+        db,
+        limit=limit,
+        after=_decode_cursor(cursor) if cursor else None,
+        statuses=status,
+        verification_statuses=verification_status,
+        goal_type_ids=goal_type_id,
+    )
+    page = rows[:limit]
+    items = []
+    for row in page:
+        goal_type = await goal_type_registry.get_async(row.goal_type_id) if row.goal_type_id else None
+        items.append(goal_models.goalHistoryItem.model_validate(
+            {**row._mapping, "goal_type_name": goal_type.name if goal_type else None}
+        ))
+    next_cursor = _encode_cursor(page[-1].deadline, page[-1].id) if len(rows) > limit else None
+    return goal_models.goalHistoryPage(items=items, next_cursor=next_cursor)
+
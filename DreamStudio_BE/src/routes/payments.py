@@ -1,12 +1,15 @@
 import logging
 import stripe
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.helpers.limiter import limiter
 from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entry
 from src.helpers.stripe_utils import construct_webhook_event, StripeWebhookError
 from src.helpers.auth_utils import validate_access_token
-from src.helpers.db import get_db
+from src.helpers.db import get_db, get_async_db
+from src.helpers.read_routing import mark_user_write
 from src.models.bounty_schemas import BountyTransaction
 from uuid import UUID
 from src.config import settings
@@ -72,7 +75,7 @@ def create_payment_intent(
 
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     logging.info("starting webhook api")
     if not STRIPE_WEBHOOK_SECRET:
         logging.info("Something")
@@ -100,10 +103,10 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
     payment_intent_id = data_object.get("id")
     logging.info("payment_intent_id")
     if payment_intent_id:
-        transaction = (
-            db.query(BountyTransaction)
+        transaction = await db.scalar(
+            select(BountyTransaction)
             .filter(BountyTransaction.payment_intent_id == payment_intent_id)
-            .first()
+            .limit(1)
         )
         if transaction:
             if event_type == "payment_intent.succeeded":
@@ -112,17 +115,20 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                     charge_id = data_object.get("latest_charge")
                     if charge_id:
                         transaction.charge_id = charge_id
-                    apply_bounty_ledger_entry(
-                        user_id=transaction.user_id,
-                        goal_id=None,
-                        ledger_type="fund",
-                        bounty_amount=transaction.amount,
-                        db=db,
+                    await db.run_sync(
+                        lambda sync_db: apply_bounty_ledger_entry(
+                            user_id=transaction.user_id,
+                            goal_id=None,
+                            ledger_type="fund",
+                            bounty_amount=transaction.amount,
+                            db=sync_db,
+                        )
                     )
             elif event_type == "payment_intent.payment_failed":
                 transaction.status = "failed"
             elif event_type == "payment_intent.processing":
                 transaction.status = "pending"
-            db.commit()
+            await db.commit()
+            await mark_user_write(transaction.user_id)
 
     return {"ok": True}
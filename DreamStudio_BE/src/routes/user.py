@@ -2,12 +2,15 @@ import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status, Response
 from src.helpers.limiter import limiter
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from src.helpers.db import get_db
-from src.helpers.auth_utils import validate_access_token, hash_refresh_token
+from src.helpers.db import get_async_db
+from src.helpers.read_routing import get_async_read_db
+from src.helpers.auth_utils import validate_access_token
+from src.helpers.etag_utils import etag_matches, make_etag, not_modified, set_etag
+from src.helpers.refresh_token_store import get_refresh_token_store
 from src.models.users_models import UsersResponseModel
-from src.models.auth_schemas import User, RefreshToken
+from src.models.auth_schemas import User
 from src.models.auth_models import LogOutRequest
 
 
@@ -15,27 +18,27 @@ router = APIRouter(prefix="/api/v1/user", tags=["User"])
 
 @router.get(path="/profile", response_model=UsersResponseModel)
 @limiter.limit("20/minute")
-def get_profile(request: Request, user_id: UUID = Depends(validate_access_token), db: Session = Depends(get_db)):
-    rs = db.query(User).filter(User.id == user_id).first()
+async def get_profile(request: Request, response: Response, user_id: UUID = Depends(validate_access_token), db: AsyncSession = Depends(get_async_read_db)):
+    rs = await db.get(User, user_id)
     if rs is None:
         raise HTTPException(status_code=404, detail="User not found")
 
     logging.info(rs.email)
+    # users.updated_at is set by a trigger on every change (migration 005).
+    etag = make_etag("profile", user_id, rs.updated_at.isoformat())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return rs
 
 @router.post("/logout")
 @limiter.limit("5/minute")
-def logout(request: Request, payload: LogOutRequest, response: Response, db: Session = Depends(get_db)):
+async def logout(request: Request, payload: LogOutRequest, response: Response, db: AsyncSession = Depends(get_async_db)):
     try:
-        rs = (db.query(RefreshToken)
-            .filter(RefreshToken.refresh_token == hash_refresh_token(payload.refresh_token))
-            .first())
-        if rs:
-            db.delete(rs)
-            db.commit()
+        if await get_refresh_token_store().revoke(db, payload.refresh_token):
             return {"message": "Logged out successfully"}
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Logout failed",
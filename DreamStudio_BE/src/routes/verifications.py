@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from src.helpers.limiter import limiter
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from uuid import UUID
 from src.models.verifications_models import PresignRequest, PresignResponse, ConfirmRequest, PhotoViewResponse, QuizQuestionResponse, QuizSubmitRequest, VerificationTypeResponse, CreateVerificationResponse
 from src.models import verifications_schemas, goal_schemas, auth_schemas
@@ -12,99 +15,109 @@ from src.helpers.s3 import (
     build_s3_uri,
     parse_s3_uri,
 )
-from src.helpers.db import get_db
+from src.helpers.db import get_async_db
+from src.helpers.read_routing import get_async_read_db, mark_user_write
 from src.helpers.auth_utils import validate_access_token
 from src.tasks.evaluations import evaluate_photo_verification
+from src.helpers.latest_verification_utils import record_latest_verification
+from src.helpers.task_outbox import enqueue_task
 from src.helpers.verification_utils import get_quizzes, get_user, get_verification_and_goal, is_admin_or_owner, evaluate_quiz_submission
 
 router = APIRouter(prefix="/api/v1/verification", tags=["Goals"])
 
 @router.get("/verification-type/{goal_id}")
 @limiter.limit("20/minute")
-def get_verification_type(
+async def get_verification_type(
     request: Request,
     goal_id: UUID,
     response_model=VerificationTypeResponse,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    goal = db.query(goal_schemas.Goal).filter(goal_schemas.Goal.id == goal_id).first()
+    goal = await db.get(
+        goal_schemas.Goal, goal_id, options=[joinedload(goal_schemas.Goal.goal_type)]
+    )
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     verify_type = goal.goal_type.verification_type
+    questions = []
     if (verify_type == "quiz"):
-        rows = (db.query(verifications_schemas.QuizQuestions)
-                          .filter(verifications_schemas.QuizQuestions.goal_id == goal_id))
-        questions = [{"quiz_id": q.id, "question": q.question} for q in rows]
+        questions = await get_quizzes(db, goal_id)
     return VerificationTypeResponse(
         verification_type=verify_type,
-        questions=questions,
+        quiz_questions=questions,
     )
 
 @router.post("/create/{goal_id}", response_model=CreateVerificationResponse)
 @limiter.limit("10/hour")
-def create_verification(
+async def create_verification(
     request: Request,
     goal_id: UUID,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    goal = db.query(goal_schemas.Goal).filter(goal_schemas.Goal.id == goal_id).first()
+    goal = await db.get(
+        goal_schemas.Goal, goal_id, options=[joinedload(goal_schemas.Goal.goal_type)]
+    )
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
-    user = get_user(db, user_id)
+    user = await get_user(db, user_id)
     if not is_admin_or_owner(user, goal.user_id):
         raise HTTPException(status_code=403, detail="Not authorized to verify this goal")
     if goal.goal_type.verification_type != "photo":
         raise HTTPException(status_code=400, detail="Verification type must be photo")
-    existing = (
-        db.query(verifications_schemas.Verification)
+    existing = await db.scalar(
+        select(verifications_schemas.Verification)
         .filter(verifications_schemas.Verification.goal_id == goal_id)
         .filter(verifications_schemas.Verification.type == "photo")
         .filter(verifications_schemas.Verification.result == "pending")
-        .first()
+        .limit(1)
     )
     if existing:
         return CreateVerificationResponse(verification_id=str(existing.id))
     record = verifications_schemas.Verification(
         goal_id=goal_id,
         type="photo",
+        result="pending",
     )
+    record_latest_verification(goal, record)
     db.add(record)
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
+    await mark_user_write(user_id)
     return CreateVerificationResponse(verification_id=str(record.id))
 
 @router.get("/getquiz/{goal_id}")
 @limiter.limit("20/minute")
-def get_quiz(
+async def get_quiz(
     request: Request,
     goal_id: UUID,
     response_model=QuizQuestionResponse,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    return get_quizzes(db, goal_id)
+    return await get_quizzes(db, goal_id)
     
 
 @router.post("/quiz/submit")
 @limiter.limit("20/hour")
-def quiz_submit(
+async def quiz_submit(
     request: Request,
     payload: QuizSubmitRequest,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    result = evaluate_quiz_submission(db, payload.goal_id, payload.user_submission)
+    result = await evaluate_quiz_submission(db, payload.goal_id, payload.user_submission)
+    await mark_user_write(user_id)
     return {"result": result}
 
 @router.post("/photos/presign", response_model=PresignResponse)
 @limiter.limit("20/hour")
-def presign(
+async def presign(
     request: Request,
     req: PresignRequest,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     ext = req.file_ext.lower().strip()
     if ext not in [".jpg", ".jpeg", ".png", ".webp"]:
@@ -112,8 +125,8 @@ def presign(
     if not req.content_type.startswith("image/"):
         raise HTTPException(400, "Unsupported content type")
 
-    user = get_user(db, user_id)
-    verification, goal = get_verification_and_goal(db, req.verification_id)
+    user = await get_user(db, user_id)
+    verification, goal = await get_verification_and_goal(db, req.verification_id)
     if verification.type != "photo":
         raise HTTPException(status_code=400, detail="Verification type must be photo")
     if not is_admin_or_owner(user, goal.user_id):
@@ -126,14 +139,14 @@ def presign(
 
 @router.post("/photos/confirm")
 @limiter.limit("20/hour")
-def confirm(
+async def confirm(
     request: Request,
     req: ConfirmRequest,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = get_user(db, user_id)
-    verification, goal = get_verification_and_goal(db, req.verification_id)
+    user = await get_user(db, user_id)
+    verification, goal = await get_verification_and_goal(db, req.verification_id)
     if verification.type != "photo":
         raise HTTPException(status_code=400, detail="Verification type must be photo")
     if not is_admin_or_owner(user, goal.user_id):
@@ -142,13 +155,12 @@ def confirm(
     expected_prefix = f"verifications/{goal.user_id}/{req.verification_id}/"
     if not req.s3_key.startswith(expected_prefix):
         raise HTTPException(status_code=400, detail="Unexpected S3 key")
-    if not object_exists(req.s3_key):
+    if not await run_in_threadpool(object_exists, req.s3_key):
         raise HTTPException(status_code=400, detail="S3 object not found")
 
-    existing = (
-        db.query(verifications_schemas.VerificationPhoto)
+    existing = await db.scalar(
+        select(verifications_schemas.VerificationPhoto)
         .filter(verifications_schemas.VerificationPhoto.verification_id == req.verification_id)
-        .first()
     )
     image_url = build_s3_uri(req.s3_key)
     meta = dict(req.meta or {})
@@ -166,28 +178,28 @@ def confirm(
         )
         db.add(record)
     goal.status = "validating"
-    db.commit()
-    evaluate_photo_verification.delay(req.verification_id)
+    enqueue_task(db, evaluate_photo_verification, args=[req.verification_id])
+    await db.commit()
+    await mark_user_write(user_id)
     return {"ok": True}
 
 
 @router.get("/verification-photos/{verification_id}", response_model=PhotoViewResponse)
 @limiter.limit("20/minute")
-def get_photo(
+async def get_photo(
     request: Request,
     verification_id: str,
     user_id: UUID = Depends(validate_access_token),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    user = get_user(db, user_id)
-    verification, goal = get_verification_and_goal(db, verification_id)
+    user = await get_user(db, user_id)
+    verification, goal = await get_verification_and_goal(db, verification_id)
     if not is_admin_or_owner(user, goal.user_id):
         raise HTTPException(status_code=403, detail="Not authorized to view this photo")
 
-    photo = (
-        db.query(verifications_schemas.VerificationPhoto)
+    photo = await db.scalar(
+        select(verifications_schemas.VerificationPhoto)
         .filter(verifications_schemas.VerificationPhoto.verification_id == verification_id)
-        .first()
     )
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
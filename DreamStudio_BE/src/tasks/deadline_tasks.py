@@ -1,11 +1,19 @@
+import logging
+import time
+import uuid
 from datetime import datetime, timezone
-from sqlalchemy import or_
+from types import SimpleNamespace
+from sqlalchemy import text
+from sqlalchemy.orm import Session
 from src.celery_app import celery_app
-from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entry
+from src.config import settings
+from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entries, apply_bounty_ledger_entry
 from src.helpers.db import SessionLocal
+from src.helpers.deadline_scheduler import GOAL_DEADLINES_CLAIMED_KEY, claim_due_goals
+from src.helpers.redis_client import get_broker_redis
+from src.helpers.task_outbox import encode_message
 from src.models.bounty_schemas import BountyLedger
 from src.models.goal_schemas import Goal
-from src.models.verifications_schemas import Verification
 
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
@@ -25,6 +33,9 @@ def finalize_goal_at_deadline(self, goal_id: str):
             if goal.finalized_at is not None or goal.status == "finalized":
                 return {"status": "already_finalized", "goal_id": goal_id}
 
+            if goal.status == "canceled":
+                return {"status": "canceled", "goal_id": goal_id}
+
             now = datetime.now(timezone.utc)
             if goal.deadline > now:
                 return {"status": "not_due_yet", "goal_id": goal_id}
@@ -33,6 +44,8 @@ def finalize_goal_at_deadline(self, goal_id: str):
                 db.query(BountyLedger)
                 .filter(BountyLedger.goal_id == goal.id)
                 .filter(BountyLedger.type.in_(("release", "forfeit")))
+                # Lets the planner skip ledger partitions from before the goal.
+                .filter(BountyLedger.created_at >= goal.created_at)
                 .first()
             )
             if terminal_entry is not None:
@@ -44,15 +57,7 @@ def finalize_goal_at_deadline(self, goal_id: str):
                     goal.verification_status = "failed"
                 return {"status": "already_settled", "goal_id": goal_id}
 
-            latest_verification = (
-                db.query(Verification)
-                .filter(Verification.goal_id == goal.id)
-                .order_by(Verification.updated_at.desc())
-                .first()
-            )
-            is_approved = bool(
-                latest_verification is not None and latest_verification.result == "approved"
-            )
+            is_approved = goal.latest_verification_result == "approved"
 
             if is_approved:
                 apply_bounty_ledger_entry(
@@ -84,29 +89,189 @@ def finalize_goal_at_deadline(self, goal_id: str):
         db.close()
 
 
+# Claims overdue goals with their latest verification result and terminal
+# ledger entry (if a release/forfeit was already written) in one statement.
+# {where} selects the goals and {lock} how to treat rows another worker holds.
+# A goal's ledger rows are never older than the goal, and bounding created_at
+# by it lets each lateral lookup skip the partitions from before the goal.
+CLAIM_OVERDUE_SQL = """
+SELECT g.id, g.user_id, g.bounty_amount, g.latest_verification_result,
+       terminal.type AS terminal_type
+FROM goals g
+LEFT JOIN LATERAL (
+  SELECT bl.type FROM bounty_ledger bl
+  WHERE bl.goal_id = g.id AND bl.type IN ('release', 'forfeit')
+    AND bl.created_at >= g.created_at
+  LIMIT 1
+) terminal ON TRUE
+WHERE g.deadline <= :now
+  AND g.finalized_at IS NULL
+  AND g.status IN ('pending', 'validating')
+  {where}
+ORDER BY {order}
+LIMIT :batch_size
+FOR UPDATE OF g {lock}
+"""
+
+# Overdue goals in deadline order; rows locked by another worker are skipped,
+# so any number of finalizers can run side by side.
+CLAIM_OVERDUE_SKIP_LOCKED_SQL = text(
+    CLAIM_OVERDUE_SQL.format(where="", order="g.deadline", lock="SKIP LOCKED")
+)
+
+# Specific goals whose deadline the scheduler reported due. These wait for
+# locks instead of skipping, since no sweep would pick a skipped goal up
+# before the hourly backstop.
+CLAIM_GOALS_SQL = text(
+    CLAIM_OVERDUE_SQL.format(where="AND g.id = ANY(:goal_ids)", order="g.id", lock="")
+)
+
+FINALIZE_GOALS_SQL = text(
+    """
+UPDATE goals g
+SET status = 'finalized', finalized_at = :now, verification_status = outcome.verification_status
+FROM unnest(CAST(:goal_ids AS uuid[]), CAST(:verification_statuses AS text[]))
+  AS outcome(goal_id, verification_status)
+WHERE g.id = outcome.goal_id
+    """
+)
+
+
+def finalize_goal_chunk(
+    db: Session,
+    now: datetime,
+    batch_size: int,
+    goal_ids: list[str] | None = None,
+) -> dict:
+    """
+    Finalize one chunk of overdue goals in a single transaction: release or
+    forfeit every unsettled bounty in one bulk ledger write, then mark the
+    whole chunk finalized.
+    Without goal_ids the chunk is the next batch_size overdue goals nobody
+    else has locked.
+    """
+    counts = {"released": 0, "forfeited": 0, "already_settled": 0}
+    with db.begin():
+        if goal_ids is None:
+            claimed = db.execute(CLAIM_OVERDUE_SKIP_LOCKED_SQL, {"now": now, "batch_size": batch_size}).all()
+        else:
+            claimed = db.execute(
+                CLAIM_GOALS_SQL,
+                {"now": now, "batch_size": batch_size, "goal_ids": [uuid.UUID(str(g)) for g in goal_ids]},
+            ).all()
+        if not claimed:
+            return counts
+
+        outcomes, entries = [], []
+        for goal in claimed:
+            if goal.terminal_type is not None:
+                released = goal.terminal_type == "release"
+                counts["already_settled"] += 1
+            else:
+                released = goal.latest_verification_result == "approved"
+                entries.append(
+                    (goal.user_id, goal.id, "release" if released else "forfeit", goal.bounty_amount)
+                )
+                counts["released" if released else "forfeited"] += 1
+            outcomes.append((goal.id, "completed" if released else "failed"))
+
+        apply_bounty_ledger_entries(entries, db)
+
+        db.execute(
+            FINALIZE_GOALS_SQL,
+            {
+                "now": now,
+                "goal_ids": [goal_id for goal_id, _ in outcomes],
+                "verification_statuses": [status for _, status in outcomes],
+            },
+        )
+    return counts
+
+
+def finalize_overdue_goals(db: Session, batch_size: int, run_budget_seconds: float) -> dict:
+    """Finalize overdue goals chunk by chunk until none are left or the budget is spent."""
+    totals = {"released": 0, "forfeited": 0, "already_settled": 0}
+    started = time.perf_counter()
+    while time.perf_counter() - started < run_budget_seconds:
+        counts = finalize_goal_chunk(db, datetime.now(timezone.utc), batch_size)
+        for key, value in counts.items():
+            totals[key] += value
+        if sum(counts.values()) < batch_size:
+            break
+    return totals
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
+def finalize_goals_at_deadline(self, goal_ids: list[str]):
+    db = SessionLocal()
+    try:
+        return finalize_goal_chunk(db, datetime.now(timezone.utc), len(goal_ids), goal_ids)
+    except Exception as e:
+        db.rollback()
+        raise self.retry(exc=e)
+    finally:
+        db.close()
+
+
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
 def sweep_overdue_goals(self):
-    now = datetime.now(timezone.utc)
     db = SessionLocal()
     try:
-        overdue_goal_ids = (
-            db.query(Goal.id)
-            .filter(Goal.deadline <= now)
-            .filter(Goal.finalized_at.is_(None))
-            .filter(
-                or_(
-                    Goal.status == "pending",
-                    Goal.status == "validating",
-                    Goal.status.is_(None),
-                )
+        totals = finalize_overdue_goals(
+            db, settings.goal_finalize_batch_size, settings.goal_finalize_run_budget_seconds
+        )
+        if any(totals.values()):
+            logging.info("Swept overdue goals %s", totals)
+        return totals
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def dispatch_due_batch(broker, now: float, batch_size: int, lease_seconds: float) -> int:
+    """
+    Claim up to batch_size due goals from the deadline sorted set and publish
+    one finalize_goals_at_deadline message per finalize chunk, in one round
+    trip.
+    """
+    goal_ids = claim_due_goals(broker, now, batch_size, lease_seconds)
+    if not goal_ids:
+        return 0
+    chunk_size = settings.goal_finalize_batch_size
+    pipe = broker.pipeline(transaction=False)
+    for start in range(0, len(goal_ids), chunk_size):
+        queue, payload = encode_message(
+            SimpleNamespace(
+                task_id=uuid.uuid4(),
+                task_name=finalize_goals_at_deadline.name,
+                args=[goal_ids[start:start + chunk_size]],
+                kwargs={},
+                eta=None,
             )
-            .limit(500)
-            .all()
         )
+        pipe.lpush(queue, payload)
+    # Published goals leave the claimed set in the same round trip; any that
+    # do not are claimed again once their lease runs out.
+    pipe.zrem(GOAL_DEADLINES_CLAIMED_KEY, *goal_ids)
+    pipe.execute()
+    return len(goal_ids)
 
-        for (goal_id,) in overdue_goal_ids:
-            finalize_goal_at_deadline.delay(str(goal_id))
 
-        return {"queued": len(overdue_goal_ids)}
-    finally:
-        db.close()
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=5)
+def dispatch_due_goal_deadlines(self):
+    broker = get_broker_redis()
+    batch_size = settings.goal_deadline_dispatch_batch_size
+    started = time.perf_counter()
+    dispatched = 0
+    while time.perf_counter() - started < settings.task_outbox_run_budget_seconds:
+        count = dispatch_due_batch(
+            broker, time.time(), batch_size, settings.goal_deadline_claim_lease_seconds
+        )
+        dispatched += count
+        if count < batch_size:
+            break
+    if dispatched:
+        logging.info("Dispatched finalization for %s due goals", dispatched)
+    return {"dispatched": dispatched}
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from celery import chain
+from sqlalchemy import insert
 
 from src.celery_app import celery_app
-from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entry
+from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entries
 from src.helpers.db import SessionLocal
 from src.helpers.maintenance_cost_utils import calculation_window_utc
 from src.models.distribution_schemas import (
@@ -174,6 +175,7 @@ def distribute_weekly_pool(
                 }
 
             distributed_total_cents = 0
+            payouts, items = [], []
             for goal_type_id, net_for_type_cents in net_by_type.items():
                 if net_for_type_cents <= 0:
                     continue
@@ -195,23 +197,22 @@ def distribute_weekly_pool(
                     if payout_cents <= 0:
                         continue
 
-                    apply_bounty_ledger_entry(
-                        user_id=goal.user_id,
-                        goal_id=goal.id,
-                        ledger_type="fund",
-                        bounty_amount=payout_cents,
-                        db=db,
+                    payouts.append((goal.user_id, goal.id, "fund", payout_cents))
+                    items.append(
+                        {
+                            "distribution_id": distribution.id,
+                            "goal_id": goal.id,
+                            "user_id": goal.user_id,
+                            "goal_bounty_cents": int(goal.bounty_amount),
+                            "payout_cents": payout_cents,
+                        }
                     )
-                    item = WeeklyPoolDistributionItem(
-                        distribution_id=distribution.id,
-                        goal_id=goal.id,
-                        user_id=goal.user_id,
-                        goal_bounty_cents=int(goal.bounty_amount),
-                        payout_cents=payout_cents,
-                    )
-                    db.add(item)
                     distributed_total_cents += payout_cents
 
+            # Every payout in one balance update and one ledger insert.
+            apply_bounty_ledger_entries(payouts, db)
+            if items:
+                db.execute(insert(WeeklyPoolDistributionItem), items)
             distribution.distributed_total_cents = distributed_total_cents
 
         return {
@@ -0,0 +1,157 @@
+import logging
+from collections import defaultdict
+
+from botocore.exceptions import BotoCoreError, ClientError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.celery_app import celery_app
+from src.config import settings
+from src.helpers.db import SessionLocal
+from src.helpers.email import SES_BULK_LIMIT, ensure_email_templates, get_ses_client, send_bulk_templated
+
+# A claimed row that is neither sent nor rescheduled within this window (the
+# worker died mid-send) becomes due again.
+SEND_LEASE = "10 minutes"
+
+# Per-destination SES statuses that will not succeed on retry.
+PERMANENT_FAILURES = {"MessageRejected", "InvalidParameterValue"}
+
+CLAIM_SQL = text(
+    f"""
+UPDATE email_outbox
+SET status = 'sending',
+    attempts = attempts + 1,
+    next_attempt_at = now() + interval '{SEND_LEASE}'
+WHERE id IN (
+  SELECT id FROM email_outbox
+  WHERE status IN ('pending', 'sending') AND next_attempt_at <= now()
+  ORDER BY next_attempt_at
+  LIMIT :batch_size
+  FOR UPDATE SKIP LOCKED
+)
+RETURNING id, template, recipient, template_data, attempts
+    """
+)
+
+MARK_SENT_SQL = text(
+    """
+UPDATE email_outbox
+SET status = 'sent', sent_at = now(), ses_message_id = :message_id,
+    template_data = NULL, last_error = NULL
+WHERE id = :id
+    """
+)
+
+MARK_FAILED_SQL = text(
+    """
+UPDATE email_outbox
+SET status = 'failed', template_data = NULL, last_error = :error
+WHERE id = :id
+    """
+)
+
+RESCHEDULE_SQL = text(
+    """
+UPDATE email_outbox
+SET status = 'pending', last_error = :error,
+    next_attempt_at = now() + make_interval(secs => :delay_seconds)
+WHERE id = :id
+    """
+)
+
+
+def _retry_delay_seconds(attempts: int) -> int:
+    return 30 * 2 ** (attempts - 1)
+
+
+def _send_chunk(ses, template: str, rows) -> list[tuple[object, str, str | None]]:
+    """(row, outcome, detail) for each row; outcome is sent, retry or failed."""
+    try:
+        statuses = send_bulk_templated(ses, template, [(row.recipient, row.template_data) for row in rows])
+    except ClientError as exc:
+        code = exc.response["Error"]["Code"]
+        if code == "TemplateDoesNotExist":
+            ensure_email_templates(ses)
+        logging.warning("SES bulk send of %s %s emails failed: %s", len(rows), template, code)
+        return [(row, "retry", code) for row in rows]
+    except BotoCoreError as exc:
+        # Connection errors and timeouts: SES may not have seen the chunk.
+        logging.warning("SES bulk send of %s %s emails failed: %s", len(rows), template, exc)
+        return [(row, "retry", type(exc).__name__) for row in rows]
+
+    results = []
+    for row, status in zip(rows, statuses):
+        if status["Status"] == "Success":
+            results.append((row, "sent", status.get("MessageId")))
+        elif status["Status"] in PERMANENT_FAILURES:
+            results.append((row, "failed", f"{status['Status']}: {status.get('Error', '')}"))
+        else:
+            results.append((row, "retry", f"{status['Status']}: {status.get('Error', '')}"))
+    return results
+
+
+def _record_outcomes(db: Session, results, counts: dict) -> None:
+    sent, failed, rescheduled = [], [], []
+    for row, outcome, detail in results:
+        if outcome == "retry" and row.attempts >= settings.email_outbox_max_attempts:
+            outcome = "failed"
+        counts[outcome] += 1
+        if outcome == "sent":
+            sent.append({"id": row.id, "message_id": detail})
+        elif outcome == "failed":
+            failed.append({"id": row.id, "error": detail})
+        else:
+            rescheduled.append({
+                "id": row.id,
+                "error": detail,
+                "delay_seconds": _retry_delay_seconds(row.attempts),
+            })
+
+    if sent:
+        db.execute(MARK_SENT_SQL, sent)
+    if failed:
+        db.execute(MARK_FAILED_SQL, failed)
+    if rescheduled:
+        db.execute(RESCHEDULE_SQL, rescheduled)
+
+
+def drain_outbox(db: Session, ses, batch_size: int, max_batches: int = 10) -> dict:
+    """Send due outbox rows in claimed batches and record each recipient's outcome."""
+    counts = {"sent": 0, "retry": 0, "failed": 0}
+    for _ in range(max_batches):
+        claimed = db.execute(CLAIM_SQL, {"batch_size": batch_size}).all()
+        db.commit()
+        if not claimed:
+            break
+
+        by_template = defaultdict(list)
+        for row in claimed:
+            by_template[row.template].append(row)
+
+        for template, rows in by_template.items():
+            for start in range(0, len(rows), SES_BULK_LIMIT):
+                results = _send_chunk(ses, template, rows[start:start + SES_BULK_LIMIT])
+                # Record each chunk as soon as it is sent, so a worker dying
+                # mid-batch does not resend chunks SES already accepted.
+                _record_outcomes(db, results, counts)
+                db.commit()
+
+        if len(claimed) < batch_size:
+            break
+    return counts
+
+
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=30)
+def drain_email_outbox(self):
+    db = SessionLocal()
+    try:
+        counts = drain_outbox(db, get_ses_client(), settings.email_outbox_batch_size)
+        if any(counts.values()):
+            logging.info("Email outbox drained %s", counts)
+        return counts
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -3,6 +3,7 @@ from src.celery_app import celery_app
 from src.helpers.db import SessionLocal
 from src.helpers.s3 import presign_get
 from src.helpers.openai import evaluate_photo
+from src.helpers.latest_verification_utils import record_latest_verification
 from src.helpers.verification_utils import get_photo_verification_record, serp_image_search, hash_image, compare_image
 
 
@@ -58,6 +59,8 @@ def evaluate_photo_verification(self, verification_id: str):
             goal.verification_status = "failed"
             goal.status = "pending"
 
+        record_latest_verification(goal, verification)
+
         meta = dict(photo.meta or {})
         meta["ai_check"] = {
             "is_true": result.is_true,
@@ -0,0 +1,68 @@
+import logging
+
+from src.celery_app import celery_app
+from src.helpers.db import SessionLocal
+from src.helpers.latest_verification_utils import (
+    find_stale_latest_verifications,
+    goal_id_batch,
+    sync_latest_verifications,
+)
+
+
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=60)
+def backfill_latest_verifications(self, batch_size: int = 1000):
+    """Fill goals.latest_verification_* for every goal, one committed batch at a time."""
+    db = SessionLocal()
+    try:
+        after_id = None
+        scanned = 0
+        updated = 0
+        while True:
+            goal_ids = goal_id_batch(db, after_id, batch_size)
+            if not goal_ids:
+                break
+            updated += len(sync_latest_verifications(db, goal_ids))
+            db.commit()
+            scanned += len(goal_ids)
+            after_id = goal_ids[-1]
+        logging.info("Latest verification backfill scanned=%s updated=%s", scanned, updated)
+        return {"scanned": scanned, "updated": updated}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=60)
+def check_latest_verification_consistency(self, repair: bool = True, batch_size: int = 1000):
+    """Compare the denormalized pointer with the verifications table."""
+    db = SessionLocal()
+    try:
+        after_id = None
+        scanned = 0
+        stale: list[str] = []
+        while True:
+            goal_ids = goal_id_batch(db, after_id, batch_size)
+            if not goal_ids:
+                break
+            stale_ids = find_stale_latest_verifications(db, goal_ids)
+            if stale_ids and repair:
+                sync_latest_verifications(db, stale_ids)
+                db.commit()
+            else:
+                db.rollback()
+            stale.extend(str(goal_id) for goal_id in stale_ids)
+            scanned += len(goal_ids)
+            after_id = goal_ids[-1]
+        if stale:
+            logging.warning(
+                "Latest verification pointer mismatch on %s goals (repaired=%s), e.g. %s",
+                len(stale), repair, stale[:10],
+            )
+        return {"scanned": scanned, "stale": len(stale), "repaired": repair, "sample": stale[:10]}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,186 @@
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.celery_app import celery_app
+from src.config import settings
+from src.helpers.bounty_ledger_utils import BALANCE_DELTA_SQL
+from src.helpers.db import SessionLocal
+
+ARCHIVE_SCHEMA = "ledger_archive"
+
+PARTITIONS_SQL = text(
+    """
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound, i.inhdetachpending
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'bounty_ledger'::regclass
+    """
+)
+
+LATEST_SNAPSHOT_SQL = text(
+    "SELECT max(period_end) FROM bounty_balance_snapshots WHERE period_end < :before"
+)
+
+# Each user's ledger sum before period_end: the previous snapshot plus the
+# rows between it and period_end, so only the partitions in that range are
+# read. Users with no ledger rows get no snapshot row (their sum is zero).
+WRITE_SNAPSHOT_SQL = text(
+    f"""
+INSERT INTO bounty_balance_snapshots (period_end, user_id, ledger_balance)
+SELECT :period_end, user_id, sum(delta)::bigint
+FROM (
+  SELECT user_id, ledger_balance AS delta
+  FROM bounty_balance_snapshots
+  WHERE period_end = :previous
+  UNION ALL
+  SELECT user_id, {BALANCE_DELTA_SQL}
+  FROM bounty_ledger
+  WHERE created_at >= COALESCE(CAST(:previous AS timestamptz), '-infinity')
+    AND created_at < :period_end
+) deltas
+GROUP BY user_id
+ON CONFLICT (period_end, user_id) DO NOTHING
+    """
+)
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass(frozen=True)
+class LedgerPartition:
+    name: str
+    lower: datetime | None  # None for MINVALUE (the pre-partitioning table)
+    upper: datetime
+    detach_pending: bool
+
+
+def _bound_value(value: str) -> datetime | None:
+    if value == "MINVALUE":
+        return None
+    return datetime.fromisoformat(value.strip("'")).astimezone(timezone.utc)
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month_start: datetime, months: int) -> datetime:
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def ledger_partitions(db: Session) -> list[LedgerPartition]:
+    """bounty_ledger's partitions, oldest first."""
+    partitions = []
+    for name, bound, detach_pending in db.execute(PARTITIONS_SQL).tuples():
+        lower, upper = _BOUND_RE.search(bound).groups()
+        partitions.append(LedgerPartition(name, _bound_value(lower), _bound_value(upper), detach_pending))
+    return sorted(partitions, key=lambda p: p.upper)
+
+
+def create_future_partitions(db: Session, now: datetime, months_ahead: int) -> list[str]:
+    """Create monthly partitions until the month `months_ahead` after now's is covered."""
+    horizon = _add_months(_month_start(now), months_ahead + 1)
+    partitions = ledger_partitions(db)
+    lower = partitions[-1].upper
+    created = []
+    while lower < horizon:
+        upper = _add_months(lower, 1)
+        name = f"bounty_ledger_p{lower:%Y%m}"
+        # Creating a partition locks the parent; don't queue behind a long
+        # transaction and stall every ledger write with it. The next run
+        # tries again.
+        db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF bounty_ledger "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+        db.commit()
+        created.append(name)
+        lower = upper
+    return created
+
+
+def write_balance_snapshot(db: Session, period_end: datetime) -> int:
+    """Write every user's ledger sum before period_end; returns the rows written."""
+    previous = db.execute(LATEST_SNAPSHOT_SQL, {"before": period_end}).scalar()
+    return db.execute(WRITE_SNAPSHOT_SQL, {"period_end": period_end, "previous": previous}).rowcount
+
+
+def archive_partition(db: Session, partition: LedgerPartition) -> None:
+    """Detach a partition without blocking ledger writes and move it to ARCHIVE_SCHEMA."""
+    preparer = db.get_bind().dialect.identifier_preparer
+    name = preparer.quote(partition.name)
+    # DETACH ... CONCURRENTLY cannot run in a transaction block. If an earlier
+    # attempt was interrupted, the partition is left pending and FINALIZE
+    # completes it.
+    mode = "FINALIZE" if partition.detach_pending else "CONCURRENTLY"
+    # The detach waits out every transaction that may use the table,
+    # including this session's.
+    db.commit()
+    with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"ALTER TABLE bounty_ledger DETACH PARTITION {name} {mode}"))
+        conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+
+
+def maintain_partitions(
+    db: Session, months_ahead: int, retention_months: int, snapshot_lag: timedelta
+) -> dict:
+    """
+    Keep bounty_ledger partitioned ahead of time, snapshot balances at each
+    closed partition boundary, and archive partitions past retention.
+
+    A boundary is snapshotted once it is snapshot_lag in the past, so
+    transactions that started before it (their created_at is their start
+    time) have committed. Reconciliation starts from the latest snapshot, so
+    a partition is only archived once a snapshot at or after its upper bound
+    exists.
+    """
+    now: datetime = db.execute(text("SELECT now()")).scalar()
+    created = create_future_partitions(db, now, months_ahead)
+
+    snapshots = {}
+    latest = db.execute(LATEST_SNAPSHOT_SQL, {"before": now}).scalar()
+    for partition in ledger_partitions(db):
+        boundary = partition.upper
+        if boundary > now - snapshot_lag or (latest is not None and boundary <= latest):
+            continue
+        snapshots[boundary.isoformat()] = write_balance_snapshot(db, boundary)
+        db.commit()
+        latest = boundary
+
+    archived = []
+    expired_before = _add_months(_month_start(now), -retention_months)
+    for partition in ledger_partitions(db):
+        if partition.upper > expired_before or latest is None or partition.upper > latest:
+            continue
+        archive_partition(db, partition)
+        archived.append(partition.name)
+
+    return {"created": created, "snapshots": snapshots, "archived": archived}
+
+
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=60)
+def maintain_bounty_ledger_partitions(self):
+    db = SessionLocal()
+    try:
+        result = maintain_partitions(
+            db,
+            settings.ledger_partition_months_ahead,
+            settings.ledger_partition_retention_months,
+            timedelta(seconds=settings.ledger_snapshot_lag_seconds),
+        )
+        logging.info("Ledger partition maintenance %s", result)
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,217 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.celery_app import celery_app
+from src.config import settings
+from src.helpers.bounty_ledger_utils import balance_delta
+from src.helpers.db import SessionLocal
+
+LAST_RUN_SQL = text(
+    """
+SELECT high_water_mark FROM ledger_reconciliation_runs
+WHERE finished_at IS NOT NULL
+ORDER BY id DESC
+LIMIT 1
+    """
+)
+
+START_RUN_SQL = text(
+    """
+INSERT INTO ledger_reconciliation_runs (mode, high_water_mark)
+VALUES (:mode, :high_water_mark)
+RETURNING id
+    """
+)
+
+FINISH_RUN_SQL = text(
+    """
+UPDATE ledger_reconciliation_runs
+SET finished_at = clock_timestamp(), users_checked = :users_checked,
+    ledger_rows = :ledger_rows, discrepancies = :discrepancies
+WHERE id = :run_id
+    """
+)
+
+LATEST_SNAPSHOT_SQL = text(
+    "SELECT max(period_end) FROM bounty_balance_snapshots WHERE period_end <= :cutoff"
+)
+
+# Both streams are ordered by user id so they can be merged one user at a
+# time. A full run checks every user starting from the latest balance
+# snapshot (or zero), reading only the ledger partitions after it; an
+# incremental run checks users whose balance changed or who have ledger rows
+# since the previous high-water mark, starting from their stored totals. Ids
+# are compared as text, which sorts the same way as uuid and compares much
+# faster in Python.
+FULL_USERS_SQL = text(
+    """
+SELECT u.id::text, u.bounty_balance, COALESCE(s.ledger_balance, 0) AS base
+FROM users u
+LEFT JOIN bounty_balance_snapshots s ON s.user_id = u.id AND s.period_end = :snapshot
+ORDER BY u.id
+    """
+)
+
+INCREMENTAL_USERS_SQL = text(
+    """
+SELECT u.id::text, u.bounty_balance, COALESCE(t.ledger_balance, 0) AS base
+FROM users u
+LEFT JOIN ledger_user_totals t ON t.user_id = u.id
+WHERE u.updated_at > :since
+   OR u.id IN (SELECT user_id FROM bounty_ledger WHERE created_at > :since)
+ORDER BY u.id
+    """
+)
+
+FULL_LEDGER_SQL = text(
+    """
+SELECT user_id::text, type, amount, created_at <= :cutoff AS settled
+FROM bounty_ledger
+WHERE created_at >= COALESCE(CAST(:snapshot AS timestamptz), '-infinity')
+ORDER BY user_id
+    """
+)
+
+INCREMENTAL_LEDGER_SQL = text(
+    """
+SELECT user_id::text, type, amount, created_at <= :cutoff AS settled
+FROM bounty_ledger
+WHERE created_at > :since
+ORDER BY user_id
+    """
+)
+
+UPSERT_TOTAL_SQL = text(
+    """
+INSERT INTO ledger_user_totals (user_id, ledger_balance)
+VALUES (:user_id, :ledger_balance)
+ON CONFLICT (user_id) DO UPDATE SET ledger_balance = EXCLUDED.ledger_balance
+    """
+)
+
+INSERT_DISCREPANCY_SQL = text(
+    """
+INSERT INTO ledger_discrepancies (run_id, user_id, recorded_balance, ledger_balance)
+VALUES (:run_id, :user_id, :recorded_balance, :ledger_balance)
+    """
+)
+
+
+def reconcile_ledger(db: Session, full: bool, batch_size: int, lag: timedelta) -> dict:
+    """
+    Compare every affected user's balance with the sum of their ledger
+    entries, streaming users and ledger rows through server-side cursors and
+    holding one user's running totals at a time. Mismatches are written to
+    ledger_discrepancies.
+
+    Everything is read in one REPEATABLE READ snapshot, so a balance and the
+    ledger rows written with it are always seen together. Ledger rows up to
+    `lag` before the snapshot are folded into ledger_user_totals and the
+    high-water mark moves there; newer rows are checked but read again next
+    run, since a transaction still open at the snapshot can commit rows with
+    an earlier created_at. A full run starts from the latest
+    bounty_balance_snapshots period at or before the cutoff rather than zero,
+    since older ledger partitions may already be archived.
+    """
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    snapshot_at: datetime = db.execute(text("SELECT now()")).scalar()
+    cutoff = snapshot_at - lag
+
+    since = None if full else db.execute(LAST_RUN_SQL).scalar()
+    mode = "full" if since is None else "incremental"
+    run_id = db.execute(START_RUN_SQL, {"mode": mode, "high_water_mark": cutoff}).scalar()
+
+    stream = {"yield_per": batch_size}
+    balance_snapshot = None
+    if mode == "full":
+        db.execute(text("DELETE FROM ledger_user_totals"))
+        balance_snapshot = db.execute(LATEST_SNAPSHOT_SQL, {"cutoff": cutoff}).scalar()
+        users = db.execute(FULL_USERS_SQL, {"snapshot": balance_snapshot}, execution_options=stream)
+        ledger = db.execute(
+            FULL_LEDGER_SQL, {"snapshot": balance_snapshot, "cutoff": cutoff}, execution_options=stream
+        )
+    else:
+        users = db.execute(INCREMENTAL_USERS_SQL, {"since": since}, execution_options=stream)
+        ledger = db.execute(
+            INCREMENTAL_LEDGER_SQL, {"since": since, "cutoff": cutoff}, execution_options=stream
+        )
+
+    counts = {"users_checked": 0, "ledger_rows": 0, "discrepancies": 0}
+    totals, discrepancies = [], []
+
+    def flush():
+        if totals:
+            db.execute(UPSERT_TOTAL_SQL, totals)
+            totals.clear()
+        if discrepancies:
+            db.execute(INSERT_DISCREPANCY_SQL, discrepancies)
+            discrepancies.clear()
+
+    done = (None, None, 0, False)
+    entries = iter(ledger.tuples())
+    entry_user, entry_type, amount, is_settled = next(entries, done)
+    for user_id, recorded_balance, base in users.tuples():
+        # Ledger users are a subset of the user stream, so nothing sorts
+        # before the current user unless the user row is gone.
+        while entry_user is not None and entry_user < user_id:
+            entry_user, entry_type, amount, is_settled = next(entries, done)
+
+        settled = unsettled = 0
+        settled_rows = 0
+        while entry_user == user_id:
+            if is_settled:
+                settled += balance_delta(entry_type, amount)
+                settled_rows += 1
+            else:
+                unsettled += balance_delta(entry_type, amount)
+            counts["ledger_rows"] += 1
+            entry_user, entry_type, amount, is_settled = next(entries, done)
+
+        counts["users_checked"] += 1
+        if settled_rows or base:
+            totals.append({"user_id": user_id, "ledger_balance": base + settled})
+        ledger_balance = base + settled + unsettled
+        if ledger_balance != recorded_balance:
+            counts["discrepancies"] += 1
+            discrepancies.append({
+                "run_id": run_id,
+                "user_id": user_id,
+                "recorded_balance": recorded_balance,
+                "ledger_balance": ledger_balance,
+            })
+        if len(totals) + len(discrepancies) >= batch_size:
+            flush()
+
+    flush()
+    db.execute(FINISH_RUN_SQL, {"run_id": run_id, **counts})
+    db.commit()
+    return {
+        "run_id": run_id,
+        "mode": mode,
+        "high_water_mark": cutoff.isoformat(),
+        "balance_snapshot": balance_snapshot.isoformat() if balance_snapshot else None,
+        **counts,
+    }
+
+
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=60)
+def reconcile_bounty_ledger(self, full: bool = False):
+    db = SessionLocal()
+    try:
+        result = reconcile_ledger(
+            db,
+            full,
+            settings.ledger_reconciliation_batch_size,
+            timedelta(seconds=settings.ledger_reconciliation_lag_seconds),
+        )
+        log = logging.warning if result["discrepancies"] else logging.info
+        log("Ledger reconciliation %s", result)
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,161 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from src.celery_app import celery_app
+from src.config import settings
+from src.helpers.db import SessionLocal
+from src.helpers.redis_client import get_redis
+from src.helpers.refresh_token_store import REFRESH_TOKEN_AUDIT_DEAD_KEY, REFRESH_TOKEN_AUDIT_KEY
+
+INSERT_ISSUED_SQL = text(
+    """
+INSERT INTO refresh_tokens (user_id, refresh_token, expires_at, created_at)
+SELECT CAST(:user_id AS uuid), :token_hash, :expires_at, :at
+-- A deleted user's Redis token can still rotate; there is nothing to record.
+WHERE EXISTS (SELECT 1 FROM users WHERE id = CAST(:user_id AS uuid))
+ON CONFLICT (refresh_token) DO NOTHING
+    """
+)
+
+REVOKE_SQL = text(
+    """
+UPDATE refresh_tokens
+SET revoked_at = :at
+WHERE refresh_token = :token_hash AND revoked_at IS NULL
+    """
+)
+
+REVOKE_USER_SQL = text(
+    """
+UPDATE refresh_tokens
+SET revoked_at = :at
+WHERE user_id = :user_id AND revoked_at IS NULL AND created_at <= :at
+    """
+)
+
+
+def _ts(epoch: float) -> datetime:
+    return datetime.fromtimestamp(float(epoch), tz=timezone.utc)
+
+
+def _split_events(raw_events: list[str]) -> tuple[list[dict], list[dict], list[dict], list[str]]:
+    """(issued, revoked, reused, malformed raw events)."""
+    issued, revoked, reused, malformed = [], [], [], []
+    for raw in raw_events:
+        try:
+            _split_event(raw, issued, revoked, reused)
+        except (ValueError, KeyError, TypeError):
+            malformed.append(raw)
+    return issued, revoked, reused, malformed
+
+
+def _split_event(raw: str, issued: list[dict], revoked: list[dict], reused: list[dict]) -> None:
+    # Rows are only appended once the whole event has parsed.
+    event = json.loads(raw)
+    kind = event["event"]
+    if kind == "issued":
+        issued.append({
+            "user_id": event["user_id"],
+            "token_hash": event["token_hash"],
+            "expires_at": _ts(event["expires_at"]),
+            "at": _ts(event["at"]),
+        })
+    elif kind == "rotated":
+        at = _ts(event["at"])
+        new_row = {
+            "user_id": event["user_id"],
+            "token_hash": event["new_hash"],
+            "expires_at": _ts(event["expires_at"]),
+            "at": at,
+        }
+        old_row = {"token_hash": event["old_hash"], "at": at}
+        issued.append(new_row)
+        revoked.append(old_row)
+    elif kind == "revoked":
+        revoked.append({"token_hash": event["token_hash"], "at": _ts(event["at"])})
+    elif kind == "reused":
+        reused.append({"user_id": event["user_id"], "at": _ts(event["at"])})
+    else:
+        raise ValueError(f"unknown refresh token audit event {kind!r}")
+
+
+def _write_events(db, raw_events: list[str]) -> list[str]:
+    """Write events in the session's transaction; returns the malformed ones."""
+    issued, revoked, reused, malformed = _split_events(raw_events)
+    # Inserts first so a token issued and revoked in the same batch ends up
+    # with its revoked_at set.
+    if issued:
+        db.execute(INSERT_ISSUED_SQL, issued)
+    if revoked:
+        db.execute(REVOKE_SQL, revoked)
+    if reused:
+        db.execute(REVOKE_USER_SQL, reused)
+    return malformed
+
+
+def _write_one_at_a_time(db, redis_client, raw_events: list[str]) -> list[str]:
+    """
+    After a batch failed on its data, write each event in its own
+    transaction; returns the events that could not be written.
+    """
+    dead = []
+    for i, raw in enumerate(raw_events):
+        try:
+            dead += _write_events(db, [raw])
+            db.commit()
+        except OperationalError:
+            db.rollback()
+            redis_client.lpush(REFRESH_TOKEN_AUDIT_KEY, *reversed(raw_events[i:]))
+            raise
+        except SQLAlchemyError:
+            db.rollback()
+            dead.append(raw)
+    return dead
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
+def flush_refresh_token_audit(self, max_batches: int = 20):
+    """
+    Write queued Redis refresh-token events to refresh_tokens, one committed
+    batch at a time. A batch that fails because the database is unreachable
+    is put back at the head of the queue; events that cannot be written
+    (malformed, or rejected by the database) go to REFRESH_TOKEN_AUDIT_DEAD_KEY
+    so they never block the events behind them.
+    """
+    redis_client = get_redis()
+    batch_size = settings.refresh_token_audit_batch_size
+    written = dead_lettered = 0
+    db = SessionLocal()
+    try:
+        for _ in range(max_batches):
+            raw_events = redis_client.lpop(REFRESH_TOKEN_AUDIT_KEY, batch_size)
+            if not raw_events:
+                break
+            try:
+                dead = _write_events(db, raw_events)
+                db.commit()
+            except OperationalError:
+                db.rollback()
+                redis_client.lpush(REFRESH_TOKEN_AUDIT_KEY, *reversed(raw_events))
+                raise
+            except SQLAlchemyError:
+                db.rollback()
+                dead = _write_one_at_a_time(db, redis_client, raw_events)
+            if dead:
+                redis_client.rpush(REFRESH_TOKEN_AUDIT_DEAD_KEY, *dead)
+                logging.warning("Refresh token audit dead-lettered %s events: %s", len(dead), dead[:3])
+            written += len(raw_events) - len(dead)
+            dead_lettered += len(dead)
+            if len(raw_events) < batch_size:
+                break
+        if written or dead_lettered:
+            logging.info("Refresh token audit flushed %s events", written)
+        return {"written": written, "dead_lettered": dead_lettered}
+    except Exception as exc:
+        raise self.retry(exc=exc)
+    finally:
+        db.close()
@@ -0,0 +1,40 @@
+import logging
+import time
+
+from src.celery_app import celery_app
+from src.config import settings
+from src.helpers.db import SessionLocal
+from src.helpers.redis_client import get_broker_redis
+from src.helpers.task_outbox import relay_batch
+
+
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=5)
+def relay_task_outbox(self):
+    """
+    Publish committed task_outbox rows to the broker until the outbox is
+    empty or the run budget is spent. Concurrent runs claim disjoint rows.
+    """
+    db = SessionLocal()
+    broker = get_broker_redis()
+    batch_size = settings.task_outbox_batch_size
+    started = time.perf_counter()
+    published, max_lag = 0, 0.0
+    try:
+        while time.perf_counter() - started < settings.task_outbox_run_budget_seconds:
+            count, lag = relay_batch(db, broker, batch_size)
+            published += count
+            max_lag = max(max_lag, lag)
+            if count < batch_size:
+                break
+        if published:
+            elapsed = time.perf_counter() - started
+            logging.info(
+                "Task outbox relayed %s messages in %.3fs (%.0f/s), max lag %.0fms",
+                published, elapsed, published / elapsed, max_lag * 1000,
+            )
+        return {"published": published, "max_lag_ms": round(max_lag * 1000, 1)}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,208 @@
+import logging
+import time
+from uuid import UUID
+
+from redis import Redis, RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.celery_app import celery_app
+from src.config import settings
+from src.helpers.db import SessionLocal
+from src.helpers.redis_client import get_redis
+
+# Rows each table no longer needs once the retention window has passed.
+PURGE_CONDITIONS = {
+    "refresh_tokens": (
+        "expires_at < now() - make_interval(days => :retention_days) "
+        "OR revoked_at < now() - make_interval(days => :retention_days)"
+    ),
+    "email_verification_tokens": (
+        "expires_at < now() - make_interval(days => :retention_days) "
+        "OR used_at < now() - make_interval(days => :retention_days)"
+    ),
+}
+
+TABLE_BLOAT_SQL = text(
+    """
+SELECT n_live_tup, n_dead_tup, pg_total_relation_size(relid) AS total_bytes,
+       last_autovacuum, last_vacuum
+FROM pg_stat_user_tables
+WHERE relname = :table
+    """
+)
+
+MIN_BATCH_SIZE = 100
+_UUID_MIN = UUID(int=0)
+
+
+def _cursor_key(table: str) -> str:
+    return f"token_purge:cursor:{table}"
+
+
+def _load_cursor(redis_client: Redis | None, table: str) -> UUID:
+    if redis_client is None:
+        return _UUID_MIN
+    try:
+        value = redis_client.get(_cursor_key(table))
+    except RedisError:
+        logging.warning("Token purge cursor for %s unavailable; starting from the beginning", table, exc_info=True)
+        return _UUID_MIN
+    return UUID(value) if value else _UUID_MIN
+
+
+def _save_cursor(redis_client: Redis | None, table: str, after_id: UUID) -> None:
+    if redis_client is None:
+        return
+    try:
+        redis_client.set(_cursor_key(table), str(after_id))
+    except RedisError:
+        logging.warning("Could not save the token purge cursor for %s", table, exc_info=True)
+
+
+def _purge_batch_sql(table: str):
+    # Walk the primary key so each batch starts where the last one stopped
+    # instead of rescanning rows that were already kept.
+    return text(
+        f"""
+WITH batch AS (
+  SELECT id FROM {table}
+  WHERE id > :after_id
+  ORDER BY id
+  LIMIT :batch_size
+), doomed AS (
+  DELETE FROM {table} t
+  USING batch
+  WHERE t.id = batch.id AND ({PURGE_CONDITIONS[table]})
+  RETURNING t.id
+)
+SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last_id,
+       (SELECT count(*) FROM batch) AS scanned,
+       (SELECT count(*) FROM doomed) AS deleted
+        """
+    )
+
+
+def table_bloat(db: Session, table: str) -> dict:
+    row = db.execute(TABLE_BLOAT_SQL, {"table": table}).first()
+    if row is None:
+        return {}
+    total = (row.n_live_tup or 0) + (row.n_dead_tup or 0)
+    return {
+        "live_rows": row.n_live_tup,
+        "dead_rows": row.n_dead_tup,
+        "dead_ratio": round(row.n_dead_tup / total, 4) if total else 0.0,
+        "total_bytes": row.total_bytes,
+        "last_autovacuum": row.last_autovacuum.isoformat() if row.last_autovacuum else None,
+    }
+
+
+def purge_table(
+    db: Session,
+    table: str,
+    batch_size: int,
+    batch_budget_ms: int,
+    run_budget_seconds: float,
+    retention_days: int,
+    redis_client: Redis | None = None,
+) -> dict:
+    """
+    Delete stale rows from table in primary-key order, one committed batch at
+    a time. The batch size halves when a batch overruns batch_budget_ms (or
+    hits the statement timeout) and doubles again when batches run well under.
+
+    With redis_client, each run resumes where the previous one stopped and
+    wraps around at the end of the table, so a run budget too small for the
+    whole table still reaches every row over successive runs. finished means
+    a full lap completed.
+    """
+    statement = _purge_batch_sql(table)
+    max_batch_size = batch_size
+    start_id = after_id = _load_cursor(redis_client, table)
+    wrapped = start_id == _UUID_MIN
+    started = time.monotonic()
+    scanned = deleted = batches = timeouts = 0
+    finished = False
+
+    try:
+        while time.monotonic() - started < run_budget_seconds:
+            batch_started = time.monotonic()
+            try:
+                # Hard stop at twice the budget so one batch can never run away.
+                db.execute(text(f"SET LOCAL statement_timeout = {int(batch_budget_ms * 2)}"))
+                row = db.execute(
+                    statement,
+                    {"after_id": after_id, "batch_size": batch_size, "retention_days": retention_days},
+                ).first()
+                db.commit()
+            except OperationalError:
+                db.rollback()
+                timeouts += 1
+                if batch_size <= MIN_BATCH_SIZE:
+                    raise
+                batch_size = max(batch_size // 2, MIN_BATCH_SIZE)
+                continue
+
+            if not row.scanned:
+                after_id = _UUID_MIN
+                if wrapped:
+                    finished = True
+                    break
+                wrapped = True
+                continue
+            batches += 1
+            scanned += row.scanned
+            deleted += row.deleted
+            after_id = row.last_id
+            if wrapped and start_id != _UUID_MIN and after_id >= start_id:
+                finished = True
+                break
+
+            elapsed_ms = (time.monotonic() - batch_started) * 1000
+            if elapsed_ms > batch_budget_ms:
+                batch_size = max(batch_size // 2, MIN_BATCH_SIZE)
+            elif elapsed_ms < batch_budget_ms / 4:
+                batch_size = min(batch_size * 2, max_batch_size)
+    finally:
+        # Also on the way out of a failing batch, so the next run resumes here.
+        _save_cursor(redis_client, table, after_id)
+
+    elapsed = time.monotonic() - started
+    return {
+        "table": table,
+        "scanned": scanned,
+        "deleted": deleted,
+        "batches": batches,
+        "timeouts": timeouts,
+        "finished": finished,
+        "seconds": round(elapsed, 3),
+        "deleted_per_second": round(deleted / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+@celery_app.task(bind=True, max_retries=0, default_retry_delay=60)
+def purge_stale_tokens(self):
+    """Delete expired, revoked and used token rows and report table bloat."""
+    db = SessionLocal()
+    try:
+        report = {}
+        for table in PURGE_CONDITIONS:
+            result = purge_table(
+                db,
+                table,
+                batch_size=settings.token_purge_batch_size,
+                batch_budget_ms=settings.token_purge_batch_budget_ms,
+                run_budget_seconds=settings.token_purge_run_budget_seconds,
+                retention_days=settings.token_purge_retention_days,
+                redis_client=get_redis(),
+            )
+            result["bloat"] = table_bloat(db, table)
+            report[table] = result
+            logging.info("Token purge %s", result)
+        return report
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
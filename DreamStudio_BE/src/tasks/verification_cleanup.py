@@ -2,6 +2,7 @@ from datetime import datetime, timedelta, timezone
 from sqlalchemy import select
 from src.celery_app import celery_app
 from src.helpers.db import SessionLocal
+from src.helpers.latest_verification_utils import sync_latest_verifications
 from src.models import verifications_schemas
 
 
@@ -25,9 +26,13 @@ def cleanup_abandoned_photo_verifications(self):
                 .all()
             )
             deleted = 0
+            goal_ids = {record.goal_id for record in stale}
             for record in stale:
                 db.delete(record)
                 deleted += 1
+            db.flush()
+            # A deleted pending verification may have been the goal's latest.
+            sync_latest_verifications(db, list(goal_ids))
         return {"deleted": deleted}
     finally:
         db.close()
@@ -0,0 +1,88 @@
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entries, apply_bounty_ledger_entry
+from src.helpers.db import SessionLocal
+from src.helpers.query_stats import track_queries
+
+
+def _balance(db, user_id):
+    return db.execute(text("SELECT bounty_balance FROM users WHERE id = :id"), {"id": user_id}).scalar()
+
+
+def _ledger(db, user_id):
+    return sorted(
+        db.execute(
+            text("SELECT type, amount FROM bounty_ledger WHERE user_id = :id"), {"id": user_id}
+        ).all()
+    )
+
+
+def test_entries_net_per_user_in_two_statements(db, make_user):
+    alice, bob = make_user(100), make_user(0)
+    entries = [
+        (alice, None, "fund", 50),
+        (alice, None, "hold", 120),
+        (alice, None, "forfeit", 120),
+        (bob, None, "release", 30),
+        (bob, None, "refund", 5),
+    ]
+
+    with track_queries() as stats:
+        balances = apply_bounty_ledger_entries(entries, db)
+    db.commit()
+
+    assert stats.count == 2
+    assert balances == {alice: 30, bob: 35}
+    assert _balance(db, alice) == 30 and _balance(db, bob) == 35
+    assert _ledger(db, alice) == [("forfeit", 120), ("fund", 50), ("hold", 120)]
+    assert _ledger(db, bob) == [("refund", 5), ("release", 30)]
+
+
+def test_any_negative_balance_rejects_the_batch(db, make_user):
+    rich, poor = make_user(1000), make_user(10)
+
+    with pytest.raises(ValueError, match="Insufficient bounty balance"):
+        apply_bounty_ledger_entries([(rich, None, "hold", 100), (poor, None, "hold", 11)], db)
+    db.rollback()
+
+    assert _balance(db, rich) == 1000 and _balance(db, poor) == 10
+    assert _ledger(db, rich) == [] and _ledger(db, poor) == []
+
+
+def test_single_entry_updates_balance_and_ledger_in_one_statement(db, make_user):
+    user_id = make_user(100)
+
+    with track_queries() as stats:
+        assert apply_bounty_ledger_entry(user_id, None, "hold", 60, db) == 40
+    assert stats.count == 1
+    with pytest.raises(ValueError, match="Insufficient bounty balance"):
+        apply_bounty_ledger_entry(user_id, None, "hold", 41, db)
+    db.commit()
+
+    assert _balance(db, user_id) == 40
+    assert _ledger(db, user_id) == [("hold", 60)]
+    with pytest.raises(ValueError, match="User not found"):
+        apply_bounty_ledger_entry(uuid.uuid4(), None, "fund", 1, db)
+
+
+def test_concurrent_entries_do_not_lose_updates(db, make_user):
+    user_id = make_user(0)
+
+    def fund():
+        with SessionLocal() as session:
+            for _ in range(20):
+                apply_bounty_ledger_entry(user_id, None, "fund", 1, session)
+                session.commit()
+
+    threads = [threading.Thread(target=fund) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _balance(db, user_id) == 80
+    assert len(_ledger(db, user_id)) == 80
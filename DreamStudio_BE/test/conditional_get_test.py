@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from src.helpers.db import SessionLocal
+from src.main import app
+from query_budget import assert_max_queries
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def headers():
+    login_response = client.post(
+        "/api/v1/auth/manual/login",
+        json={"email": "kjh9643@gmail.com", "password": "temporary"}
+    )
+    assert login_response.status_code == 200
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+@pytest.mark.parametrize("path, budget", [
+    ("/api/v1/goals/getcurrentgoals", 1),
+    ("/api/v1/goals/goaltypes", 0),
+    ("/api/v1/user/profile", 1),
+])
+def test_matching_etag_returns_304(headers, path, budget):
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"].startswith("private")
+
+    revalidated = client.get(path, headers={**headers, "If-None-Match": f'W/{etag}, "other"'})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert_max_queries(revalidated, budget)
+
+
+def test_stale_etag_returns_body(headers):
+    response = client.get("/api/v1/user/profile", headers={**headers, "If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json()["email"] == "kjh9643@gmail.com"
+
+
+def test_deleting_a_user_with_goals_cascades_past_the_version_trigger():
+    db = SessionLocal()
+    user_id = db.execute(
+        text(
+            "INSERT INTO users (email, first_name, last_name) "
+            "VALUES (:email, 'Ver', 'Sion') RETURNING id"
+        ),
+        {"email": f"versions-{uuid.uuid4().hex[:10]}@example.com"},
+    ).scalar()
+    db.execute(
+        text(
+            "INSERT INTO goals (user_id, title, bounty_amount, deadline) "
+            "VALUES (:user_id, 'Version', 0, now() + interval '1 day')"
+        ),
+        {"user_id": user_id},
+    )
+    db.commit()
+    assert db.execute(text("SELECT version FROM user_goal_versions WHERE user_id = :id"), {"id": user_id}).scalar()
+
+    db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+    db.commit()
+
+    assert db.execute(text("SELECT count(*) FROM goals WHERE user_id = :id"), {"id": user_id}).scalar() == 0
+    db.close()
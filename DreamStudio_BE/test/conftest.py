@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from src.helpers.db import SessionLocal
+
+
+@pytest.fixture
+def make_user():
+    """
+    Creates committed users with a given bounty balance. They are deleted
+    after the test, and their goals, ledger rows, snapshots and
+    reconciliation rows go with them by cascade.
+    """
+    created = []
+
+    def make(balance=0):
+        with SessionLocal() as session:
+            user_id = session.execute(
+                text(
+                    "INSERT INTO users (email, first_name, last_name, bounty_balance) "
+                    "VALUES (:email, 'Test', 'User', :balance) RETURNING id"
+                ),
+                {"email": f"test-{uuid.uuid4().hex[:10]}@example.com", "balance": balance},
+            ).scalar()
+            session.commit()
+        created.append(user_id)
+        return user_id
+
+    yield make
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM users WHERE id = ANY(:ids)"), {"ids": created})
+        session.commit()
+
+
+@pytest.fixture
+def db(make_user):
+    """
+    A session rolled back and closed after the test. It depends on make_user
+    so it is torn down first and its open transaction cannot block the
+    user cleanup.
+    """
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    session.close()
@@ -0,0 +1,154 @@
+import uuid
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.helpers import email
+from src.helpers.db import SessionLocal
+from src.main import app
+from src.models.email_schemas import EmailOutbox
+from src.tasks.email_tasks import drain_outbox
+
+client = TestClient(app)
+
+
+class SesStandIn:
+    """Local stand-in for the SES client: records calls, scripted per-recipient outcomes."""
+
+    def __init__(self, outcomes=None, missing_template=False, fail_after=None):
+        self.outcomes = outcomes or {}
+        self.missing_template = missing_template
+        self.fail_after = fail_after  # (calls, exception) raised once that many calls succeeded
+        self.bulk_calls = []
+        self.templates = {}
+
+    def create_template(self, Template):
+        self.templates[Template["TemplateName"]] = Template
+        self.missing_template = False
+
+    def update_template(self, Template):
+        self.templates[Template["TemplateName"]] = Template
+
+    def send_bulk_templated_email(self, **kwargs):
+        if self.missing_template:
+            raise ClientError(
+                {"Error": {"Code": "TemplateDoesNotExist", "Message": "no template"}},
+                "SendBulkTemplatedEmail",
+            )
+        if self.fail_after and len(self.bulk_calls) >= self.fail_after[0]:
+            raise self.fail_after[1]
+        self.bulk_calls.append(kwargs)
+        statuses = []
+        for destination in kwargs["Destinations"]:
+            recipient = destination["Destination"]["ToAddresses"][0]
+            outcome = self.outcomes.get(recipient, "Success")
+            if outcome == "Success":
+                statuses.append({"Status": "Success", "MessageId": f"msg-{uuid.uuid4().hex}"})
+            else:
+                statuses.append({"Status": outcome, "Error": "stand-in"})
+        return {"Status": statuses}
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _queue(db, count):
+    recipients = [f"outbox-{uuid.uuid4().hex[:10]}@example.com" for _ in range(count)]
+    for recipient in recipients:
+        email.queue_verification_email(db, recipient, "Test", "raw-token")
+    db.commit()
+    return recipients
+
+
+def _rows(db, recipients):
+    return {
+        row.recipient: row
+        for row in db.query(EmailOutbox).filter(EmailOutbox.recipient.in_(recipients)).all()
+    }
+
+
+def test_signup_queues_email_without_calling_ses(monkeypatch):
+    stand_in = SesStandIn()
+    monkeypatch.setattr(email, "_ses", stand_in)
+    address = f"signup-{uuid.uuid4().hex[:10]}@example.com"
+    response = client.post(
+        "/api/v1/auth/manual/signup",
+        json={"email": address, "password": "temporary", "first_name": "Out", "last_name": "Box"},
+    )
+    assert response.status_code == 200
+    assert stand_in.bulk_calls == []
+    with SessionLocal() as session:
+        row = session.query(EmailOutbox).filter(EmailOutbox.recipient == address).one()
+        assert row.status == "pending"
+        assert row.template_data["verification_url"].startswith("goalstudio://verify-email?token=")
+
+
+def test_drain_records_per_recipient_status(db):
+    recipients = _queue(db, 3)
+    rejected, throttled = recipients[1], recipients[2]
+    stand_in = SesStandIn({rejected: "MessageRejected", throttled: "AccountThrottled"})
+
+    drain_outbox(db, stand_in, batch_size=500)
+    db.expire_all()
+    rows = _rows(db, recipients)
+
+    assert rows[recipients[0]].status == "sent"
+    assert rows[recipients[0]].ses_message_id.startswith("msg-")
+    assert rows[recipients[0]].template_data is None
+    assert rows[rejected].status == "failed"
+    assert rows[throttled].status == "pending"
+    assert rows[throttled].attempts == 1
+    db.execute(text("UPDATE email_outbox SET status = 'failed' WHERE recipient = :r"), {"r": throttled})
+    db.commit()
+
+
+def test_drain_sends_in_bulk_and_creates_missing_template(db):
+    recipients = _queue(db, 60)
+    stand_in = SesStandIn(missing_template=True)
+
+    drain_outbox(db, stand_in, batch_size=500)
+    assert stand_in.templates, "template should be created after TemplateDoesNotExist"
+    db.execute(
+        text("UPDATE email_outbox SET next_attempt_at = now() WHERE recipient = ANY(:r)"),
+        {"r": recipients},
+    )
+    db.commit()
+    drain_outbox(db, stand_in, batch_size=500)
+
+    db.expire_all()
+    assert {row.status for row in _rows(db, recipients).values()} == {"sent"}
+    assert all(len(call["Destinations"]) <= email.SES_BULK_LIMIT for call in stand_in.bulk_calls)
+
+
+def test_drain_records_each_chunk_before_sending_the_next(db):
+    recipients = _queue(db, email.SES_BULK_LIMIT + 5)
+    stand_in = SesStandIn(fail_after=(1, RuntimeError("worker lost")))
+
+    with pytest.raises(RuntimeError):
+        drain_outbox(db, stand_in, batch_size=500)
+    db.rollback()
+
+    statuses = [row.status for row in _rows(db, recipients).values()]
+    assert statuses.count("sent") == email.SES_BULK_LIMIT
+    db.execute(text("UPDATE email_outbox SET status = 'failed' WHERE recipient = ANY(:r)"), {"r": recipients})
+    db.commit()
+
+
+def test_drain_reschedules_a_chunk_on_connection_errors(db):
+    recipients = _queue(db, 2)
+    stand_in = SesStandIn(fail_after=(0, EndpointConnectionError(endpoint_url="https://email.invalid")))
+
+    counts = drain_outbox(db, stand_in, batch_size=500)
+
+    assert counts["retry"] >= 2
+    db.expire_all()
+    rows = _rows(db, recipients).values()
+    assert {(row.status, row.last_error) for row in rows} == {("pending", "EndpointConnectionError")}
+    db.execute(text("UPDATE email_outbox SET status = 'failed' WHERE recipient = ANY(:r)"), {"r": recipients})
+    db.commit()
@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from src.main import app
+from src.helpers.db import SessionLocal
+from src.helpers.goal_type_registry import goal_type_registry
+from query_budget import assert_max_queries
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def headers():
+    login_response = client.post(
+        "/api/v1/auth/manual/login",
+        json={"email": "kjh9643@gmail.com", "password": "temporary"}
+    )
+    assert login_response.status_code == 200
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+def _goal(goal_type_id, bounty_amount=100):
+    return {
+        "goal_type_id": str(goal_type_id),
+        "title": "Batch goal",
+        "description": "d",
+        "user_input": "u",
+        "bounty_amount": bounty_amount,
+        "deadline": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+    }
+
+
+def _goal_count(headers):
+    return len(client.get("/api/v1/goals/history", headers=headers, params={"limit": 100}).json()["items"])
+
+
+def test_reports_every_invalid_goal(headers):
+    valid = goal_type_registry.all()[0].id
+    response = client.post(
+        "/api/v1/goals/newgoals",
+        headers=headers,
+        json={"goals": [_goal(valid), _goal(uuid.uuid4()), _goal(valid, -1)]},
+    )
+    assert response.status_code == 400
+    assert [error["index"] for error in response.json()["detail"]] == [1, 2]
+
+
+def test_insufficient_balance_creates_nothing(headers):
+    before = _goal_count(headers)
+    valid = goal_type_registry.all()[0].id
+    response = client.post(
+        "/api/v1/goals/newgoals",
+        headers=headers,
+        json={"goals": [_goal(valid, 10**8), _goal(valid, 10**8)]},
+    )
+    assert response.status_code == 400
+    assert _goal_count(headers) == before
+
+
+def test_batch_size_is_bounded(headers):
+    valid = goal_type_registry.all()[0].id
+    assert client.post("/api/v1/goals/newgoals", headers=headers, json={"goals": []}).status_code == 422
+    too_many = {"goals": [_goal(valid)] * 51}
+    assert client.post("/api/v1/goals/newgoals", headers=headers, json=too_many).status_code == 422
+
+
+def test_creates_every_goal_with_one_balance_hold(headers):
+    valid = goal_type_registry.all()[0].id
+    db = SessionLocal()
+    balance = text("SELECT bounty_balance FROM users WHERE email = 'kjh9643@gmail.com'")
+    before = db.execute(balance).scalar()
+
+    response = client.post(
+        "/api/v1/goals/newgoals",
+        headers=headers,
+        json={"goals": [_goal(valid, 10), _goal(valid, 20), _goal(valid, 30)]},
+    )
+
+    assert response.status_code == 200
+    goal_ids = [goal["id"] for goal in response.json()]
+    try:
+        assert len(goal_ids) == 3
+        # goals, the one balance update, ledger holds, outbox rows: one statement each.
+        assert_max_queries(response, 4)
+        assert db.execute(text("SELECT count(*) FROM goals WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": goal_ids}).scalar() == 3
+        assert db.execute(balance).scalar() == before - 60
+        holds = db.execute(
+            text("SELECT goal_id, amount FROM bounty_ledger WHERE goal_id = ANY(CAST(:ids AS uuid[])) AND type = 'hold'"),
+            {"ids": goal_ids},
+        ).all()
+        assert sorted(amount for _, amount in holds) == [10, 20, 30]
+        finalizers = db.execute(
+            text(
+                "SELECT args->>0 FROM task_outbox "
+                "WHERE task_name = 'src.tasks.deadline_tasks.finalize_goal_at_deadline' AND args->>0 = ANY(:ids)"
+            ),
+            {"ids": goal_ids},
+        ).scalars().all()
+        assert sorted(finalizers) == sorted(goal_ids)
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM task_outbox WHERE args->>0 = ANY(:ids)"), {"ids": goal_ids})
+        db.execute(text("DELETE FROM bounty_ledger WHERE goal_id = ANY(CAST(:ids AS uuid[]))"), {"ids": goal_ids})
+        db.execute(text("DELETE FROM goals WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": goal_ids})
+        db.execute(text("UPDATE users SET bounty_balance = bounty_balance + 60 WHERE email = 'kjh9643@gmail.com'"))
+        db.commit()
+        db.close()
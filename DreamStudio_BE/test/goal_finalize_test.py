@@ -0,0 +1,101 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from src.helpers.db import SessionLocal
+from src.tasks.deadline_tasks import finalize_goal_chunk
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user_id(db):
+    user_id = db.execute(
+        text(
+            "INSERT INTO users (email, first_name, last_name, bounty_balance) "
+            "VALUES (:email, 'Fin', 'Alize', 1000) RETURNING id"
+        ),
+        {"email": f"finalize-{uuid.uuid4().hex[:10]}@example.com"},
+    ).scalar()
+    db.commit()
+    return user_id
+
+
+def _goal(db, user_id, result=None, deadline_delta=timedelta(hours=-1), bounty=100):
+    goal_id = db.execute(
+        text(
+            "INSERT INTO goals (user_id, title, bounty_amount, deadline, latest_verification_result) "
+            "VALUES (:user_id, 'Finalize', :bounty, :deadline, :result) RETURNING id"
+        ),
+        {
+            "user_id": user_id,
+            "bounty": bounty,
+            "deadline": datetime.now(timezone.utc) + deadline_delta,
+            "result": result,
+        },
+    ).scalar()
+    db.execute(
+        text("INSERT INTO bounty_ledger (user_id, goal_id, amount, type) VALUES (:u, :g, :a, 'hold')"),
+        {"u": user_id, "g": goal_id, "a": bounty},
+    )
+    db.commit()
+    return goal_id
+
+
+def _state(db, goal_id):
+    return db.execute(
+        text("SELECT status, verification_status FROM goals WHERE id = :id"), {"id": goal_id}
+    ).one()
+
+
+def _ledger_types(db, goal_id):
+    return sorted(
+        db.execute(text("SELECT type FROM bounty_ledger WHERE goal_id = :id"), {"id": goal_id}).scalars()
+    )
+
+
+def test_chunk_settles_every_goal_in_one_pass(db, user_id):
+    approved = _goal(db, user_id, "approved")
+    rejected = _goal(db, user_id, "rejected")
+    settled = _goal(db, user_id, "approved")
+    db.execute(
+        text("INSERT INTO bounty_ledger (user_id, goal_id, amount, type) VALUES (:u, :g, 100, 'release')"),
+        {"u": user_id, "g": settled},
+    )
+    not_due = _goal(db, user_id, "approved", deadline_delta=timedelta(hours=1))
+    db.commit()
+
+    counts = finalize_goal_chunk(
+        db, datetime.now(timezone.utc), 10, [str(g) for g in (approved, rejected, settled, not_due)]
+    )
+
+    assert counts == {"released": 1, "forfeited": 1, "already_settled": 1}
+    assert tuple(_state(db, approved)) == ("finalized", "completed")
+    assert tuple(_state(db, rejected)) == ("finalized", "failed")
+    assert tuple(_state(db, settled)) == ("finalized", "completed")
+    assert tuple(_state(db, not_due))[0] == "pending"
+    assert _ledger_types(db, approved) == ["hold", "release"]
+    assert _ledger_types(db, rejected) == ["forfeit", "hold"]
+    assert _ledger_types(db, settled) == ["hold", "release"]
+    balance = db.execute(text("SELECT bounty_balance FROM users WHERE id = :id"), {"id": user_id}).scalar()
+    assert balance == 1100
+
+
+def test_goals_locked_by_another_worker_are_skipped(db, user_id):
+    locked = _goal(db, user_id)
+    free = _goal(db, user_id)
+    with SessionLocal() as other:
+        other.execute(text("SELECT id FROM goals WHERE id = :id FOR UPDATE"), {"id": locked})
+
+        finalize_goal_chunk(db, datetime.now(timezone.utc), 1000)
+
+        assert _state(db, free).status == "finalized"
+        assert _state(db, locked).status == "pending"
+        db.rollback()
@@ -0,0 +1,95 @@
+import secrets
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from src.helpers.db import SessionLocal
+from src.main import app
+from query_budget import assert_max_queries
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def headers():
+    login_response = client.post(
+        "/api/v1/auth/manual/login",
+        json={"email": "kjh9643@gmail.com", "password": "temporary"}
+    )
+    assert login_response.status_code == 200
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+def test_pages_walk_history_in_deadline_order(headers):
+    everything = client.get("/api/v1/goals/history", headers=headers, params={"limit": 100}).json()["items"]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/goals/history", headers=headers, params=params)
+        assert response.status_code == 200
+        assert_max_queries(response, 1)
+        page = response.json()
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [item["id"] for item in seen] == [item["id"] for item in everything]
+    deadlines = [item["deadline"] for item in seen]
+    assert deadlines == sorted(deadlines, reverse=True)
+
+
+def test_filters_apply(headers):
+    response = client.get(
+        "/api/v1/goals/history",
+        headers=headers,
+        params={"status": ["finalized", "canceled"], "verification_status": "completed"},
+    )
+    assert response.status_code == 200
+    for item in response.json()["items"]:
+        assert item["status"] in ("finalized", "canceled")
+        assert item["verification_status"] == "completed"
+
+
+def test_rejects_bad_cursor_and_filter(headers):
+    assert client.get("/api/v1/goals/history", headers=headers, params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/v1/goals/history", headers=headers, params={"status": "unknown"}).status_code == 422
+
+
+def test_goals_without_a_type_are_listed(headers):
+    db = SessionLocal()
+    goal_id = db.execute(
+        text(
+            "INSERT INTO goals (user_id, goal_type_id, title, bounty_amount, deadline) "
+            "SELECT id, NULL, 'Typeless', 0, now() + interval '100 years' "
+            "FROM users WHERE email = 'kjh9643@gmail.com' RETURNING id"
+        )
+    ).scalar()
+    db.commit()
+    try:
+        response = client.get("/api/v1/goals/history", headers=headers, params={"limit": 1})
+        assert response.status_code == 200
+        [item] = response.json()["items"]
+        assert item["id"] == str(goal_id)
+        assert item["goal_type_id"] is None and item["goal_type_name"] is None
+    finally:
+        db.execute(text("DELETE FROM goals WHERE id = :id"), {"id": goal_id})
+        db.commit()
+        db.close()
+
+
+def test_long_titles_fit_the_history_index():
+    db = SessionLocal()
+    try:
+        # Incompressible, so it would exceed the B-tree row limit if indexed.
+        db.execute(
+            text(
+                "INSERT INTO goals (user_id, goal_type_id, title, bounty_amount, deadline) "
+                "SELECT (SELECT id FROM users LIMIT 1), (SELECT id FROM goal_types LIMIT 1), "
+                ":title, 0, now()"
+            ),
+            {"title": secrets.token_hex(4500)},
+        )
+    finally:
+        db.rollback()
+        db.close()
@@ -0,0 +1,105 @@
+import asyncio
+import time
+import uuid
+from types import MappingProxyType
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.helpers.goal_type_registry import GoalTypeInfo, GoalTypeRegistry, GoalTypeSnapshot, goal_type_registry
+from src.main import app
+from query_budget import assert_max_queries
+
+client = TestClient(app)
+
+
+class LoaderStandIn:
+    """Counts loads and serves whatever goal types the test puts in `rows`."""
+
+    def __init__(self, *rows, delay=0.0):
+        self.rows = list(rows)
+        self.loads = 0
+        self.delay = delay
+        self.loads_on_event_loop = 0
+
+    def __call__(self):
+        self.loads += 1
+        try:
+            asyncio.get_running_loop()
+            self.loads_on_event_loop += 1
+        except RuntimeError:
+            pass
+        time.sleep(self.delay)
+        return GoalTypeSnapshot.build(tuple(self.rows))
+
+
+def _goal_type(name="Read"):
+    return GoalTypeInfo(
+        id=uuid.uuid4(),
+        name=name,
+        description="d",
+        verification_type="quiz",
+        question_count=5,
+        gpt_prompt="p",
+        meta=MappingProxyType({}),
+    )
+
+
+def test_reads_are_served_from_one_snapshot():
+    read = _goal_type()
+    loader = LoaderStandIn(read)
+    registry = GoalTypeRegistry(loader=loader)
+    for _ in range(100):
+        assert registry.get(read.id) is read
+        assert registry.get(str(read.id)) is read
+        assert registry.all() == (read,)
+    assert loader.loads == 1
+
+
+def test_snapshot_is_immutable():
+    registry = GoalTypeRegistry(loader=LoaderStandIn(_goal_type()))
+    snapshot = registry.snapshot()
+    with pytest.raises(TypeError):
+        snapshot.by_id[uuid.uuid4()] = _goal_type()
+    with pytest.raises(AttributeError):
+        snapshot.ordered[0].name = "changed"
+
+
+def test_unknown_id_reloads_at_most_once_per_interval():
+    loader = LoaderStandIn(_goal_type())
+    registry = GoalTypeRegistry(loader=loader, miss_reload_interval=0.2)
+    registry.snapshot()
+    assert registry.get(uuid.uuid4()) is None
+    assert loader.loads == 1
+
+    time.sleep(0.25)
+    created = _goal_type("Gym")
+    loader.rows.append(created)
+    assert registry.get(created.id) is created
+    assert loader.loads == 2
+
+
+def test_async_reads_load_off_the_event_loop_once_per_burst():
+    read = _goal_type()
+    loader = LoaderStandIn(read, delay=0.05)
+    registry = GoalTypeRegistry(loader=loader, miss_reload_interval=0.0)
+
+    async def burst():
+        assert await registry.get_async(read.id) is read
+        return await asyncio.gather(*(registry.get_async(uuid.uuid4()) for _ in range(20)))
+
+    assert asyncio.run(burst()) == [None] * 20
+    assert loader.loads == 2
+    assert loader.loads_on_event_loop == 0
+
+
+def test_goal_types_route_skips_database_once_loaded():
+    login = client.post(
+        "/api/v1/auth/manual/login",
+        json={"email": "kjh9643@gmail.com", "password": "temporary"},
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    goal_type_registry.snapshot()
+    response = client.get("/api/v1/goals/goaltypes", headers=headers)
+    assert response.status_code == 200
+    assert_max_queries(response, 0)
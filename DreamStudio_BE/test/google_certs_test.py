@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt as google_jwt
+
+from src.helpers.google_certs import GoogleIdTokenVerifier
+
+AUDIENCE = "test-client-id.apps.googleusercontent.com"
+
+
+def _make_key(kid: str):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class KeyServer:
+    """Local stand-in for https://www.googleapis.com/oauth2/v1/certs."""
+
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+        self.certs: dict[str, str] = {}
+        self.private_keys: dict[str, str] = {}
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                body = json.dumps(server.certs).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={server.max_age}, must-revalidate")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/oauth2/v1/certs"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def add_key(self, kid: str) -> None:
+        self.private_keys[kid], self.certs[kid] = _make_key(kid)
+
+    def sign(self, kid: str, **overrides) -> str:
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": AUDIENCE,
+            "sub": "1234567890",
+            "email": "someone@example.com",
+            "email_verified": True,
+            "iat": now,
+            "exp": now + 3600,
+        }
+        claims.update(overrides)
+        signer = crypt.RSASigner.from_string(self.private_keys[kid], key_id=kid)
+        return google_jwt.encode(signer, claims).decode()
+
+
+@pytest.fixture
+def key_server():
+    server = KeyServer(max_age=3600)
+    server.add_key("kid-1")
+    yield server
+    server.httpd.shutdown()
+
+
+def test_verifies_locally_after_first_fetch(key_server):
+    verifier = GoogleIdTokenVerifier(key_server.url, AUDIENCE)
+    token = key_server.sign("kid-1")
+    for _ in range(50):
+        assert verifier.verify(token)["sub"] == "1234567890"
+    assert key_server.requests == 1
+
+
+def test_rejects_wrong_audience_and_issuer(key_server):
+    verifier = GoogleIdTokenVerifier(key_server.url, AUDIENCE)
+    with pytest.raises(ValueError):
+        verifier.verify(key_server.sign("kid-1", aud="someone-else"))
+    with pytest.raises(ValueError):
+        verifier.verify(key_server.sign("kid-1", iss="https://evil.example.com"))
+
+
+def test_unknown_kid_triggers_one_refresh(key_server):
+    verifier = GoogleIdTokenVerifier(key_server.url, AUDIENCE, min_refresh_interval=0)
+    verifier.verify(key_server.sign("kid-1"))
+    key_server.add_key("kid-2")
+    assert verifier.verify(key_server.sign("kid-2"))["sub"] == "1234567890"
+    assert key_server.requests == 2
+
+
+def test_background_refresh_follows_max_age(key_server):
+    key_server.max_age = 2
+    verifier = GoogleIdTokenVerifier(key_server.url, AUDIENCE, refresh_margin=1)
+    verifier.verify(key_server.sign("kid-1"))
+    time.sleep(2.5)
+    assert key_server.requests >= 2
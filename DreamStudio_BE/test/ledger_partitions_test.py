@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from src.tasks.ledger_partitions import (
+    _add_months,
+    _month_start,
+    create_future_partitions,
+    ledger_partitions,
+    write_balance_snapshot,
+)
+from src.tasks.ledger_reconciliation import reconcile_ledger
+
+
+def _now(db):
+    return db.execute(text("SELECT now()")).scalar()
+
+
+def _ledger(db, user_id, ledger_type, amount, created_at):
+    db.execute(
+        text(
+            "INSERT INTO bounty_ledger (user_id, type, amount, created_at) "
+            "VALUES (:user_id, :type, :amount, :created_at)"
+        ),
+        {"user_id": user_id, "type": ledger_type, "amount": amount, "created_at": created_at},
+    )
+
+
+def _snapshot(db, period_end, user_id):
+    return db.execute(
+        text(
+            "SELECT ledger_balance FROM bounty_balance_snapshots "
+            "WHERE period_end = :period_end AND user_id = :user_id"
+        ),
+        {"period_end": period_end, "user_id": user_id},
+    ).scalar()
+
+
+def test_future_partitions_are_contiguous_months(db):
+    now = _now(db)
+    create_future_partitions(db, now, 5)
+    assert create_future_partitions(db, now, 5) == []
+
+    partitions = ledger_partitions(db)
+    assert partitions[-1].upper >= _add_months(_month_start(now), 6)
+    for previous, partition in zip(partitions, partitions[1:]):
+        assert partition.lower == previous.upper
+        if partition.name != "bounty_ledger_legacy":
+            assert partition.name == f"bounty_ledger_p{partition.lower:%Y%m}"
+            assert partition.upper == _add_months(partition.lower, 1)
+
+
+def test_snapshot_adds_rows_since_the_previous_snapshot(db, make_user):
+    now = _now(db)
+    user_id = make_user()
+    _ledger(db, user_id, "fund", 500, now - timedelta(days=3))
+    _ledger(db, user_id, "hold", 200, now - timedelta(days=2))
+    _ledger(db, user_id, "forfeit", 200, now - timedelta(hours=36))
+    _ledger(db, user_id, "fund", 40, now - timedelta(hours=1))
+
+    first, second = now - timedelta(hours=60), now - timedelta(hours=12)
+    assert write_balance_snapshot(db, first) > 0
+    assert _snapshot(db, first, user_id) == 500
+
+    # Rows before the first snapshot are no longer read.
+    db.execute(
+        text("DELETE FROM bounty_ledger WHERE user_id = :id AND created_at < :before"),
+        {"id": user_id, "before": first},
+    )
+    write_balance_snapshot(db, second)
+    assert _snapshot(db, second, user_id) == 300
+
+
+def test_full_reconciliation_starts_from_the_latest_snapshot(db, make_user):
+    now = _now(db)
+    user_id = make_user(370)
+    _ledger(db, user_id, "fund", 500, now - timedelta(days=2))
+    _ledger(db, user_id, "fund", 70, now - timedelta(hours=1))
+    period_end = now - timedelta(days=1)
+    # Deliberately disagrees with the rows before period_end, so the result
+    # shows which side was read.
+    db.execute(
+        text(
+            "INSERT INTO bounty_balance_snapshots (period_end, user_id, ledger_balance) "
+            "VALUES (:period_end, :user_id, 300)"
+        ),
+        {"period_end": period_end, "user_id": user_id},
+    )
+    db.commit()
+    try:
+        result = reconcile_ledger(db, True, 1000, timedelta(0))
+
+        assert result["balance_snapshot"] == period_end.isoformat()
+        discrepancy = db.execute(
+            text("SELECT 1 FROM ledger_discrepancies WHERE run_id = :run_id AND user_id = :user_id"),
+            {"run_id": result["run_id"], "user_id": user_id},
+        ).first()
+        assert discrepancy is None
+        total = db.execute(
+            text("SELECT ledger_balance FROM ledger_user_totals WHERE user_id = :id"), {"id": user_id}
+        ).scalar()
+        assert total == 370
+    finally:
+        db.execute(text("DELETE FROM bounty_balance_snapshots WHERE period_end = :p"), {"p": period_end})
+        db.commit()
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from src.helpers.bounty_ledger_utils import apply_bounty_ledger_entry
+from src.tasks.ledger_reconciliation import reconcile_ledger
+
+
+def _discrepancy(db, run_id, user_id):
+    return db.execute(
+        text(
+            "SELECT recorded_balance, ledger_balance FROM ledger_discrepancies "
+            "WHERE run_id = :run_id AND user_id = :user_id"
+        ),
+        {"run_id": run_id, "user_id": user_id},
+    ).first()
+
+
+def test_reports_only_users_whose_balance_disagrees_with_the_ledger(db, make_user):
+    clean, drifted = make_user(), make_user()
+    for user_id in (clean, drifted):
+        apply_bounty_ledger_entry(user_id, None, "fund", 500, db)
+        apply_bounty_ledger_entry(user_id, None, "hold", 200, db)
+        apply_bounty_ledger_entry(user_id, None, "forfeit", 200, db)
+    db.execute(text("UPDATE users SET bounty_balance = 999 WHERE id = :id"), {"id": drifted})
+    db.commit()
+
+    result = reconcile_ledger(db, True, 2, timedelta(0))
+
+    assert result["mode"] == "full"
+    assert _discrepancy(db, result["run_id"], clean) is None
+    assert tuple(_discrepancy(db, result["run_id"], drifted)) == (999, 300)
+
+
+def test_incremental_run_reads_only_rows_after_the_high_water_mark(db, make_user):
+    reconcile_ledger(db, True, 1000, timedelta(0))
+    user_id = make_user()
+    apply_bounty_ledger_entry(user_id, None, "fund", 70, db)
+    db.commit()
+
+    result = reconcile_ledger(db, False, 1000, timedelta(0))
+
+    assert result["mode"] == "incremental"
+    assert result["ledger_rows"] == 1
+    assert _discrepancy(db, result["run_id"], user_id) is None
+    total = db.execute(
+        text("SELECT ledger_balance FROM ledger_user_totals WHERE user_id = :id"), {"id": user_id}
+    ).scalar()
+    assert total == 70
+
+    db.execute(text("UPDATE users SET bounty_balance = 1 WHERE id = :id"), {"id": user_id})
+    db.commit()
+    result = reconcile_ledger(db, False, 1000, timedelta(0))
+    assert result["ledger_rows"] == 0
+    assert tuple(_discrepancy(db, result["run_id"], user_id)) == (1, 70)
@@ -0,0 +1,124 @@
+import os
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.helpers.db import SessionLocal, engine
+from src.helpers.password_hashing import PasswordHasher, configured_hasher, needs_rehash
+from src.main import app
+from src.routes import auth_manual
+
+
+def _exit_worker():
+    os._exit(1)
+
+
+def _exit_worker_once(marker: str):
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    now = time.monotonic()
+    return "survived", now, now
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    yield hasher
+    if hasher._executor is not None:
+        hasher._executor.shutdown()
+
+
+def test_rejects_past_max_pending_with_retry_after(hasher):
+    hasher.stats.in_flight = 2
+
+    with pytest.raises(HTTPException) as rejected:
+        hasher.hash("password")
+
+    assert rejected.value.status_code == 503
+    assert rejected.value.headers == {"Retry-After": "1"}
+    assert hasher.stats.rejected == 1
+    assert hasher.stats.in_flight == 2
+    assert hasher._executor is None
+
+
+def test_dead_worker_is_replaced_and_retried(hasher, tmp_path):
+    assert hasher._run(_exit_worker_once, str(tmp_path / "died")) == "survived"
+    assert hasher.stats.pool_restarts == 1
+    assert hasher.stats.in_flight == 0
+
+
+def test_pool_recovers_after_repeated_worker_deaths(hasher):
+    with pytest.raises(HTTPException) as unavailable:
+        hasher._run(_exit_worker)
+    assert unavailable.value.status_code == 503
+    assert hasher.stats.pool_restarts == 2
+
+    ok, new_hash = hasher.verify_and_update("password", hasher.hash("password"))
+    assert ok and new_hash is None
+    assert hasher.stats.in_flight == 0
+
+
+def test_manual_auth_holds_no_connection_while_hashing(monkeypatch):
+    real = auth_manual.password_hasher
+    held = []
+
+    class RecordingHasher:
+        def hash(self, password):
+            held.append(engine.pool.checkedout())
+            return real.hash(password)
+
+        def verify_and_update(self, password, password_hash):
+            held.append(engine.pool.checkedout())
+            return real.verify_and_update(password, password_hash)
+
+    monkeypatch.setattr(auth_manual, "password_hasher", RecordingHasher())
+    client = TestClient(app)
+    signup = client.post(
+        "/api/v1/auth/manual/signup",
+        json={
+            "email": f"hash-{uuid.uuid4().hex[:10]}@example.com",
+            "password": "temporary",
+            "first_name": "Ha",
+            "last_name": "Sh",
+        },
+    )
+    login = client.post(
+        "/api/v1/auth/manual/login", json={"email": "kjh9643@gmail.com", "password": "temporary"}
+    )
+
+    assert signup.status_code == 200 and login.status_code == 200
+    assert held == [0, 0]
+
+
+def test_login_replaces_a_hash_with_outdated_parameters(make_user):
+    user_id = make_user()
+    outdated = configured_hasher(time_cost=1, memory_cost=1024, parallelism=1).hash("temporary")
+    assert needs_rehash(outdated)
+    with SessionLocal() as db:
+        address = db.execute(
+            text("UPDATE users SET is_active = TRUE WHERE id = :id RETURNING email"), {"id": user_id}
+        ).scalar()
+        db.execute(
+            text(
+                "INSERT INTO auth_identities (user_id, provider, email, password_hash) "
+                "VALUES (:user_id, 'password', :email, :password_hash)"
+            ),
+            {"user_id": user_id, "email": address, "password_hash": outdated},
+        )
+        db.commit()
+
+    login = TestClient(app).post("/api/v1/auth/manual/login", json={"email": address, "password": "temporary"})
+
+    assert login.status_code == 200
+    with SessionLocal() as db:
+        password_hash, updated_at = db.execute(
+            text("SELECT password_hash, password_updated_at FROM auth_identities WHERE user_id = :id"),
+            {"id": user_id},
+        ).one()
+    assert password_hash != outdated and not needs_rehash(password_hash)
+    assert updated_at is not None
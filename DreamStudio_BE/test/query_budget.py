@@ -0,0 +1,7 @@
+def assert_max_queries(response, limit: int):
+    """Fail when an endpoint ran more SQL statements than its budget."""
+    count = int(response.headers["X-DB-Query-Count"])
+    assert count <= limit, (
+        f"{response.request.method} {response.request.url.path} ran {count} queries (budget {limit})"
+    )
+    assert "X-DB-N-Plus-One" not in response.headers, "repeated statement shape (likely N+1)"
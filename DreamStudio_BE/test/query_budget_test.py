@@ -0,0 +1,36 @@
+import pytest
+from fastapi.testclient import TestClient
+from src.main import app
+from query_budget import assert_max_queries
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def test_login():
+    login_response = client.post(
+        "/api/v1/auth/manual/login",
+        json={"email": "kjh9643@gmail.com", "password": "temporary"}
+    )
+    assert login_response.status_code == 200
+    return login_response.json()
+
+
+@pytest.mark.parametrize("path, budget", [
+    ("/api/v1/goals/getcurrentgoals", 1),
+    ("/api/v1/goals/goaltypes", 1),
+    ("/api/v1/user/profile", 1),
+])
+def test_read_endpoints_query_budget(test_login, path, budget):
+    headers = {"Authorization": f"Bearer {test_login['access_token']}"}
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    assert_max_queries(response, budget)
+
+
+def test_refresh_query_budget(test_login):
+    response = client.post(
+        "/api/v1/auth/refresh",
+        json={"user_id": test_login["user_id"], "refresh_token": test_login["refresh_token"]}
+    )
+    assert response.status_code == 200
+    assert_max_queries(response, 1)
@@ -0,0 +1,102 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from src.helpers import read_routing
+from src.helpers.read_routing import ReplicaRouter, mark_user_write, read_bind_for
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class ReplicaStandIn:
+    """Local stand-in for a replica engine: reports a scripted lag, or fails to connect."""
+
+    def __init__(self, name, lag=0.0):
+        self.url = SimpleNamespace(host=name)
+        self.lag = lag
+        self.checks = 0
+
+    def connect(self):
+        return self
+
+    async def __aenter__(self):
+        self.checks += 1
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalar=lambda: self.lag)
+
+
+class BrokenRedis:
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+    async def exists(self, *keys):
+        raise ConnectionError("redis down")
+
+
+def _picks(router, count):
+    async def run():
+        return [await router.pick() for _ in range(count)]
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    fresh, stale = ReplicaStandIn("fresh"), ReplicaStandIn("stale", lag=30.0)
+    router = ReplicaRouter([fresh, stale], max_lag_seconds=5, check_interval=60)
+    monkeypatch.setattr(read_routing, "replica_engines", [fresh, stale])
+    monkeypatch.setattr(read_routing, "replica_router", router)
+    redis = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(read_routing, "get_async_redis", lambda: redis)
+    return fresh, stale
+
+
+def test_round_robins_over_replicas_within_the_lag_bound():
+    first, second = ReplicaStandIn("a"), ReplicaStandIn("b", lag=2.0)
+    router = ReplicaRouter([first, second], max_lag_seconds=5, check_interval=60)
+
+    assert _picks(router, 4) == [first, second, first, second]
+    assert (first.checks, second.checks) == (1, 1)  # lag is re-checked per interval, not per read
+
+
+def test_lagging_and_failing_replicas_are_skipped():
+    stale = ReplicaStandIn("stale", lag=30.0)
+    down = ReplicaStandIn("down", lag=ConnectionError("replica down"))
+    fresh = ReplicaStandIn("fresh")
+    router = ReplicaRouter([stale, down, fresh], max_lag_seconds=5, check_interval=0)
+
+    assert _picks(router, 2) == [fresh, fresh]
+
+    router = ReplicaRouter([stale, down], max_lag_seconds=5, check_interval=0)
+    assert _picks(router, 1) == [None]
+
+
+def test_reads_are_pinned_to_the_primary_after_a_write(replicas):
+    fresh, _ = replicas
+    user_id, other_user = uuid.uuid4(), uuid.uuid4()
+
+    async def run():
+        await mark_user_write(user_id)
+        return await read_bind_for(user_id), await read_bind_for(other_user)
+
+    assert asyncio.run(run()) == (None, fresh)
+
+
+def test_reads_go_to_the_primary_when_redis_is_down(replicas, monkeypatch):
+    monkeypatch.setattr(read_routing, "get_async_redis", lambda: BrokenRedis())
+    user_id = uuid.uuid4()
+
+    async def run():
+        await mark_user_write(user_id)  # logged, not raised
+        return await read_bind_for(user_id)
+
+    assert asyncio.run(run()) is None
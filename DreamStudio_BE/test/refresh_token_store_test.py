@@ -0,0 +1,205 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from src.config import settings
+from src.helpers import refresh_token_store
+from src.helpers.auth_utils import generate_refresh_token, hash_refresh_token
+from src.helpers.db import AsyncSessionLocal, SessionLocal, async_engine
+from src.helpers.refresh_token_store import (
+    REFRESH_TOKEN_AUDIT_DEAD_KEY,
+    REFRESH_TOKEN_AUDIT_KEY,
+    RedisRefreshTokenStore,
+)
+from src.tasks import refresh_token_audit
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    sync_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(refresh_token_store, "get_redis", lambda: sync_client)
+    monkeypatch.setattr(refresh_token_store, "get_async_redis", lambda: async_client)
+    monkeypatch.setattr(refresh_token_audit, "get_redis", lambda: sync_client)
+    return sync_client
+
+
+@pytest.fixture
+def user_id():
+    db = SessionLocal()
+    user_id = db.execute(
+        text(
+            "INSERT INTO users (email, first_name, last_name) "
+            "VALUES (:email, 'Re', 'Fresh') RETURNING id"
+        ),
+        {"email": f"refresh-{uuid.uuid4().hex[:10]}@example.com"},
+    ).scalar()
+    db.commit()
+    yield user_id
+    db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+    db.commit()
+    db.close()
+
+
+def _rotate(store, refresh_token):
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await store.rotate(db, refresh_token)
+        finally:
+            # Each test runs its own event loop; don't reuse connections across them.
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _revoke(store, refresh_token):
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await store.revoke(db, refresh_token)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _revoked(redis, refresh_token):
+    return redis.hget(f"rt:{hash_refresh_token(refresh_token)}", "revoked")
+
+
+def _events(redis):
+    return [json.loads(raw)["event"] for raw in redis.lrange(REFRESH_TOKEN_AUDIT_KEY, 0, -1)]
+
+
+def test_rotate_replaces_the_token(redis, user_id):
+    store = RedisRefreshTokenStore()
+    issued = store.issue(None, user_id)
+
+    rotation = _rotate(store, issued)
+
+    assert rotation.status == "rotated" and rotation.user_id == user_id
+    assert _revoked(redis, issued) == "1"
+    assert _revoked(redis, rotation.refresh_token) == "0"
+    assert redis.smembers(f"rt:user:{user_id}") == {hash_refresh_token(rotation.refresh_token)}
+    assert _events(redis) == ["issued", "rotated"]
+
+
+def test_replay_after_rotate_revokes_the_family(redis, user_id):
+    store = RedisRefreshTokenStore()
+    issued = store.issue(None, user_id)
+    rotated = _rotate(store, issued).refresh_token
+
+    replay = _rotate(store, issued)
+
+    assert replay.status == "revoked" and replay.user_id == user_id
+    assert _revoked(redis, rotated) == "1"
+    assert _rotate(store, rotated).status == "revoked"
+    assert _events(redis)[-1] == "reused"
+
+
+def test_replay_does_not_recreate_expired_family_members(redis, user_id):
+    store = RedisRefreshTokenStore()
+    expired = store.issue(None, user_id)
+    issued = store.issue(None, user_id)
+    _rotate(store, issued)
+    redis.delete(f"rt:{hash_refresh_token(expired)}")  # as if its TTL ran out
+
+    assert _rotate(store, issued).status == "revoked"
+
+    assert not redis.exists(f"rt:{hash_refresh_token(expired)}")
+    assert all(redis.ttl(key) > 0 for key in redis.scan_iter("rt:*") if redis.type(key) == "hash")
+
+
+def test_replay_after_logout_is_rejected_before_the_audit_flush(redis, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "refresh_token_redis_cutover", datetime.now(timezone.utc) - timedelta(days=1))
+    store = RedisRefreshTokenStore()
+    issued = store.issue(None, user_id)
+    # The flushed "issued" row, before the "revoked" event has been written.
+    db = SessionLocal()
+    db.execute(
+        text(
+            "INSERT INTO refresh_tokens (user_id, refresh_token, expires_at) "
+            "VALUES (:user_id, :token_hash, now() + interval '1 day')"
+        ),
+        {"user_id": user_id, "token_hash": hash_refresh_token(issued)},
+    )
+    db.commit()
+
+    assert _revoke(store, issued) is True
+    assert redis.ttl(f"rt:{hash_refresh_token(issued)}") > 0
+    assert _revoked(redis, issued) == "1"
+
+    replay = _rotate(store, issued)
+
+    assert replay.status == "revoked"
+    live = db.execute(
+        text("SELECT count(*) FROM refresh_tokens WHERE user_id = :id AND revoked_at IS NULL"), {"id": user_id}
+    ).scalar()
+    assert live == 1  # the flushed row was left for the audit flush, not rotated
+    assert redis.smembers(f"rt:user:{user_id}") == set()
+    db.close()
+
+
+def test_postgres_fallback_only_accepts_tokens_from_before_the_cutover(redis, user_id, monkeypatch):
+    cutover = datetime.now(timezone.utc) - timedelta(hours=1)
+    monkeypatch.setattr(settings, "refresh_token_redis_cutover", cutover)
+    store = RedisRefreshTokenStore()
+    legacy, unmoved, recent = (generate_refresh_token() for _ in range(3))
+    db = SessionLocal()
+    for token, created_at in (
+        (legacy, cutover - timedelta(days=1)),
+        (unmoved, cutover - timedelta(days=1)),
+        (recent, cutover + timedelta(minutes=5)),
+    ):
+        db.execute(
+            text(
+                "INSERT INTO refresh_tokens (user_id, refresh_token, expires_at, created_at) "
+                "VALUES (:user_id, :token_hash, now() + interval '1 day', :created_at)"
+            ),
+            {"user_id": user_id, "token_hash": hash_refresh_token(token), "created_at": created_at},
+        )
+    db.commit()
+    db.close()
+
+    moved = _rotate(store, legacy)
+    assert moved.status == "rotated"
+    assert _revoked(redis, moved.refresh_token) == "0"
+    assert _rotate(store, recent).status != "rotated"
+
+    monkeypatch.setattr(settings, "refresh_token_redis_cutover", None)
+    assert _rotate(store, unmoved).status != "rotated"
+
+
+def test_audit_flush_dead_letters_bad_events_instead_of_blocking(redis, user_id):
+    store = RedisRefreshTokenStore()
+    issued = store.issue(None, user_id)
+    at = datetime.now(timezone.utc).timestamp()
+    bad_user = json.dumps({
+        "event": "issued", "user_id": "not-a-uuid", "token_hash": "x", "at": at, "expires_at": at + 60,
+    })
+    deleted_user = json.dumps({
+        "event": "issued", "user_id": str(uuid.uuid4()), "token_hash": "y", "at": at, "expires_at": at + 60,
+    })
+    redis.rpush(REFRESH_TOKEN_AUDIT_KEY, "{not json", bad_user, deleted_user)
+    _revoke(store, issued)
+
+    result = refresh_token_audit.flush_refresh_token_audit.run()
+
+    assert result == {"written": 3, "dead_lettered": 2}
+    assert redis.llen(REFRESH_TOKEN_AUDIT_KEY) == 0
+    assert redis.lrange(REFRESH_TOKEN_AUDIT_DEAD_KEY, 0, -1) == ["{not json", bad_user]
+    db = SessionLocal()
+    rows = db.execute(
+        text("SELECT refresh_token, revoked_at FROM refresh_tokens WHERE refresh_token IN (:a, 'y')"),
+        {"a": hash_refresh_token(issued)},
+    ).all()
+    db.close()
+    assert [(token, revoked_at is not None) for token, revoked_at in rows] == [(hash_refresh_token(issued), True)]
@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from src.helpers.db import SessionLocal
+from src.helpers.deadline_scheduler import GOAL_DEADLINES_CLAIMED_KEY, GOAL_DEADLINES_KEY
+from src.helpers.task_outbox import TASK_OUTBOX_STATS_KEY, enqueue_task, relay_batch
+from src.tasks.deadline_tasks import dispatch_due_batch, finalize_goal_at_deadline, finalize_goals_at_deadline
+from src.tasks.quiz_tasks import generate_quiz_for_goal
+
+
+class BrokerStandIn:
+    """Local stand-in for the Redis broker: records pipelined commands per round trip."""
+
+    def __init__(self, due=()):
+        self.round_trips = []
+        self.due = list(due)
+        self.claims = []
+
+    def pipeline(self, transaction=True):
+        return PipelineStandIn(self)
+
+    def eval(self, script, numkeys, *keys_and_args):
+        # The deadline claim script; hands out the scripted due goal ids.
+        self.claims.append(keys_and_args)
+        batch_size = keys_and_args[numkeys + 1]
+        claimed, self.due = self.due[:batch_size], self.due[batch_size:]
+        return claimed
+
+
+class PipelineStandIn:
+    def __init__(self, broker):
+        self.broker = broker
+        self.commands = []
+
+    def lpush(self, key, value):
+        self.commands.append(("lpush", key, value))
+
+    def zadd(self, key, mapping):
+        self.commands.append(("zadd", key, mapping))
+
+    def zrem(self, key, *members):
+        self.commands.append(("zrem", key, members))
+
+    def hincrby(self, key, field, amount):
+        self.commands.append(("hincrby", key, field, amount))
+
+    def hset(self, key, mapping):
+        self.commands.append(("hset", key, mapping))
+
+    def execute(self):
+        self.broker.round_trips.append(self.commands)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    session.execute(text("DELETE FROM task_outbox"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _pending(db):
+    return db.execute(text("SELECT count(*) FROM task_outbox")).scalar()
+
+
+def test_rolled_back_request_dispatches_nothing(db):
+    enqueue_task(db, generate_quiz_for_goal, args=["goal-1"])
+    db.rollback()
+    assert _pending(db) == 0
+
+    enqueue_task(db, generate_quiz_for_goal, args=["goal-1"])
+    db.commit()
+    assert _pending(db) == 1
+
+
+def test_relay_publishes_batch_in_one_round_trip(db):
+    eta = datetime.now(timezone.utc) + timedelta(minutes=5)
+    for n in range(3):
+        enqueue_task(db, generate_quiz_for_goal, args=[f"goal-{n}"], eta=eta)
+    db.commit()
+    broker = BrokerStandIn()
+
+    published, lag = relay_batch(db, broker, batch_size=500)
+
+    assert published == 3 and lag >= 0
+    assert len(broker.round_trips) == 1
+    pushes = [cmd for cmd in broker.round_trips[0] if cmd[0] == "lpush"]
+    assert [key for _, key, _ in pushes] == ["celery"] * 3
+    assert any(cmd[0] == "hincrby" and cmd[1] == TASK_OUTBOX_STATS_KEY for cmd in broker.round_trips[0])
+
+    message = json.loads(pushes[0][2])
+    assert message["headers"]["task"] == generate_quiz_for_goal.name
+    assert message["headers"]["eta"] == eta.isoformat()
+    args, kwargs, _ = json.loads(base64.b64decode(message["body"]))
+    assert args == ["goal-0"] and kwargs == {}
+    assert _pending(db) == 0
+
+
+def test_relay_with_empty_outbox_skips_broker(db):
+    broker = BrokerStandIn()
+    assert relay_batch(db, broker, batch_size=500) == (0, 0.0)
+    assert broker.round_trips == []
+
+
+def test_relay_schedules_goal_deadlines_instead_of_eta_messages(db):
+    deadline = datetime.now(timezone.utc) + timedelta(days=30)
+    enqueue_task(db, finalize_goal_at_deadline, args=["goal-1"], eta=deadline)
+    enqueue_task(db, generate_quiz_for_goal, args=["goal-1"])
+    db.commit()
+    broker = BrokerStandIn()
+
+    assert relay_batch(db, broker, batch_size=500)[0] == 2
+
+    commands = broker.round_trips[0]
+    assert ("zadd", GOAL_DEADLINES_KEY, {"goal-1": deadline.timestamp()}) in commands
+    pushes = [json.loads(cmd[2]) for cmd in commands if cmd[0] == "lpush"]
+    assert [message["headers"]["task"] for message in pushes] == [generate_quiz_for_goal.name]
+
+
+def test_due_deadlines_dispatch_in_one_round_trip():
+    broker = BrokerStandIn(due=["goal-1", "goal-2", "goal-3"])
+
+    assert dispatch_due_batch(broker, now=1000.0, batch_size=2, lease_seconds=60) == 2
+
+    commands = broker.round_trips[0]
+    pushes = [json.loads(cmd[2]) for cmd in commands if cmd[0] == "lpush"]
+    assert [message["headers"]["task"] for message in pushes] == [finalize_goals_at_deadline.name]
+    assert json.loads(base64.b64decode(pushes[0]["body"]))[0] == [["goal-1", "goal-2"]]
+    assert all(message["headers"]["eta"] is None for message in pushes)
+    assert commands[-1] == ("zrem", GOAL_DEADLINES_CLAIMED_KEY, ("goal-1", "goal-2"))
@@ -0,0 +1,102 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.helpers.db import SessionLocal
+from src.tasks import token_cleanup
+from src.tasks.token_cleanup import MIN_BATCH_SIZE, purge_table
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class PurgeStandIn:
+    """Local stand-in for the session: each purge batch takes a scripted time (ms) or raises."""
+
+    def __init__(self, clock, script):
+        self.clock = clock
+        self.script = list(script)
+        self.batch_sizes = []
+
+    def execute(self, statement, params=None):
+        if params is None:  # SET LOCAL statement_timeout
+            return None
+        self.batch_sizes.append(params["batch_size"])
+        step = self.script.pop(0) if self.script else None
+        if step == "timeout":
+            raise OperationalError("purge batch", {}, Exception("canceling statement due to statement timeout"))
+        if step is None:
+            row = SimpleNamespace(last_id=None, scanned=0, deleted=0)
+        else:
+            self.clock.now += step / 1000
+            row = SimpleNamespace(last_id=uuid.uuid4(), scanned=params["batch_size"], deleted=1)
+        return SimpleNamespace(first=lambda: row)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(token_cleanup.time, "monotonic", lambda: clock.now)
+    return clock
+
+
+def test_batch_size_halves_when_slow_and_doubles_when_fast(clock):
+    db = PurgeStandIn(clock, [300, 10, "timeout", 60, 10])
+
+    result = purge_table(db, "refresh_tokens", 1000, 100, 60, 7)
+
+    assert db.batch_sizes == [1000, 500, 1000, 500, 500, 1000]
+    assert result["timeouts"] == 1 and result["batches"] == 4 and result["finished"]
+
+
+def test_timeouts_at_the_minimum_batch_size_are_raised(clock):
+    db = PurgeStandIn(clock, ["timeout"])
+
+    with pytest.raises(OperationalError):
+        purge_table(db, "refresh_tokens", MIN_BATCH_SIZE, 100, 60, 7)
+
+
+def test_runs_resume_from_the_saved_cursor_and_wrap_around():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    db = SessionLocal()
+    user_id = db.execute(
+        text(
+            "INSERT INTO users (email, first_name, last_name) "
+            "VALUES (:email, 'Pur', 'Ge') RETURNING id"
+        ),
+        {"email": f"purge-{uuid.uuid4().hex[:10]}@example.com"},
+    ).scalar()
+    suffix = uuid.uuid4().hex[-12:]
+    low, high, kept = (uuid.UUID(f"{prefix}-0000-4000-8000-{suffix}") for prefix in ("00000000", "ffffffff", "fffffffe"))
+    for token_id, expires in ((low, "-30 days"), (high, "-30 days"), (kept, "+1 day")):
+        db.execute(
+            text(
+                "INSERT INTO refresh_tokens (id, user_id, refresh_token, expires_at) "
+                "VALUES (:id, :user_id, :token, now() + CAST(:expires AS interval))"
+            ),
+            {"id": token_id, "user_id": user_id, "token": uuid.uuid4().hex, "expires": expires},
+        )
+    db.commit()
+    start = uuid.UUID("80000000-0000-4000-8000-000000000000")
+    redis.set("token_purge:cursor:refresh_tokens", str(start))
+    try:
+        result = purge_table(db, "refresh_tokens", 5000, 10_000, 60, 7, redis_client=redis)
+
+        assert result["finished"]
+        remaining = db.execute(
+            text("SELECT id FROM refresh_tokens WHERE id IN (:a, :b, :c)"), {"a": low, "b": high, "c": kept}
+        ).scalars().all()
+        assert remaining == [kept]
+        assert uuid.UUID(redis.get("token_purge:cursor:refresh_tokens")) >= start
+    finally:
+        db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        db.commit()
+        db.close()